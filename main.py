@@ -10,21 +10,9 @@ import os
 
 import click
 
-import models  # noqa: F401
-from api import *  # noqa: F401,F403
 from application import app
-from authcontroller import *  # noqa: F401,F403
-from oauth import *  # noqa: F401,F403
-from reports import *  # noqa: F401,F403
-from utils import process_affiliation_records, process_funding_records
-from views import *  # noqa: F401,F403
-
-
-@app.before_first_request
-def setup_logging():
-    """Set-up logger to log to STDOUT (eventually conainer log)."""
-    app.logger.addHandler(logging.StreamHandler())
-    app.logger.setLevel(logging.INFO)
+from orcid_hub import models
+from orcid_hub.utils import process_affiliation_records, process_funding_records
 
 
 @app.cli.command()
@@ -77,11 +65,12 @@ def load(verbose):
     app.verbose = verbose
 
 
-@load.command()
+@load.command(short_help="Pre-loads organisation data.", context_settings={"show_default": True})
+@click.option("-b", "--batch-size", default=1000, help="Number of rows read and inserted at once.")
 @click.argument('input', type=click.File('r'), required=True)
-def org_info(input):
+def org_info(input, batch_size=1000):
     """Pre-loads organisation data."""
-    row_count = models.OrgInfo.load_from_csv(input)
+    row_count = models.OrgInfo.load_from_csv(input, batch_size=batch_size)
     click.echo(f"Loaded {row_count} records")
 
 
@@ -93,13 +82,14 @@ def process(n):
     process_funding_records(n)
 
 
-if os.environ.get("ENV") == "dev0":
+def _configure_env():
+    """Set up the development environment."""
     # This allows us to use a plain HTTP callback
-    os.environ['DEBUG'] = "1"
-    os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
+    os.environ.update(DEBUG="1", OAUTHLIB_INSECURE_TRANSPORT="1", ENV="dev0")
     app.debug = True
 
-if app.debug:
+
+if os.environ.get("ENABLE_DEBUG_TOOLBAR") == "1":
     from flask_debugtoolbar import DebugToolbarExtension
     toolbar = DebugToolbarExtension(app)
     # logger = logging.getLogger('peewee')
@@ -107,10 +97,9 @@ if app.debug:
     # logger.addHandler(logging.StreamHandler())
 
 if __name__ == "__main__":
-    # This allows us to use a plain HTTP callback
-    os.environ['DEBUG'] = "1"
-    os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
-    os.environ["ENV"] = "dev0"
-    app.debug = True
+    # Set-up logger to log to STDOUT (eventually conainer log):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    app.logger.setLevel(logging.INFO)
+    _configure_env()
     app.secret_key = os.urandom(24)
     app.run(debug=True, port=8000)
@@ -257,7 +257,8 @@ class ApiClient(object):
             if klass in self.NATIVE_TYPES_MAPPING:
                 klass = self.NATIVE_TYPES_MAPPING[klass]
             else:
-                klass = getattr(orcid_api_v3.models, klass)
+                klass = (orcid_api_v3.models.MODEL_REGISTRY.get(klass)
+                         or getattr(orcid_api_v3.models, klass))
 
         if klass in self.PRIMITIVE_TYPES:
             return self.__deserialize_primitive(data, klass)
@@ -613,7 +614,10 @@ class ApiClient(object):
                     value = data[klass.attribute_map[attr]]
                     kwargs[attr] = self.__deserialize(value, attr_type)
 
-        instance = klass(**kwargs)
+        # the models that provide a trusted constructor skip the setter validation
+        # of the data received from the ORCID API:
+        from_validated = getattr(klass, '_from_validated', None)
+        instance = from_validated(**kwargs) if from_validated else klass(**kwargs)
 
         if (isinstance(instance, dict) and
                 klass.swagger_types is not None and
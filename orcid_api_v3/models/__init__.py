@@ -463,3 +463,15 @@ from orcid_api_v3.models.year_v20 import YearV20
 from orcid_api_v3.models.year_v30 import YearV30
 from orcid_api_v3.models.year_v30_rc1 import YearV30Rc1
 from orcid_api_v3.models.year_v30_rc2 import YearV30Rc2
+
+# model class lookup table used by the deserialization
+MODEL_REGISTRY = {
+    _name: _model for _name, _model in globals().items()
+    if isinstance(_model, type) and hasattr(_model, 'swagger_types')
+}
+
+# specialize the generic serialization of the models
+from orcid_api_v3.models._specialize import specialize_to_dict
+for _model in MODEL_REGISTRY.values():
+    specialize_to_dict(_model)
+del _model
@@ -0,0 +1,61 @@
+# coding: utf-8
+
+"""
+    ORCID Member
+
+    Per-class specialization of the generated model serialization.
+
+    The generic ``to_dict`` of the generated models walks ``swagger_types`` and
+    dispatches on the value type on every call. ``specialize_to_dict`` replaces it
+    with a straight-line function generated from ``swagger_types`` on the first call.
+"""
+
+PRIMITIVE_TYPES = frozenset(('str', 'int', 'long', 'float', 'bool', 'date', 'datetime'))
+
+
+def _value_expr(attr, attr_type):
+    """Returns the source code expression that serializes the given attribute"""
+    value = f"self._{attr}"
+    if attr_type in PRIMITIVE_TYPES:
+        return value
+    if attr_type.startswith('list['):
+        return (f"[x.to_dict() if hasattr(x, 'to_dict') else x for x in {value}] "
+                f"if {value} is not None else None")
+    if attr_type.startswith('dict('):
+        return (f"{{k: v.to_dict() if hasattr(v, 'to_dict') else v for k, v in {value}.items()}} "
+                f"if {value} is not None else None")
+    return f"{value}.to_dict() if hasattr({value}, 'to_dict') else {value}"
+
+
+def build_to_dict(cls):
+    """Generates the straight-line ``to_dict`` for the given model class"""
+    lines = ["def to_dict(self):", "    return {"]
+    lines.extend(f"        '{attr}': {_value_expr(attr, attr_type)},"
+                 for attr, attr_type in cls.swagger_types.items())
+    lines.append("    }")
+    namespace = {}
+    exec(compile('\n'.join(lines), f"<{cls.__name__}.to_dict>", "exec"), namespace)
+    to_dict = namespace["to_dict"]
+    to_dict.__doc__ = "Returns the model properties as a dict"
+    return to_dict
+
+
+def specialize_to_dict(cls):
+    """Replaces the generic ``to_dict`` of the model class with a specialized one.
+
+    The specialized function gets generated on the first call, so the import
+    of the models does not pay for the code generation of the unused ones.
+    Models with a custom ``to_dict`` and the dict based models keep theirs.
+    """
+    generic = cls.__dict__.get('to_dict')
+    if (generic is None or issubclass(cls, dict)
+            or 'swagger_types' not in generic.__code__.co_names):
+        return cls
+
+    def to_dict(self):
+        """Returns the model properties as a dict"""
+        cls.to_dict = build_to_dict(cls)
+        return cls.to_dict(self)
+
+    cls.to_dict = to_dict
+    return cls
@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.distinctions_summary_v30_rc2 import DistinctionsSummaryV30Rc2  # noqa: F401,E501
 from orcid_api_v3.models.educations_summary_v30_rc2 import EducationsSummaryV30Rc2  # noqa: F401,E501
 from orcid_api_v3.models.employments_summary_v30_rc2 import EmploymentsSummaryV30Rc2  # noqa: F401,E501
@@ -392,7 +390,7 @@ class ActivitiesSummaryV30Rc2(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -417,6 +415,7 @@ class ActivitiesSummaryV30Rc2(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
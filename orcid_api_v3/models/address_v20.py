@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.country_v20 import CountryV20  # noqa: F401,E501
 from orcid_api_v3.models.created_date_v20 import CreatedDateV20  # noqa: F401,E501
 from orcid_api_v3.models.last_modified_date_v20 import LastModifiedDateV20  # noqa: F401,E501
@@ -261,7 +259,7 @@ class AddressV20(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -286,6 +284,7 @@ class AddressV20(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -10,10 +10,10 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
-import re  # noqa: F401
+import sys
 
-import six
+_CITATION_TYPES = ("FORMATTED_UNSPECIFIED", "BIBTEX", "FORMATTED_APA", "FORMATTED_HARVARD", "FORMATTED_IEEE", "FORMATTED_MLA", "FORMATTED_VANCOUVER", "FORMATTED_CHICAGO", "RIS")  # noqa: E501
+_ALLOWED_CITATION_TYPES = frozenset(_CITATION_TYPES)
 
 
 class Citation(object):
@@ -38,14 +38,23 @@ class Citation(object):
         'citation_value': 'citation-value'
     }
 
+    __slots__ = ('_citation_type', '_citation_value')
+
     def __init__(self, citation_type=None, citation_value=None):  # noqa: E501
         """Citation - a model defined in Swagger"""  # noqa: E501
         self._citation_type = None
         self._citation_value = None
-        self.discriminator = None
         self.citation_type = citation_type
         self.citation_value = citation_value
 
+    @classmethod
+    def _from_validated(cls, citation_type=None, citation_value=None):
+        """Creates a Citation from already validated data bypassing the setters"""
+        obj = cls.__new__(cls)
+        obj._citation_type = sys.intern(citation_type) if citation_type is not None else None
+        obj._citation_value = citation_value
+        return obj
+
     @property
     def citation_type(self):
         """Gets the citation_type of this Citation.  # noqa: E501
@@ -66,14 +75,14 @@ class Citation(object):
         """
         if citation_type is None:
             raise ValueError("Invalid value for `citation_type`, must not be `None`")  # noqa: E501
-        allowed_values = ["FORMATTED_UNSPECIFIED", "BIBTEX", "FORMATTED_APA", "FORMATTED_HARVARD", "FORMATTED_IEEE", "FORMATTED_MLA", "FORMATTED_VANCOUVER", "FORMATTED_CHICAGO", "RIS"]  # noqa: E501
-        if citation_type not in allowed_values:
+        if citation_type not in _ALLOWED_CITATION_TYPES:
             raise ValueError(
                 "Invalid value for `citation_type` ({0}), must be one of {1}"  # noqa: E501
-                .format(citation_type, allowed_values)
+                .format(citation_type, list(_CITATION_TYPES))
             )
 
-        self._citation_type = citation_type
+        # share a single string object per citation type across the instances
+        self._citation_type = sys.intern(citation_type)
 
     @property
     def citation_value(self):
@@ -100,33 +109,19 @@ class Citation(object):
 
     def to_dict(self):
         """Returns the model properties as a dict"""
-        result = {}
-
-        for attr, _ in six.iteritems(self.swagger_types):
-            value = getattr(self, attr)
-            if isinstance(value, list):
-                result[attr] = list(map(
-                    lambda x: x.to_dict() if hasattr(x, "to_dict") else x,
-                    value
-                ))
-            elif hasattr(value, "to_dict"):
-                result[attr] = value.to_dict()
-            elif isinstance(value, dict):
-                result[attr] = dict(map(
-                    lambda item: (item[0], item[1].to_dict())
-                    if hasattr(item[1], "to_dict") else item,
-                    value.items()
-                ))
-            else:
-                result[attr] = value
-        if issubclass(Citation, dict):
-            for key, value in self.items():
-                result[key] = value
-
-        return result
+        # Both properties are plain strings, so there is nothing to recurse into.
+        return {
+            'citation_type': self._citation_type,
+            'citation_value': self._citation_value
+        }
 
     def to_str(self):
         """Returns the string representation of the model"""
+        return f"Citation(citation_type={self._citation_type!r}, citation_value={self._citation_value!r})"  # noqa: E501
+
+    def to_pretty_str(self):
+        """Returns the pretty-printed representation of the model properties"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -135,11 +130,6 @@ class Citation(object):
 
     def __eq__(self, other):
         """Returns true if both objects are equal"""
-        if not isinstance(other, Citation):
-            return False
-
-        return self.__dict__ == other.__dict__
-
-    def __ne__(self, other):
-        """Returns true if both objects are not equal"""
-        return not self == other
+        return (isinstance(other, Citation) and
+                self._citation_type == other._citation_type and
+                self._citation_value == other._citation_value)
@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.contributor_attributes_v30_rc1 import ContributorAttributesV30Rc1  # noqa: F401,E501
 from orcid_api_v3.models.contributor_email_v30_rc1 import ContributorEmailV30Rc1  # noqa: F401,E501
 from orcid_api_v3.models.contributor_orcid_v30_rc1 import ContributorOrcidV30Rc1  # noqa: F401,E501
@@ -150,7 +148,7 @@ class ContributorV30Rc1(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -175,6 +173,7 @@ class ContributorV30Rc1(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.transient_error import TransientError  # noqa: F401,E501
 from orcid_api_v3.models.transient_non_empty_string import TransientNonEmptyString  # noqa: F401,E501
 from orcid_api_v3.models.url_v30_rc2 import UrlV30Rc2  # noqa: F401,E501
@@ -209,7 +207,7 @@ class ExternalIDV30Rc2(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -234,6 +232,7 @@ class ExternalIDV30Rc2(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.authorization_url_v30 import AuthorizationUrlV30  # noqa: F401,E501
 from orcid_api_v3.models.items_v30 import ItemsV30  # noqa: F401,E501
 from orcid_api_v3.models.source_v30 import SourceV30  # noqa: F401,E501
@@ -366,7 +364,7 @@ class NotificationPermissionV30(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -391,6 +389,7 @@ class NotificationPermissionV30(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
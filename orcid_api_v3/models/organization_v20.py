@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.disambiguated_organization_v20 import DisambiguatedOrganizationV20  # noqa: F401,E501
 from orcid_api_v3.models.organization_address_v20 import OrganizationAddressV20  # noqa: F401,E501
 
@@ -124,7 +122,7 @@ class OrganizationV20(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -149,6 +147,7 @@ class OrganizationV20(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.addresses_v30 import AddressesV30  # noqa: F401,E501
 from orcid_api_v3.models.biography_v30 import BiographyV30  # noqa: F401,E501
 from orcid_api_v3.models.emails_v30 import EmailsV30  # noqa: F401,E501
@@ -311,7 +309,7 @@ class PersonV30(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -336,6 +334,7 @@ class PersonV30(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.day_v20 import DayV20  # noqa: F401,E501
 from orcid_api_v3.models.month_v20 import MonthV20  # noqa: F401,E501
 from orcid_api_v3.models.year_v20 import YearV20  # noqa: F401,E501
@@ -156,7 +154,7 @@ class PublicationDateV20(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -181,6 +179,7 @@ class PublicationDateV20(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
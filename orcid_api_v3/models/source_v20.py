@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.source_client_id_v20 import SourceClientIdV20  # noqa: F401,E501
 from orcid_api_v3.models.source_name_v20 import SourceNameV20  # noqa: F401,E501
 from orcid_api_v3.models.source_orcid_v20 import SourceOrcidV20  # noqa: F401,E501
@@ -123,7 +121,7 @@ class SourceV20(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -148,6 +146,7 @@ class SourceV20(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.subtitle_v20 import SubtitleV20  # noqa: F401,E501
 from orcid_api_v3.models.title_v20 import TitleV20  # noqa: F401,E501
 from orcid_api_v3.models.translated_title_v20 import TranslatedTitleV20  # noqa: F401,E501
@@ -123,7 +121,7 @@ class WorkTitleV20(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -148,6 +146,7 @@ class WorkTitleV20(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -10,10 +10,8 @@
     Generated by: https://github.com/swagger-api/swagger-codegen.git
 """
 
-import pprint
 import re  # noqa: F401
 
-import six
 from orcid_api_v3.models.citation import Citation  # noqa: F401,E501
 from orcid_api_v3.models.country_v20 import CountryV20  # noqa: F401,E501
 from orcid_api_v3.models.created_date_v20 import CreatedDateV20  # noqa: F401,E501
@@ -507,7 +505,7 @@ class WorkV20(object):
         """Returns the model properties as a dict"""
         result = {}
 
-        for attr, _ in six.iteritems(self.swagger_types):
+        for attr, _ in self.swagger_types.items():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -532,6 +530,7 @@ class WorkV20(object):
 
     def to_str(self):
         """Returns the string representation of the model"""
+        import pprint
         return pprint.pformat(self.to_dict())
 
     def __repr__(self):
@@ -23,6 +23,7 @@ from flask import Flask, request
 from flask_oauthlib.provider import OAuth2Provider
 from flask_peewee.rest import Authentication, RestAPI
 from flask_restful import Api
+from jinja2 import FileSystemBytecodeCache
 from peewee import PostgresqlDatabase
 from playhouse import db_url
 from playhouse.shortcuts import RetryOperationalError
@@ -60,6 +61,11 @@ app = Flask(__name__, instance_path=instance_path)
 app.config.from_object(config)
 if not app.config.from_pyfile(settings_filename, silent=True) and app.debug:
     print(f"*** WARNING: Failed to load local application configuration from '{settings_filename}'")
+if app.config.get("JINJA_BYTECODE_CACHE_DIR"):
+    os.makedirs(app.config["JINJA_BYTECODE_CACHE_DIR"], exist_ok=True)
+    app.jinja_options = dict(
+        app.jinja_options,
+        bytecode_cache=FileSystemBytecodeCache(app.config["JINJA_BYTECODE_CACHE_DIR"]))
 
 
 app.url_map.strict_slashes = False
@@ -188,12 +194,10 @@ login_manager.init_app(app)
 
 from .queuing import __redis_available, rq  # noqa: F401
 from . import models  # noqa: F401
-from .apis import *  # noqa: F401,F403
-from .data_apis import *  # noqa: F401,F403
-from .authcontroller import *  # noqa: F401,F403
-from .views import *  # noqa: F401,F403
-from .oauth import *  # noqa: F401,F403
-from .reports import *  # noqa: F401,F403
+# NB! the modules get imported for the route registration:
+from . import apis, data_apis, authcontroller, views, reports  # noqa: F401
+# the import of the submodule 'oauth' shadows the OAuth2 provider, so it gets rebound:
+from .oauth import oauth  # noqa: F401,F811
 
 
 from .utils import process_records  # noqa: E402
@@ -309,11 +313,12 @@ def load(verbose):
     app.verbose = verbose
 
 
-@load.command()
+@load.command(short_help="Pre-loads organisation data.", context_settings={"show_default": True})
+@click.option("-b", "--batch-size", default=1000, help="Number of rows read and inserted at once.")
 @click.argument('input', type=click.File('r'), required=True)
-def org_info(input):
+def org_info(input, batch_size=1000):
     """Pre-loads organisation data."""
-    row_count = models.OrgInfo.load_from_csv(input)
+    row_count = models.OrgInfo.load_from_csv(input, batch_size=batch_size)
     click.echo(f"Loaded {row_count} records")
 
 
@@ -330,7 +335,7 @@ if os.environ.get("ENV") == "dev0":
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
     app.debug = True
 
-if app.debug:
+if app.config.get("ENABLE_DEBUG_TOOLBAR") == "1":
     try:
         from flask_debugtoolbar import DebugToolbarExtension
         toolbar = DebugToolbarExtension(app)
@@ -31,6 +31,10 @@ TOKEN_URL = 'https://sandbox.orcid.org/oauth/token' if ENV != "prod" else "https
 DATABASE_URL = getenv("DATABASE_URL", "sqlite:///data.db")
 BACKUP_DATABASE_URL = getenv("BACKUP_DATABASE_URL")
 LOAD_TEST = getenv("LOAD_TEST")
+# Enables Flask-DebugToolbar (set to "1")
+ENABLE_DEBUG_TOOLBAR = getenv("ENABLE_DEBUG_TOOLBAR")
+# Directory for the compiled Jinja2 templates shared by the processes and kept across restarts
+JINJA_BYTECODE_CACHE_DIR = getenv("JINJA_BYTECODE_CACHE_DIR")
 
 # NB! Disable in production
 if ENV in ("dev0", ):
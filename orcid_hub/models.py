@@ -10,13 +10,15 @@ import random
 import re
 import secrets
 import string
+import tempfile
 import uuid
 from collections import namedtuple
 from datetime import datetime
 from enum import IntFlag, IntEnum
+from functools import lru_cache
 from hashlib import md5
 from io import StringIO
-from itertools import groupby, zip_longest
+from itertools import chain, groupby, islice, zip_longest
 from urllib.parse import urlencode
 
 import validators
@@ -26,7 +28,7 @@ from peewee import JOIN, BlobField
 from peewee import BooleanField as BooleanField_
 from peewee import (CharField, DateTimeField, DeferredRelation, Field, FixedCharField,
                     ForeignKeyField, IntegerField, Model, OperationalError, PostgresqlDatabase,
-                    SmallIntegerField, TextField, fn)
+                    SmallIntegerField, SqliteDatabase, TextField, fn)
 from peewee_validates import ModelValidator
 # from playhouse.reflection import Introspector
 from playhouse.shortcuts import model_to_dict
@@ -121,8 +123,12 @@ class NestedDict(dict):
         return d
 
 
+@lru_cache(maxsize=1024)
 def validate_orcid_id(value):
-    """Validate ORCID iD (both format and the check-sum)."""
+    """Validate ORCID iD (both format and the check-sum).
+
+    The valid values get cached: the same iDs get validated over and over, e.g., in a batch file.
+    """
     if not value:
         return
 
@@ -139,6 +145,16 @@ def validate_orcid_id(value):
         raise ValueError(f"Invalid ORCID iD {value} checksum. Make sure you have entered correct ORCID iD.")
 
 
+@lru_cache(maxsize=512)
+def country_code(value):
+    """Look up the ISO 3166-1 alpha-2 code of the country given by its name or code (case-insensitive).
+
+    The look-up with pycountry goes through all the countries, and the batch files repeat the same few
+    countries, so the codes get cached.
+    """
+    return countries.lookup(value).alpha_2
+
+
 def lazy_property(fn):
     """Make a property lazy-evaluated."""
     attr_name = '_lazy_' + fn.__name__
@@ -416,6 +432,49 @@ class BaseModel(Model):
             self.email = self.email.lower()
         return super().save(*args, **kwargs)
 
+    @classmethod
+    def bulk_insert(cls, rows, batch_size=1000):
+        """Insert the rows (dicts of the field values) with multi-row inserts of up to **batch_size** rows.
+
+        SQLite limits the number of query parameters to 999, so the batches get reduced accordingly.
+        With PostgreSQL the rows get streamed with COPY FROM STDIN.
+        """
+        if isinstance(cls._meta.database, PostgresqlDatabase):
+            return cls.copy_insert(rows)
+        if isinstance(cls._meta.database, SqliteDatabase):
+            batch_size = min(batch_size, max(1, 999 // len(cls._meta.fields)))
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            cls.insert_many(batch).execute()
+
+    @classmethod
+    def copy_insert(cls, rows):
+        """Insert the rows (dicts of the field values, all with the same fields) using PostgreSQL COPY.
+
+        The values get converted with the field DB value conversion and quoted, so that
+        only the unquoted empty values (None) get loaded as NULL.
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return
+        fields = [cls._meta.fields[name] for name in first]
+        column_list = ", ".join(f'"{f.db_column}"' for f in fields)
+
+        def quote(value):
+            return '' if value is None else '"' + str(value).replace('"', '""') + '"'
+
+        with tempfile.SpooledTemporaryFile(max_size=1 << 20, mode="w+", newline='') as data:
+            for r in chain([first], rows):
+                data.write(",".join(quote(f.db_value(r[f.name])) for f in fields) + "\n")
+            data.seek(0)
+            with cls._meta.database.get_cursor() as cr:
+                cr.copy_expert(
+                    f'COPY "{cls._meta.db_table}" ({column_list}) FROM STDIN WITH CSV', data)
+
     def add_status_line(self, line):
         """Add a text line to the status for logging processing progress."""
         ts = datetime.utcnow().isoformat(timespec="seconds")
@@ -689,8 +748,12 @@ class OrgInfo(BaseModel):
         table_alias = "oi"
 
     @classmethod
-    def load_from_csv(cls, source):
-        """Load data from CSV file or a string."""
+    def load_from_csv(cls, source, batch_size=1000):
+        """Load data from CSV file or a string.
+
+        The source gets read in chunks of **batch_size** rows. New entries get inserted
+        with a multi-row insert, the existing ones (matched by the name) get updated.
+        """
         if isinstance(source, str):
             source = StringIO(source, newline='')
         reader = csv.reader(source)
@@ -725,30 +788,81 @@ class OrgInfo(BaseModel):
                 v = row[idxs[i]].strip()
                 return None if v == '' else v
 
-        for row in reader:
-            # skip empty lines:
-            if not row or row is None or len(row) == 0 or (len(row) == 1 and row[0].strip() == ''):
-                continue
+        def parse(row):
+            """Map a CSV row to the model field values."""
+            return dict(
+                name=val(row, 0),
+                title=val(row, 1),
+                first_name=val(row, 2),
+                last_name=val(row, 3),
+                role=val(row, 4),
+                email=normalize_email(val(row, 5)),
+                phone=val(row, 6),
+                is_public=val(row, 7) and val(row, 7).upper() == "YES",
+                country=val(row, 8) or DEFAULT_COUNTRY,
+                city=val(row, 9),
+                disambiguated_id=val(row, 10),
+                disambiguation_source=val(row, 11),
+                tuakiri_name=val(row, 12))
+
+        # skip empty lines:
+        rows = (r for r in reader if r and not (len(r) == 1 and r[0].strip() == ''))
+
+        if isinstance(db, PostgresqlDatabase):
+            with db.atomic():
+                cls.copy_from(map(parse, rows))
+            return reader.line_num - 1
+
+        with db.atomic():
+            existing = {n for (n, ) in cls.select(cls.name).tuples()}
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                new_rows = {}
+                for data in map(parse, chunk):
+                    name = data["name"]
+                    if name in existing:
+                        cls.update(**data).where(cls.name == name).execute()
+                    else:
+                        new_rows[name] = data
+                cls.bulk_insert(new_rows.values(), batch_size)
+                existing.update(new_rows)
+
+        return reader.line_num - 1
 
-            name = val(row, 0)
-            oi, _ = cls.get_or_create(name=name)
+    @classmethod
+    def copy_from(cls, records):
+        """Upsert the records (dicts of the field values) using PostgreSQL COPY.
 
-            oi.title = val(row, 1)
-            oi.first_name = val(row, 2)
-            oi.last_name = val(row, 3)
-            oi.role = val(row, 4)
-            oi.email = normalize_email(val(row, 5))
-            oi.phone = val(row, 6)
-            oi.is_public = val(row, 7) and val(row, 7).upper() == "YES"
-            oi.country = val(row, 8) or DEFAULT_COUNTRY
-            oi.city = val(row, 9)
-            oi.disambiguated_id = val(row, 10)
-            oi.disambiguation_source = val(row, 11)
-            oi.tuakiri_name = val(row, 12)
+        The records get streamed into a temporary table with COPY FROM STDIN and merged
+        into the table with INSERT ... ON CONFLICT. If the same name occurs more than once,
+        the last record wins. Should be invoked within a transaction.
+        """
+        columns = [
+            "name", "title", "first_name", "last_name", "role", "email", "phone", "is_public",
+            "country", "city", "disambiguated_id", "disambiguation_source", "tuakiri_name"
+        ]
+        table = cls._meta.db_table
+        column_list = ", ".join(columns)
 
-            oi.save()
+        with tempfile.SpooledTemporaryFile(max_size=1 << 20, mode="w+", newline='') as data:
+            writer = csv.writer(data)
+            for line_no, r in enumerate(records):
+                writer.writerow([line_no] + [r[c] for c in columns])
+            data.seek(0)
 
-        return reader.line_num - 1
+            with db.get_cursor() as cr:
+                cr.execute(f"CREATE TEMPORARY TABLE {table}_load ON COMMIT DROP AS "
+                           f"SELECT 0 AS line_no, {column_list} FROM {table} WITH NO DATA")
+                cr.copy_expert(
+                    f"COPY {table}_load (line_no, {column_list}) FROM STDIN WITH CSV", data)
+                cr.execute(
+                    f"INSERT INTO {table} ({column_list}) "
+                    f"SELECT DISTINCT ON (name) {column_list} FROM {table}_load "
+                    "ORDER BY name, line_no DESC "
+                    "ON CONFLICT (name) DO UPDATE SET "
+                    + ", ".join(f"{c} = EXCLUDED.{c}" for c in columns[1:]))
 
 
 class User(BaseModel, UserMixin, AuditMixin):
@@ -1198,6 +1312,7 @@ class Task(BaseModel, AuditMixin):
         with db.atomic():
             try:
                 task = cls.create(org=org, filename=filename, task_type=TaskType.AFFILIATION)
+                records = []
                 for row_no, row in enumerate(reader):
                     # skip empty lines:
                     if len([item for item in row if item and item.strip()]) == 0:
@@ -1222,13 +1337,13 @@ class Task(BaseModel, AuditMixin):
 
                     if not email and not orcid and external_id and validators.email(external_id):
                         # if email is missing and external ID is given as a valid email, use it:
-                        email = external_id
+                        email = normalize_email(external_id)
 
                     # The uploaded country must be from ISO 3166-1 alpha-2
                     country = val(row, 11)
                     if country:
                         try:
-                            country = countries.lookup(country).alpha_2
+                            country = country_code(country)
                         except Exception:
                             raise ModelException(
                                 f" (Country must be 2 character from ISO 3166-1 alpha-2) in the row "
@@ -1292,7 +1407,12 @@ class Task(BaseModel, AuditMixin):
                     validator = ModelValidator(af)
                     if not validator.validate():
                         raise ModelException(f"Invalid record: {validator.errors}")
-                    af.save()
+                    records.append(af._data)
+
+                if records:
+                    AffiliationRecord.bulk_insert(records)
+                    task.updated_at = datetime.utcnow()
+                    task.save()
             except Exception:
                 db.rollback()
                 app.logger.exception("Failed to load affiliation file.")
@@ -1794,7 +1914,7 @@ class FundingRecord(RecordModel):
             country = val(row, 13)
             if country:
                 try:
-                    country = countries.lookup(country).alpha_2
+                    country = country_code(country)
                 except Exception:
                     raise ModelException(
                         f" (Country must be 2 character from ISO 3166-1 alpha-2) in the row "
@@ -1829,6 +1949,7 @@ class FundingRecord(RecordModel):
         with db.atomic():
             try:
                 task = Task.create(org=org, filename=filename, task_type=TaskType.FUNDING)
+                external_ids, invitees = [], []
                 for funding, records in groupby(rows, key=lambda row: row["funding"].items()):
                     records = list(records)
 
@@ -1841,8 +1962,7 @@ class FundingRecord(RecordModel):
                     for external_id in set(
                             tuple(r["external_id"].items()) for r in records
                             if r["external_id"]["type"] and r["external_id"]["value"]):
-                        ei = ExternalId(record=fr, **dict(external_id))
-                        ei.save()
+                        external_ids.append(ExternalId(record=fr, **dict(external_id))._data)
 
                     for invitee in set(
                             tuple(r["invitee"].items()) for r in records
@@ -1851,7 +1971,10 @@ class FundingRecord(RecordModel):
                         validator = ModelValidator(rec)
                         if not validator.validate():
                             raise ModelException(f"Invalid invitee record: {validator.errors}")
-                        rec.save()
+                        invitees.append(rec._data)
+
+                ExternalId.bulk_insert(external_ids)
+                FundingInvitee.bulk_insert(invitees)
 
                 return task
 
@@ -1874,7 +1997,7 @@ class FundingRecord(RecordModel):
             # Adding schema validation for funding
             validator = Core(
                 source_data=validation_source_data,
-                schema_files=[os.path.join(SCHEMA_DIR, "funding_schema.yaml")])
+                schema_data=load_schema("funding_schema.yaml"))
             validator.validate(raise_exception=True)
 
         with db.atomic():
@@ -2255,7 +2378,7 @@ class PeerReviewRecord(RecordModel):
             # The uploaded country must be from ISO 3166-1 alpha-2
             if convening_org_country:
                 try:
-                    convening_org_country = countries.lookup(convening_org_country).alpha_2
+                    convening_org_country = country_code(convening_org_country)
                 except Exception:
                     raise ModelException(
                         f" (Convening Org Country must be 2 character from ISO 3166-1 alpha-2) in the row "
@@ -2301,6 +2424,7 @@ class PeerReviewRecord(RecordModel):
         with db.atomic():
             try:
                 task = Task.create(org=org, filename=filename, task_type=TaskType.PEER_REVIEW)
+                external_ids, invitees = [], []
                 for peer_review, records in groupby(rows, key=lambda row: row["peer_review"].items()):
                     records = list(records)
 
@@ -2312,15 +2436,17 @@ class PeerReviewRecord(RecordModel):
 
                     for external_id in set(tuple(r["external_id"].items()) for r in records if
                                            r["external_id"]["type"] and r["external_id"]["value"]):
-                        ei = PeerReviewExternalId(record=prr, **dict(external_id))
-                        ei.save()
+                        external_ids.append(PeerReviewExternalId(record=prr, **dict(external_id))._data)
 
                     for invitee in set(tuple(r["invitee"].items()) for r in records if r["invitee"]["email"]):
                         rec = PeerReviewInvitee(record=prr, **dict(invitee))
                         validator = ModelValidator(rec)
                         if not validator.validate():
                             raise ModelException(f"Invalid invitee record: {validator.errors}")
-                        rec.save()
+                        invitees.append(rec._data)
+
+                PeerReviewExternalId.bulk_insert(external_ids)
+                PeerReviewInvitee.bulk_insert(invitees)
 
                 return task
 
@@ -2350,7 +2476,7 @@ class PeerReviewRecord(RecordModel):
 
                 validator = Core(
                     source_data=validation_source_data,
-                    schema_files=[os.path.join(SCHEMA_DIR, "peer_review_schema.yaml")])
+                    schema_data=load_schema("peer_review_schema.yaml"))
                 validator.validate(raise_exception=True)
 
             try:
@@ -2712,7 +2838,7 @@ class PropertyRecord(RecordModel):
                         # The uploaded country must be from ISO 3166-1 alpha-2
                         if value:
                             try:
-                                value = countries.lookup(value).alpha_2
+                                value = country_code(value)
                             except Exception:
                                 raise ModelException(
                                     f" (Country must be 2 character from ISO 3166-1 alpha-2) in the row "
@@ -2815,7 +2941,7 @@ class PropertyRecord(RecordModel):
                         # The uploaded country must be from ISO 3166-1 alpha-2
                         if value:
                             try:
-                                value = countries.lookup(value).alpha_2
+                                value = country_code(value)
                             except Exception:
                                 raise ModelException(
                                     f"(Country {value} must be 2 character from ISO 3166-1 alpha-2): {r}.")
@@ -3013,7 +3139,7 @@ class WorkRecord(RecordModel):
             country = val(row, 13)
             if country:
                 try:
-                    country = countries.lookup(country).alpha_2
+                    country = country_code(country)
                 except Exception:
                     raise ModelException(
                         f" (Country must be 2 character from ISO 3166-1 alpha-2) in the row "
@@ -3055,6 +3181,7 @@ class WorkRecord(RecordModel):
         with db.atomic():
             try:
                 task = Task.create(org=org, filename=filename, task_type=TaskType.WORK)
+                external_ids, invitees = [], []
                 for work, records in groupby(rows, key=lambda row: row["work"].items()):
                     records = list(records)
 
@@ -3067,8 +3194,7 @@ class WorkRecord(RecordModel):
                     for external_id in set(
                             tuple(r["external_id"].items()) for r in records
                             if r["external_id"]["type"] and r["external_id"]["value"]):
-                        ei = WorkExternalId(record=wr, **dict(external_id))
-                        ei.save()
+                        external_ids.append(WorkExternalId(record=wr, **dict(external_id))._data)
 
                     for invitee in set(
                             tuple(r["invitee"].items()) for r in records
@@ -3077,7 +3203,10 @@ class WorkRecord(RecordModel):
                         validator = ModelValidator(rec)
                         if not validator.validate():
                             raise ModelException(f"Invalid invitee record: {validator.errors}")
-                        rec.save()
+                        invitees.append(rec._data)
+
+                WorkExternalId.bulk_insert(external_ids)
+                WorkInvitee.bulk_insert(invitees)
 
                 return task
 
@@ -3105,7 +3234,7 @@ class WorkRecord(RecordModel):
                 # Adding schema validation for Work
                 validator = Core(
                     source_data=validation_source_data,
-                    schema_files=[os.path.join(SCHEMA_DIR, "work_schema.yaml")])
+                    schema_data=load_schema("work_schema.yaml"))
                 validator.validate(raise_exception=True)
 
             try:
@@ -3898,6 +4027,13 @@ def load_yaml_json(filename=None, source=None, content_type=None):
     return data
 
 
+@lru_cache(maxsize=32)
+def load_schema(filename):
+    """Load a validation schema from the schema directory (cached, so it's read only once)."""
+    with open(os.path.join(SCHEMA_DIR, filename)) as f:
+        return yaml.safe_load(f)
+
+
 def del_none(d):
     """
     Delete keys with the value ``None`` in a dictionary, recursively.
@@ -23,7 +23,6 @@ from html2text import html2text
 from jinja2 import Template
 from orcid_api.rest import ApiException
 from peewee import JOIN, SQL
-from yaml.dumper import Dumper
 from yaml.representer import SafeRepresenter
 
 from . import app, db, orcid_client, rq
@@ -2130,11 +2129,17 @@ class SafeRepresenterWithISODate(SafeRepresenter):
         return self.represent_scalar('tag:yaml.org,2002:timestamp', value)
 
 
+class YamlDumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):
+    """Safe YAML dumper (libyaml based, if PyYAML was built with it) with the Hub's representers."""
+
+
+YamlDumper.add_representer(datetime, SafeRepresenterWithISODate.represent_datetime)
+YamlDumper.add_representer(defaultdict, SafeRepresenter.represent_dict)
+
+
 def dump_yaml(data):
     """Dump the objects into YAML representation."""
-    yaml.add_representer(datetime, SafeRepresenterWithISODate.represent_datetime, Dumper=Dumper)
-    yaml.add_representer(defaultdict, SafeRepresenter.represent_dict)
-    return yaml.dump(data)
+    return yaml.dump(data, Dumper=YamlDumper)
 
 
 def enqueue_user_records(user):
@@ -2215,17 +2220,17 @@ def reset_all_records(task):
                         task.record_model.is_active == True).execute()  # noqa: E712
 
             else:
-                for record in task.records.where(
-                        task.record_model.is_active == True):  # noqa: E712
-                    record.processed_at = None
-                    record.status = status
-
-                    invitee_class = record.invitees.model_class
-                    invitee_class.update(
-                        processed_at=None,
-                        status=status).where(invitee_class.record == record.id).execute()
-                    record.save()
-                    count = count + 1
+                record_model = task.record_model
+                active_records = record_model.select(record_model.id).where(
+                    record_model.task_id == task.id,
+                    record_model.is_active == True)  # noqa: E712
+                invitee_class = record_model.invitees.rel_model
+                invitee_class.update(
+                    processed_at=None,
+                    status=status).where(invitee_class.record << active_records).execute()
+                count = record_model.update(
+                    processed_at=None, status=status).where(record_model.id << active_records).execute()
+                task.updated_at = datetime.utcnow()
 
             UserInvitation.delete().where(UserInvitation.task == task).execute()
             enqueue_task_records(task)
@@ -18,7 +18,11 @@ export RQ_ASYNC=0
 export RQ_CONNECTION_CLASS=fakeredis.FakeStrictRedis
 
 [[ $@ ==  *tests* || $@ == *test*.py* ]] || dest=tests
-pytest --ignore=venv --ignore=orcid_api -v --cov-config .coveragerc  --cov . $dest $@
+# the test modules get distributed among the workers (pytest-xdist),
+# leaving two cores for the rest of the system; a single worker only adds overhead:
+workers=$(nproc --ignore=2)
+[ $workers -gt 1 ] && xdist="-n $workers --dist=loadscope"
+pytest --ignore=venv --ignore=orcid_api -v $xdist --cov-config .coveragerc  --cov . $dest $@
 
 # once tests are done, generate the coverage report in XML format
 coverage report XML
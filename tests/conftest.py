@@ -9,12 +9,19 @@ import os
 import sys
 import logging
 from datetime import datetime
+import flask_login
 from flask_login import logout_user
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # flake8: noqa
 from orcid_hub import config
+# pytest-xdist worker ID (e.g., 'gw0'), each worker has its own in-memory DB:
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", '')
 DATABASE_URL = os.environ.get("TEST_DATABASE_URL") or "sqlite:///:memory:"
+if WORKER_ID and DATABASE_URL.startswith("sqlite:///") and DATABASE_URL != "sqlite:///:memory:":
+    # a SQLite database file per worker, e.g., 'test.db' -> 'test_gw0.db':
+    name, ext = os.path.splitext(DATABASE_URL)
+    DATABASE_URL = f"{name}_{WORKER_ID}{ext}"
 config.DATABASE_URL = DATABASE_URL
 config.RQ_CONNECTION_CLASS = "fakeredis.FakeStrictRedis"
 os.environ["DATABASE_URL"] = DATABASE_URL
@@ -31,14 +38,19 @@ import pytest
 from playhouse import db_url
 from playhouse.test_utils import test_database
 
-from orcid_hub import app as _app, models, views
+from orcid_hub import app as _app, models, schedule, views
 _app.config["DATABASE_URL"] = DATABASE_URL
 from orcid_hub.models import *  # noqa: F401, F403
 from orcid_hub.authcontroller import *  # noqa: F401, F403
 from orcid_hub.views import *  # noqa: F401, F403
 from orcid_hub.reports import *  # noqa: F401, F403
 
-db = _app.db = _db = db_url.connect(DATABASE_URL, autorollback=True)
+from tests.utils import SQLITE_PRAGMAS, dump_seeded_data, restore_seeded_data
+
+db = _app.db = _db = db_url.connect(
+    DATABASE_URL,
+    autorollback=True,
+    **(dict(pragmas=SQLITE_PRAGMAS) if DATABASE_URL.startswith("sqlite") else {}))
 
 ORCIDS = [
     "1009-2009-3009-00X3", "1017-2017-3017-00X3", "1025-2025-3025-00X3", "1033-2033-3033-00X3",
@@ -67,6 +79,11 @@ ORCIDS = [
 ]
 
 
+# Flask-Login 0.5 renamed the session key of the logged in user ID:
+FLASK_LOGIN_USER_ID_KEY = (
+    "_user_id" if tuple(map(int, flask_login.__version__.split(".")[:2])) >= (0, 5) else "user_id")
+
+
 class HubClient(FlaskClient):
     """Extension of the default Flask test client."""
 
@@ -116,7 +133,7 @@ class HubClient(FlaskClient):
                 ext = "yaml"
             elif "csv" in content_type:
                 ext = "csv"
-        with open(f"output{self.resp_no:02d}.{ext}", "wb") as output:
+        with open(f"output{WORKER_ID}{self.resp_no:02d}.{ext}", "wb") as output:
             output.write(self.resp.data)
 
     def logout(self, follow_redirects=True):
@@ -126,6 +143,12 @@ class HubClient(FlaskClient):
         self.cookie_jar.clear()
         return resp
 
+    def switch_user(self, user):
+        """Switch the logged in user by setting the session directly, without the login view."""
+        with self.session_transaction() as sess:
+            sess[FLASK_LOGIN_USER_ID_KEY] = user.get_id()
+            sess["_fresh"] = True
+
     def login_root(self):
         """Log in with the first found Hub admin user."""
         root = User.select().where(User.roles.bin_and(Role.SUPERUSER)).first()
@@ -151,26 +174,200 @@ def no_mailing(mocker):
     yield mocker.patch("emails.html")
 
 
+APP_MODELS = (
+    File, Organisation, User, UserOrg, OrcidToken, OrcidApiCall, UserOrgAffiliation, OrgInfo, Task,
+    Log, AffiliationRecord, FundingRecord, FundingContributor, FundingInvitee, GroupIdRecord,
+    OrcidAuthorizeCall, Url, UserInvitation, OrgInvitation, ExternalId, Client, Grant,
+    Token, WorkRecord, WorkContributor, WorkExternalId, WorkInvitee, PeerReviewRecord,
+    PeerReviewInvitee, PeerReviewExternalId, PropertyRecord, OtherIdRecord)  # noqa: F405
+
+
+def seed_app_data():
+    """Populate the test DB with the organisations, the users and the tokens used by the tests."""
+    for org_no in range(2):
+        org = Organisation.create(name=f"TEST{org_no}", tuakiri_name=f"TEST ORG #{org_no}")
+        User.create(
+            created_at=datetime(2017, 11, 16),
+            email=f"researcher_across_orgs@test{org_no}.edu",
+            name="TEST USER ACROSS ORGS",
+            first_name="FIRST_NAME",
+            last_name="LAST_NAME",
+            roles=Role.RESEARCHER,
+            orcid="1981-2981-3981-00X3",
+            confirmed=True,
+            organisation=org)
+        if org_no == 1:
+            org.orcid_client_id = "ABC123"
+            org.orcid_secret = "SECRET-12345"
+            org.save()
+        # An org.admin
+        user = User.create(
+            created_at=datetime(2017, 11, 28),
+            email=f"admin@test{org_no}.edu",
+            name=f"TEST ORG #{org_no} ADMIN",
+            first_name="FIRST_NAME",
+            last_name="LAST_NAME",
+            can_use_api=(org_no == 0),
+            confirmed=True,
+            organisation=org)
+        UserOrg.create(user=user, org=org, is_admin=True)
+        org.tech_contact = user
+        org.save()
+        if org_no == 0:
+            test0_org, test0_admin = org, user
+        # Hub admin:
+        User.create(
+            created_at=datetime(2017, 11, 27),
+            email=f"root@test{org_no}.edu",
+            name="TEST HUB ADMIN",
+            first_name="FIRST_NAME",
+            last_name="LAST_NAME",
+            roles=Role.SUPERUSER,
+            confirmed=True,
+            organisation=org)
+        User.insert_many(
+            dict(
+                email=f"researcher{i}@test{org_no}.edu",
+                name=f"TEST RESEARCHER #{i} OF {org_no} ",
+                first_name=f"FIRST_NAME #{i}",
+                last_name=f"LAST_NAME #{i}",
+                orcid=ORCIDS[org_no * 10 + i - 100] if (org_no * 10 + i) % 2 else None,
+                confirmed=True,
+                organisation=org,
+                created_at=datetime(2017, 12, i % 31 + 1)) for i in range(100, 107)).execute()
+        OrcidToken.insert_many(
+            dict(
+                access_token=f"TOKEN-{org_no}-{u.id}",
+                scopes="/read-limited,/activities/update",
+                org=org,
+                user=u,
+                expires_in=0,
+                created_at=datetime(2018, 1, 1)) for u in User.select(User.id)
+            if u.id % 2 == 0).execute()
+        if org_no == 0:
+            Client.create(
+                org=org,
+                user=user,
+                client_id=org.name + "-ID",
+                client_secret=org.name + "-SECRET")
+
+    UserOrg.insert_from(
+        query=User.select(User.id, User.organisation_id, User.created_at, SQL('0')).where(
+            User.email.contains("researcher")),
+        fields=[UserOrg.user_id, UserOrg.org_id, UserOrg.created_at,
+                UserOrg.affiliations]).execute()
+
+    org = Organisation.create(
+        name="THE ORGANISATION",
+        tuakiri_name="THE ORGANISATION",
+        orcid_client_id="APP-12345678",
+        orcid_secret="CLIENT-SECRET",
+        confirmed=True,
+        city="CITY",
+        country="NZ")
+
+    admin = User.create(
+        email="app123@test0.edu",
+        name="TEST USER WITH AN APP",
+        roles=Role.TECHNICAL,
+        orcid="1001-0001-0001-0001",
+        confirmed=True,
+        organisation=org)
+    tech_contact = admin
+
+    UserOrg.create(user=admin, org=org, is_admin=True)
+    org.tech_contact = admin
+    org.save()
+
+    client = Client.create(
+        name="TEST_CLIENT",
+        user=admin,
+        org=org,
+        client_id="CLIENT_ID",
+        client_secret="CLIENT_SECRET",
+        is_confidential="public",
+        grant_type="client_credentials",
+        response_type="XYZ")
+
+    Token.create(client=client, user=admin, access_token="TEST", token_type="Bearer")
+
+    user = User.create(
+        email="researcher@test0.edu",
+        eppn="eppn@test0.edu",
+        name="TEST REASEARCHER",
+        first_name="FN",
+        last_name="LN",
+        orcid="0000-0000-0000-00X3",
+        confirmed=True,
+        organisation=org)
+    OrcidToken.create(user=user,
+                      org=org,
+                      scopes="/read-limited,/activities/update",
+                      access_token="ORCID-TEST-ACCESS-TOKEN")
+    UserOrg.create(user=user, org=org)
+
+    User.insert_many(
+        dict(
+            email=f"researcher{i}@test0.edu",
+            name=f"TEST RESEARCHER #{i}",
+            first_name=f"FIRST_NAME #{i}",
+            last_name=f"LAST_NAME #{i}",
+            confirmed=True,
+            organisation=org,
+            created_at=datetime(2017, 12, i % 31 + 1),
+            updated_at=datetime(2017, 12, i % 31 + 1)) for i in range(200, 207)).execute()
+
+    User.create(
+        email="researcher2@test0.edu",
+        eppn="eppn2@test0.edu",
+        name="TEST REASEARCHER W/O ORCID ACCESS TOKEN",
+        orcid="0000-0000-0000-11X2",
+        confirmed=True,
+        organisation=org)
+
+    org2 = Organisation.create(
+        name="THE ORGANISATION #2",
+        tuakiri_name="THE ORGANISATION #2",
+        confirmed=True,
+        city="CITY")
+    User.create(
+        email="researcher@org2.edu",
+        eppn="eppn123@org2.edu",
+        name="TEST REASEARCHER #2",
+        orcid="9999-9999-9999-9999",
+        confirmed=True,
+        organisation=org2)
+    super_user = User.create(
+        email="super_user@test0.edu", organisation=org, roles=Role.SUPERUSER, confirmed=True)
+
+    return locals()
+
+
+@pytest.fixture(scope="session")
+def app_data_snapshot():
+    """Seed a test DB once and dump its content as an SQL script (INSERT statements).
+
+    Returns the script and the model classes and IDs of the created objects.
+    """
+    with _app.app_context():
+        snapshot, data = dump_seeded_data(APP_MODELS, seed_app_data)
+    return snapshot, {k: (type(v), v.id) for k, v in data.items() if isinstance(v, Model)}
+
+
 @pytest.fixture
-def app():
+def app(request):
     """Session-wide test `Flask` application."""
     # Establish an application context before running the tests.
     ctx = _app.app_context()
     ctx.push()
+    # the tests change the configuration (e.g., SERVER_NAME), it gets restored after each test:
+    config = _app.config.copy()
     _app.config['TESTING'] = True
     logger = logging.getLogger("peewee")
     if logger:
         logger.setLevel(logging.INFO)
 
-    with test_database(
-            _db,
-        (File, Organisation, User, UserOrg, OrcidToken, OrcidApiCall, UserOrgAffiliation, OrgInfo, Task, Log,
-         AffiliationRecord, FundingRecord, FundingContributor, FundingInvitee, GroupIdRecord,
-         OrcidAuthorizeCall, OrcidApiCall, Url, UserInvitation, OrgInvitation, ExternalId, Client,
-         Grant, Token, WorkRecord, WorkContributor, WorkExternalId, WorkInvitee, PeerReviewRecord,
-         PeerReviewInvitee, PeerReviewExternalId, PropertyRecord, OrcidApiCall,
-         OtherIdRecord),
-            fail_silently=True):  # noqa: F405
+    with test_database(_db, APP_MODELS, fail_silently=True):
         _app.db = models.db = views.db = _db
         _app.config["DATABASE_URL"] = DATABASE_URL
         _app.config["EXTERNAL_SP"] = None
@@ -178,171 +375,33 @@ def app():
         _app.config["WTF_CSRF_ENABLED"] = False
         _app.config["DEBUG_TB_ENABLED"] = False
         _app.config["LOAD_TEST"] = True
+        # the templates do not change during the test run, no need to check their mtime:
+        _app.config["TEMPLATES_AUTO_RELOAD"] = False
+        _app.jinja_env.auto_reload = False
         #_app.config["SERVER_NAME"] = "ORCIDHUB"
         _app.sentry = None
         _app.config["RQ_CONNECTION_CLASS"] = "fakeredis.FakeStrictRedis"
         _app.extensions["rq2"].init_app(_app)
-
-        # Add some data:
-        for org_no in range(2):
-            org = Organisation.create(name=f"TEST{org_no}", tuakiri_name=f"TEST ORG #{org_no}")
-            User.create(
-                created_at=datetime(2017, 11, 16),
-                email=f"researcher_across_orgs@test{org_no}.edu",
-                name="TEST USER ACROSS ORGS",
-                first_name="FIRST_NAME",
-                last_name="LAST_NAME",
-                roles=Role.RESEARCHER,
-                orcid="1981-2981-3981-00X3",
-                confirmed=True,
-                organisation=org)
-            if org_no == 1:
-                org.orcid_client_id = "ABC123"
-                org.orcid_secret = "SECRET-12345"
-                org.save()
-            # An org.admin
-            user = User.create(
-                created_at=datetime(2017, 11, 28),
-                email=f"admin@test{org_no}.edu",
-                name=f"TEST ORG #{org_no} ADMIN",
-                first_name="FIRST_NAME",
-                last_name="LAST_NAME",
-                can_use_api=(org_no == 0),
-                confirmed=True,
-                organisation=org)
-            UserOrg.create(user=user, org=org, is_admin=True)
-            org.tech_contact = user
-            org.save()
-            # Hub admin:
-            User.create(
-                created_at=datetime(2017, 11, 27),
-                email=f"root@test{org_no}.edu",
-                name="TEST HUB ADMIN",
-                first_name="FIRST_NAME",
-                last_name="LAST_NAME",
-                roles=Role.SUPERUSER,
-                confirmed=True,
-                organisation=org)
-            User.insert_many(
-                dict(
-                    email=f"researcher{i}@test{org_no}.edu",
-                    name=f"TEST RESEARCHER #{i} OF {org_no} ",
-                    first_name=f"FIRST_NAME #{i}",
-                    last_name=f"LAST_NAME #{i}",
-                    orcid=ORCIDS[org_no * 10 + i - 100] if (org_no * 10 + i) % 2 else None,
-                    confirmed=True,
-                    organisation=org,
-                    created_at=datetime(2017, 12, i % 31 + 1)) for i in range(100, 107)).execute()
-            OrcidToken.insert_many(
-                dict(
-                    access_token=f"TOKEN-{org_no}-{u.id}",
-                    scopes="/read-limited,/activities/update",
-                    org=org,
-                    user=u,
-                    expires_in=0,
-                    created_at=datetime(2018, 1, 1)) for u in User.select(User.id)
-                if u.id % 2 == 0).execute()
-            if org_no == 0:
-                Client.create(
-                    org=org,
-                    user=user,
-                    client_id=org.name + "-ID",
-                    client_secret=org.name + "-SECRET")
-
-        UserOrg.insert_from(
-            query=User.select(User.id, User.organisation_id, User.created_at, SQL('0')).where(
-                User.email.contains("researcher")),
-            fields=[UserOrg.user_id, UserOrg.org_id, UserOrg.created_at,
-                    UserOrg.affiliations]).execute()
+        # the fake Redis is shared by all the tests of the process, so the jobs queued or
+        # scheduled by a test get wiped and the application schedule gets set up anew:
+        _app.extensions["rq2"].connection.flushall()
+        schedule.setup()
+
+        if DATABASE_URL.startswith("sqlite"):
+            # restore the data seeded once per session; the objects get re-read,
+            # so that the changes made by a test do not leak into the next one:
+            snapshot, ids = request.getfixturevalue("app_data_snapshot")
+            restore_seeded_data(_db, snapshot)
+            _app.data = {k: model.get(id=id) for k, (model, id) in ids.items()}
+        else:
+            _app.data = seed_app_data()
 
         _app.test_client_class = HubClient
-        org = Organisation.create(
-            name="THE ORGANISATION",
-            tuakiri_name="THE ORGANISATION",
-            orcid_client_id="APP-12345678",
-            orcid_secret="CLIENT-SECRET",
-            confirmed=True,
-            city="CITY",
-            country="NZ")
-
-        admin = User.create(
-            email="app123@test0.edu",
-            name="TEST USER WITH AN APP",
-            roles=Role.TECHNICAL,
-            orcid="1001-0001-0001-0001",
-            confirmed=True,
-            organisation=org)
-        tech_contact = admin
-
-        UserOrg.create(user=admin, org=org, is_admin=True)
-        org.tech_contact = admin
-        org.save()
-        request_ctx.org = org
-
-        client = Client.create(
-            name="TEST_CLIENT",
-            user=admin,
-            org=org,
-            client_id="CLIENT_ID",
-            client_secret="CLIENT_SECRET",
-            is_confidential="public",
-            grant_type="client_credentials",
-            response_type="XYZ")
-
-        Token.create(client=client, user=admin, access_token="TEST", token_type="Bearer")
-
-        user = User.create(
-            email="researcher@test0.edu",
-            eppn="eppn@test0.edu",
-            name="TEST REASEARCHER",
-            first_name="FN",
-            last_name="LN",
-            orcid="0000-0000-0000-00X3",
-            confirmed=True,
-            organisation=org)
-        OrcidToken.create(user=user,
-                          org=org,
-                          scopes="/read-limited,/activities/update",
-                          access_token="ORCID-TEST-ACCESS-TOKEN")
-        UserOrg.create(user=user, org=org)
-
-        User.insert_many(
-            dict(
-                email=f"researcher{i}@test0.edu",
-                name=f"TEST RESEARCHER #{i}",
-                first_name=f"FIRST_NAME #{i}",
-                last_name=f"LAST_NAME #{i}",
-                confirmed=True,
-                organisation=org,
-                created_at=datetime(2017, 12, i % 31 + 1),
-                updated_at=datetime(2017, 12, i % 31 + 1)) for i in range(200, 207)).execute()
-
-        User.create(
-            email="researcher2@test0.edu",
-            eppn="eppn2@test0.edu",
-            name="TEST REASEARCHER W/O ORCID ACCESS TOKEN",
-            orcid="0000-0000-0000-11X2",
-            confirmed=True,
-            organisation=org)
-
-        org2 = Organisation.create(
-            name="THE ORGANISATION #2",
-            tuakiri_name="THE ORGANISATION #2",
-            confirmed=True,
-            city="CITY")
-        User.create(
-            email="researcher@org2.edu",
-            eppn="eppn123@org2.edu",
-            name="TEST REASEARCHER #2",
-            orcid="9999-9999-9999-9999",
-            confirmed=True,
-            organisation=org2)
-        super_user = User.create(
-            email="super_user@test0.edu", organisation=org, roles=Role.SUPERUSER, confirmed=True)
-
-        _app.data = locals()
+        request_ctx.org = _app.data["org"]
         yield _app
 
+    _app.config.clear()
+    _app.config.update(config)
     ctx.pop()
 
 
@@ -357,6 +416,33 @@ def client(app):
     client.logout()
 
 
+@pytest.fixture
+def test0_org(app):
+    """The organisation "TEST0" (created by the app fixture, so no look-up is needed)."""
+    return app.data["test0_org"]
+
+
+@pytest.fixture
+def test0_admin(app):
+    """The admin of the organisation "TEST0" (admin@test0.edu)."""
+    return app.data["test0_admin"]
+
+
+@pytest.fixture
+def admin_user(app):
+    """A technical contact and an admin of the test organisation ("THE ORGANISATION")."""
+    org = app.data["org"]
+    user = User.create(
+        email="test123@test.test.net",
+        name="TEST USER",
+        roles=Role.TECHNICAL,
+        orcid="123",
+        confirmed=True,
+        organisation=org)
+    UserOrg.create(user=user, org=org, is_admin=True)
+    return user
+
+
 @pytest.fixture
 def request_ctx(app):
     """Request context creator."""
@@ -722,7 +722,7 @@ def get_record_mock(self, orcid=None, **kwargs):
 
 def test_orcid_login_callback_admin_flow(mocker, client):
     """Test login from orcid callback function for Organisation Technical contact."""
-    mocker.patch("orcid_hub.OAuth2Session.fetch_token", side_effect=fetch_token_mock)
+    mocker.patch("orcid_hub.authcontroller.OAuth2Session.fetch_token", side_effect=fetch_token_mock)
     mocker.patch("orcid_hub.orcid_client.MemberAPIV20Api.view_emails", side_effect=get_record_mock)
     org = Organisation.create(
         name="THE ORGANISATION:test_orcid_login_callback_admin_flow",
@@ -820,7 +820,7 @@ def affiliation_mock(
 
 def test_orcid_login_callback_researcher_flow(client, mocker):
     """Test login from orcid callback function for researcher and display profile."""
-    fetch_token = mocker.patch("orcid_hub.OAuth2Session.fetch_token", side_effect=fetch_token_mock)
+    fetch_token = mocker.patch("orcid_hub.authcontroller.OAuth2Session.fetch_token", side_effect=fetch_token_mock)
     mocker.patch("orcid_hub.orcid_client.MemberAPI.create_or_update_affiliation",
                  side_effect=affiliation_mock)
     org = Organisation.create(
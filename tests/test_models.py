@@ -5,6 +5,7 @@ from io import StringIO
 from itertools import product
 
 import pytest
+import yaml
 from peewee import Model, SqliteDatabase
 from playhouse.test_utils import test_database
 
@@ -15,7 +16,8 @@ from orcid_hub.models import (
     Organisation, OrgInfo, OrcidApiCall, PartialDate, PartialDateField, PropertyRecord, PeerReviewExternalId,
     PeerReviewInvitee, PeerReviewRecord, Role, Task, TaskType, TaskTypeField,
     TextField, User, UserInvitation, UserOrg, UserOrgAffiliation, WorkContributor, WorkExternalId,
-    WorkInvitee, WorkRecord, app, create_tables, drop_tables, load_yaml_json, validate_orcid_id)
+    WorkInvitee, WorkRecord, app, create_tables, drop_tables, load_schema, load_yaml_json,
+    validate_orcid_id)
 
 
 @pytest.fixture
@@ -588,6 +590,17 @@ Institute of Geological & Nuclear Sciences Ltd,5180,RINGGOLD
 """))
     assert OrgInfo.select().count() == 15
 
+    OrgInfo.load_from_csv(
+        "Name,Disambiguated Identifier,Disambiguation Source\n"
+        "CRL Energy Ltd,8888,NZBN\n"
+        "Landcare Research,2243,RINGGOLD\n"
+        "Lincoln University,1234,RINGGOLD\n"
+        "Massey University,6895,RINGGOLD\n",
+        batch_size=2)
+    assert OrgInfo.select().count() == 18
+    assert OrgInfo.get(name="CRL Energy Ltd").disambiguated_id == "8888"
+    assert OrgInfo.get(name="Massey University").disambiguated_id == "6895"
+
 
 def test_affiliations(models):
     assert Affiliation.EDU == "EDU"
@@ -628,6 +641,19 @@ FNB	LNB	b.b@test.com	TEST0	Science and Education Group	Wellington	Manager Specia
     ) == test.record_count + 10  # The 10 value is from already inserted entries.
 
 
+def test_load_task_from_csv_external_id_email(models):
+    org = Organisation.create(name="TEST0")
+    task = Task.load_from_csv(
+        "First name,Last name,Email,External Identifier,Affiliation Type\n"
+        "FN,LN,,Mixed.Case@Test.EDU,Staff\n",
+        filename="TEST.csv",
+        org=org)
+    assert task.records.count() == 1
+    rec = task.records.first()
+    assert rec.email == "mixed.case@test.edu"
+    assert rec.external_id == "Mixed.Case@Test.EDU"
+
+
 def test_work_task(models):
     org = Organisation.select().first()
     raw_data0 = open(os.path.join(os.path.dirname(__file__), "data", "example_works.json"), "r").read()
@@ -647,6 +673,11 @@ def test_work_task(models):
         del(data[a])
     assert data == export
 
+    # the schema gets loaded once and it's not altered by the validation:
+    assert load_schema("work_schema.yaml") is load_schema("work_schema.yaml")
+    with open(os.path.join(os.path.dirname(__file__), "..", "schemas", "work_schema.yaml")) as f:
+        assert load_schema("work_schema.yaml") == yaml.safe_load(f)
+
 
 def test_is_superuser():
     su = User(roles=Role.SUPERUSER)
@@ -7,9 +7,12 @@ from io import BytesIO
 from itertools import groupby
 import random
 import string
+from collections import defaultdict
+from datetime import datetime
 from unittest.mock import Mock, patch
 
 import pytest
+import yaml
 from flask import make_response
 from peewee import JOIN
 from urllib.parse import quote
@@ -45,6 +48,17 @@ def test_append_qs():
         "https://abc.com/bar?p=foo", p2="A&B&C D") == "https://abc.com/bar?p=foo&p2=A%26B%26C+D"
 
 
+def test_dump_yaml():
+    """Test YAML dumping with the ISO dates, leaving the PyYAML safe dumpers unchanged."""
+    assert utils.dump_yaml({"at": datetime(2019, 1, 2, 3, 4, 5, 6)}) == "at: 2019-01-02T03:04:05\n"
+    assert utils.dump_yaml(defaultdict(int, a=1)) == "a: 1\n"
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    assert yaml.dump({"at": datetime(2019, 1, 2, 3, 4, 5, 6)},
+                     Dumper=dumper) == "at: 2019-01-02 03:04:05.000006\n"
+    with pytest.raises(yaml.representer.RepresenterError):
+        yaml.dump(defaultdict(int, a=1), Dumper=dumper)
+
+
 def test_track_event(client, mocker):
     """Test to track event."""
     category = "test"
@@ -8,16 +8,20 @@ import os
 import re
 import sys
 import time
+from collections import namedtuple
+from functools import lru_cache
 from io import BytesIO
 from itertools import product
+from types import SimpleNamespace
 from unittest.mock import MagicMock, Mock, patch
 from urllib.parse import parse_qs, quote, urlparse
 
 import pytest
 import yaml
-from flask import make_response, session
+from flask import make_response, session, url_for
 from flask_login import login_user
-from peewee import SqliteDatabase, JOIN
+from peewee import SqliteDatabase, JOIN, fn
+from playhouse.shortcuts import case
 from playhouse.test_utils import test_database
 
 from orcid_api.rest import ApiException
@@ -29,43 +33,61 @@ from orcid_hub.models import (Affiliation, AffiliationRecord, Client, File, Fund
                               OrgInvitation, PartialDate, PeerReviewRecord, PropertyRecord,
                               Role, Task, TaskType, Token, Url, User, UserInvitation, UserOrg,
                               UserOrgAffiliation, WorkRecord)
-from tests.utils import get_profile
+from tests.utils import (SQLITE_PRAGMAS, create_user_with_org, dump_seeded_data, get_profile,
+                         restore_seeded_data)
 
 fake_time = time.time()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 logger.addHandler(logging.StreamHandler())
 
+TASK_ID_RE = re.compile(r"/admin/affiliationrecord/\?task_id=(\d+)")
+AUTH_URL_RE = re.compile(r"window.location='([^']*)'")
+EXPORT_TYPES = ["csv", "xls", "tsv", "yaml", "json", "xlsx", "ods", "html"]
+CONTENT_DISPOSITION_RES = {
+    export_type: re.compile(rf"attachment;filename=affiliations_20.*\.{export_type}")
+    for export_type in EXPORT_TYPES
+}
+
+TEST_MODELS = (
+    Organisation,
+    User,
+    UserOrg,
+    OrcidToken,
+    UserOrgAffiliation,
+    Task,
+    AffiliationRecord,
+)
+
+
+_test_db = SqliteDatabase(":memory:", pragmas=SQLITE_PRAGMAS)
+
+
+@pytest.fixture(autouse=True, scope="module")
+def silence_sentry():
+    """Prevent the error reports of the tests from being sent to Sentry."""
+    with patch("sentry_sdk.transport.HttpTransport.capture_event"):
+        yield
+
 
 @pytest.fixture
 def test_db():
     """Test to check db."""
-    _db = SqliteDatabase(":memory:")
-    with test_database(
-            _db, (
-                Organisation,
-                User,
-                UserOrg,
-                OrcidToken,
-                UserOrgAffiliation,
-                Task,
-                AffiliationRecord,
-            ),
-            fail_silently=True) as _test_db:
-        yield _test_db
+    _db = _test_db
+    with test_database(_db, TEST_MODELS, fail_silently=True):
+        yield _db
 
     return
 
 
-@pytest.fixture
-def test_models(test_db):
-    """Test to check models."""
+def seed_test_models():
+    """Populate the test models with a fixed data set."""
     Organisation.insert_many((dict(
         name="Organisation #%d" % i,
         tuakiri_name="Organisation #%d" % i,
         orcid_client_id="client-%d" % i,
         orcid_secret="secret-%d" % i,
-        confirmed=(i % 2 == 0)) for i in range(10))).execute()
+        confirmed=(i % 2 == 0)) for i in range(10)), validate_fields=False).execute()
 
     User.insert_many((dict(
         name="Test User #%d" % i,
@@ -74,32 +96,94 @@ def test_models(test_db):
         email="user%d@org%d.org.nz" % (i, i * 4 % 10),
         confirmed=(i % 3 != 0),
         roles=Role.SUPERUSER if i % 42 == 0 else Role.ADMIN if i % 13 == 0 else Role.RESEARCHER)
-                      for i in range(60))).execute()
+                      for i in range(60)), validate_fields=False).execute()
 
     UserOrg.insert_many((dict(is_admin=((u + o) % 23 == 0), user=u, org=o)
-                         for (u, o) in product(range(2, 60, 4), range(2, 10)))).execute()
+                         for (u, o) in product(range(2, 60, 4), range(2, 10))),
+                        validate_fields=False).execute()
 
-    UserOrg.insert_many((dict(is_admin=True, user=43, org=o) for o in range(1, 11))).execute()
+    UserOrg.insert_many((dict(is_admin=True, user=43, org=o) for o in range(1, 11)),
+                        validate_fields=False).execute()
 
+    user_id, org_id = User.get(id=1).id, Organisation.get(id=1).id
     OrcidToken.insert_many((dict(
-        user=User.get(id=1),
-        org=Organisation.get(id=1),
+        user=user_id,
+        org=org_id,
         scopes="/read-limited",
-        access_token="Test_%d" % i) for i in range(60))).execute()
+        access_token="Test_%d" % i) for i in range(60)), validate_fields=False).execute()
 
     UserOrgAffiliation.insert_many((dict(
-        user=User.get(id=1),
-        organisation=Organisation.get(id=1),
+        user=user_id,
+        organisation=org_id,
         department_name="Test_%d" % i,
         department_city="Test_%d" % i,
         role_title="Test_%d" % i,
         path="Test_%d" % i,
-        put_code="%d" % i) for i in range(30))).execute()
+        put_code="%d" % i) for i in range(30)), validate_fields=False).execute()
+
+
+@pytest.fixture(scope="session")
+def test_models_snapshot():
+    """Populate a test DB once and dump its content as an SQL script (INSERT statements)."""
+    snapshot, _ = dump_seeded_data(TEST_MODELS, seed_test_models)
+    return snapshot
+
 
+@pytest.fixture
+def test_models(test_db, test_models_snapshot):
+    """Test to check models."""
+    restore_seeded_data(test_db, test_models_snapshot)
     yield test_db
 
 
-def test_superuser_view_access(client):
+@pytest.fixture
+def canonical_users(app):
+    """Look up the users shared across the tests: the organisation admins, the researchers and a Hub admin."""
+    users = {
+        u.email: u
+        for u in User.select().where(User.email << [
+            "admin@test0.edu", "researcher100@test0.edu", "admin@test1.edu",
+            "researcher100@test1.edu", "root@test0.edu"
+        ])
+    }
+    return dict(
+        admin=users["admin@test0.edu"],
+        researcher=users["researcher100@test0.edu"],
+        admin1=users["admin@test1.edu"],
+        researcher1=users["researcher100@test1.edu"],
+        root=users["root@test0.edu"])
+
+
+ADMIN_ENDPOINTS = [
+    "/admin/user/",
+    "/admin/organisation/",
+    "/admin/orcidtoken/",
+    "/admin/orginfo/",
+    "/admin/userorg/",
+    "/admin/delegate/",
+]
+
+
+# the access depends only on the SUPERUSER role, so the sweep is done with an admin,
+# and a researcher is checked against a single view:
+@pytest.mark.parametrize(
+    "role, url, status_code",
+    [("admin", url, 302) for url in ADMIN_ENDPOINTS] + [
+        ("admin", "/admin/schedude/", 403),
+        ("researcher", "/admin/user/", 302),
+    ])
+def test_non_superuser_view_access(client, canonical_users, role, url, status_code):
+    """Test if Flask-Admin views are not accessible to non-SUPERUSERs."""
+    client.login(canonical_users[role])
+    resp = client.get(url)
+    assert resp.status_code == status_code
+    if status_code == 403:
+        assert b"403" in resp.data
+    else:
+        assert "next=" in resp.location and "admin" in resp.location
+
+
+def test_superuser_view_access(client, canonical_users):
     """Test if SUPERUSER can access Flask-Admin"."""
     resp = client.get("/admin/schedude/")
     assert resp.status_code == 403
@@ -109,39 +193,6 @@ def test_superuser_view_access(client):
     assert resp.status_code == 302
     assert "next=" in resp.location and "admin" in resp.location
 
-    users = User.select().where(User.email << ["admin@test0.edu", "researcher100@test0.edu"])[:]
-    for u in users:
-        client.login(u)
-        resp = client.get("/admin/user/")
-        assert resp.status_code == 302
-        assert "next=" in resp.location and "admin" in resp.location
-
-        resp = client.get("/admin/organisation/")
-        assert resp.status_code == 302
-        assert "next=" in resp.location and "admin" in resp.location
-
-        resp = client.get("/admin/orcidtoken/")
-        assert resp.status_code == 302
-        assert "next=" in resp.location and "admin" in resp.location
-
-        resp = client.get("/admin/orginfo/")
-        assert resp.status_code == 302
-        assert "next=" in resp.location and "admin" in resp.location
-
-        resp = client.get("/admin/userorg/")
-        assert resp.status_code == 302
-        assert "next=" in resp.location and "admin" in resp.location
-
-        resp = client.get("/admin/schedude/")
-        assert resp.status_code == 403
-        assert b"403" in resp.data
-
-        resp = client.get("/admin/delegate/")
-        assert resp.status_code == 302
-        assert "next=" in resp.location and "admin" in resp.location
-
-        client.logout()
-
     client.login_root()
 
     resp = client.get("/admin/user/")
@@ -155,13 +206,14 @@ def test_superuser_view_access(client):
     resp = client.get("/admin/organisation/")
     assert resp.status_code == 200
 
-    org = Organisation.select().limit(1).first()
+    org = Organisation.get(id=1)
     resp = client.get(f"/admin/organisation/edit/?id={org.id}")
     assert resp.status_code == 200
 
     # Change the technical contact:
     admin = org.tech_contact
-    new_admin = User.select().where(User.id != org.tech_contact_id, User.email ** "admin%").first()
+    new_admin = canonical_users["admin1"]
+    assert new_admin != admin
     data = {k: v for k, v in org.to_dict(recurse=False).items() if not isinstance(v, dict) and 'at' not in k}
     data["tech_contact"] = new_admin.id
     resp = client.post(f"/admin/organisation/edit/?id={org.id}", data=data, follow_redirects=True)
@@ -170,13 +222,13 @@ def test_superuser_view_access(client):
     assert Organisation.get(org.id).tech_contact != admin
 
     # Change the technical contact to a non-admin:
-    user = User.get(email="researcher100@test0.edu")
+    user = canonical_users["researcher"]
     data["tech_contact"] = user.id
     resp = client.post(f"/admin/organisation/edit/?id={org.id}", data=data, follow_redirects=True)
     assert resp.status_code == 200
     assert user.email.encode() in resp.data
     assert Organisation.get(org.id).tech_contact == user
-    assert User.get(user.id).roles & Role.TECHNICAL
+    assert User.select(User.roles).where(User.id == user.id).scalar() & Role.TECHNICAL
 
     resp = client.get("/admin/organisation/edit/?id=999999")
     assert resp.status_code == 404
@@ -192,41 +244,35 @@ def test_superuser_view_access(client):
     resp = client.get("/admin/userorg/")
     assert resp.status_code == 200
 
-    for u in users:
-        resp = client.get(f"/admin/user/edit/?id={u.id}")
-        assert resp.status_code == 200
-        assert u.name.encode() in resp.data
-        resp = client.post(
-            f"/admin/user/edit/?id={u.id}&url=%2Fadmin%2Fuser%2F",
-            data=dict(
-                name=u.name + "_NEW",
-                first_name=u.first_name,
-                last_name=u.last_name,
-                email="NEW_" + u.email,
-                eppn='',
-                orcid="0000-0000-XXXX-XXXX",
-                confirmed="y",
-                webhook_enabled="y",
-            ))
-        user = User.get(u.id)
-        assert user.orcid != "0000-0000-XXXX-XXXX"
+    # the editing is the same for any user, so one is enough:
+    u = canonical_users["admin"]
+    resp = client.get(f"/admin/user/edit/?id={u.id}")
+    assert resp.status_code == 200
+    assert u.name.encode() in resp.data
+    # an invalid ORCID iD gets rejected by the form validation:
+    user_admin = next(v for v in views.admin._views if isinstance(v, views.UserAdmin))
+    with client.application.test_request_context(
+            method="POST", data=dict(name=u.name, email=u.email, orcid="0000-0000-XXXX-XXXX")):
+        form = user_admin.edit_form(u)
+        assert not form.validate()
+        assert "orcid" in form.errors
 
-        resp = client.post(
-            f"/admin/user/edit/?id={u.id}&url=%2Fadmin%2Fuser%2F",
-            data=dict(
-                name=u.name + "_NEW",
-                first_name=u.first_name,
-                last_name=u.last_name,
-                email="NEW_" + u.email,
-                eppn='',
-                orcid="1631-2631-3631-00X3",
-                confirmed="y",
-                webhook_enabled="y",
-            ))
-        user = User.get(u.id)
-        assert user.orcid == "1631-2631-3631-00X3"
-        assert user.email == "new_" + u.email
-        assert user.name == u.name + "_NEW"
+    resp = client.post(
+        f"/admin/user/edit/?id={u.id}&url=%2Fadmin%2Fuser%2F",
+        data=dict(
+            name=u.name + "_NEW",
+            first_name=u.first_name,
+            last_name=u.last_name,
+            email="NEW_" + u.email,
+            eppn='',
+            orcid="1631-2631-3631-00X3",
+            confirmed="y",
+            webhook_enabled="y",
+        ))
+    user = User.get(u.id)
+    assert user.orcid == "1631-2631-3631-00X3"
+    assert user.email == "new_" + u.email
+    assert user.name == u.name + "_NEW"
 
     resp = client.get("/admin/schedude/")
     assert resp.status_code == 200
@@ -277,18 +323,20 @@ def test_pyinfo(client, mocker):
     capture_event.assert_called()
 
 
-def test_access(client):
+def test_access(client, canonical_users):
     """Test access to differente resources."""
     org = client.data["org"]
     user = client.data["user"]
     tech_contact = client.data["tech_contact"]
-    root = User.select().where(User.email ** "root%").first()
-    admin = User.create(
+    root = canonical_users["root"]
+    admin = create_user_with_org(
+        org,
         name="ADMIN USER",
         email="admin123456789@test.test.net",
         confirmed=True,
-        roles=Role.ADMIN)
-    UserOrg.create(user=admin, org=org, is_admin=True)
+        roles=Role.ADMIN,
+        organisation=None,
+        is_admin=True)
 
     resp = client.get("/pyinfo")
     assert resp.status_code == 302
@@ -378,111 +426,49 @@ def test_user_orcid_id_url():
     assert (views.user_orcid_id_url(u) == "")
 
 
-def test_show_record_section(request_ctx):
+@pytest.mark.parametrize(
+    "section_type, method_name, is_post, preload_content", [
+        ("EMP", "view_employments", False, False),
+        ("EDU", "view_educations", False, False),
+        ("PRR", "view_peer_reviews", False, True),
+        ("WOR", "view_works", False, True),
+        ("FUN", "view_fundings", False, True),
+        ("RUR", "view_researcher_urls", False, False),
+        ("ONR", "view_other_names", False, False),
+        ("KWR", "view_keywords", False, False),
+        ("EXR", "view_external_identifiers", True, False),
+    ])
+def test_show_record_section(request_ctx, canonical_users, section_type, method_name, is_post,
+                             preload_content):
     """Test to show selected record."""
-    admin = User.get(email="admin@test0.edu")
-    user = User.get(email="researcher100@test0.edu")
+    admin = canonical_users["admin"]
+    user = canonical_users["researcher"]
     if not user.orcid:
         user.orcid = "XXXX-XXXX-XXXX-0001"
         user.save()
 
     OrcidToken.create(user=user, org=user.organisation, access_token="ABC123")
 
+    if preload_content:
+        response = make_fake_response('{"test": "TEST1234567890"}')
+    else:
+        response = Mock(data="""{"test": "TEST1234567890"}""")
     with patch.object(
-            orcid_client.MemberAPIV20Api,
-            "view_employments",
-            MagicMock(return_value=Mock(data="""{"test": "TEST1234567890"}"""))
-    ) as view_employments, request_ctx(f"/section/{user.id}/EMP/list") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_employments.assert_called_once_with("XXXX-XXXX-XXXX-0001", _preload_content=False)
-    with patch.object(
-            orcid_client.MemberAPIV20Api,
-            "view_educations",
-            MagicMock(return_value=Mock(data="""{"test": "TEST1234567890"}"""))
-    ) as view_educations, request_ctx(f"/section/{user.id}/EDU/list") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_educations.assert_called_once_with("XXXX-XXXX-XXXX-0001", _preload_content=False)
-    with patch.object(
-            orcid_client.MemberAPIV20Api,
-            "view_peer_reviews",
-            MagicMock(return_value=make_fake_response('{"test": "TEST1234567890"}'))
-    ) as view_peer_reviews, request_ctx(f"/section/{user.id}/PRR/list") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_peer_reviews.assert_called_once_with("XXXX-XXXX-XXXX-0001")
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_works",
-        MagicMock(return_value=make_fake_response('{"test": "TEST1234567890"}'))
-    ) as view_works, request_ctx(f"/section/{user.id}/WOR/list") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_works.assert_called_once_with("XXXX-XXXX-XXXX-0001")
-    with patch.object(
-            orcid_client.MemberAPIV20Api,
-            "view_fundings",
-            MagicMock(return_value=make_fake_response('{"test": "TEST1234567890"}'))
-    ) as view_fundings, request_ctx(f"/section/{user.id}/FUN/list") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_fundings.assert_called_once_with("XXXX-XXXX-XXXX-0001")
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_researcher_urls",
-        MagicMock(return_value=Mock(data="""{"test": "TEST1234567890"}"""))
-    ) as view_researcher_urls, request_ctx(f"/section/{user.id}/RUR/list") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_researcher_urls.assert_called_once_with("XXXX-XXXX-XXXX-0001", _preload_content=False)
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_other_names",
-        MagicMock(return_value=Mock(data="""{"test": "TEST1234567890"}"""))
-    ) as view_other_names, request_ctx(f"/section/{user.id}/ONR/list") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_other_names.assert_called_once_with("XXXX-XXXX-XXXX-0001", _preload_content=False)
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_keywords",
-        MagicMock(return_value=Mock(data="""{"test": "TEST1234567890"}"""))
-    ) as view_keywords, request_ctx(f"/section/{user.id}/KWR/list") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_keywords.assert_called_once_with("XXXX-XXXX-XXXX-0001", _preload_content=False)
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_external_identifiers",
-        MagicMock(return_value=Mock(data="""{"test": "TEST1234567890"}"""))
-    ) as view_external_identifiers, patch("orcid_hub.utils.send_email") as send_email, request_ctx(
-        f"/section/{user.id}/EXR/list",
-        method="POST",
-    ) as ctx:
+            orcid_client.MemberAPIV20Api, method_name, MagicMock(return_value=response)
+    ) as view_section, patch("orcid_hub.utils.send_email") as send_email, request_ctx(
+            f"/section/{user.id}/{section_type}/list",
+            method="POST" if is_post else "GET") as ctx:
         login_user(admin)
         resp = ctx.app.full_dispatch_request()
         assert resp.status_code == 200
-        send_email.assert_called_once()
         assert admin.email.encode() in resp.data
         assert admin.name.encode() in resp.data
-        view_external_identifiers.assert_called_once_with("XXXX-XXXX-XXXX-0001", _preload_content=False)
+        if is_post:
+            send_email.assert_called_once()
+        if preload_content:
+            view_section.assert_called_once_with("XXXX-XXXX-XXXX-0001")
+        else:
+            view_section.assert_called_once_with("XXXX-XXXX-XXXX-0001", _preload_content=False)
 
 
 def test_status(client):
@@ -506,21 +492,41 @@ def test_status(client):
         assert "FAILURE" in data["message"]
 
 
-def test_application_registration(client):
-    """Test application registration."""
+@pytest.fixture
+def app_tech_contact(client):
+    """Log in a technical contact of the test organisation."""
     org = client.data["org"]
-    user = User.create(
+    user = create_user_with_org(
+        org,
         email="test123456@test.test.net",
         name="TEST USER",
         roles=Role.TECHNICAL,
         orcid="123-456-789-098",
-        organisation_id=1,
         confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+        is_admin=True)
     org.update(tech_contact=user).execute()
 
-    resp = client.login(user, follow_redirects=True)
+    client.login(user, follow_redirects=True)
+    return user
+
+
+@pytest.fixture
+def registered_app(client, app_tech_contact):
+    """Create a client application of the logged in technical contact."""
+    return Client.create(
+        name="TEST APP",
+        homepage_url="http://test.at.test",
+        description="TEST APPLICATION 123",
+        user=app_tech_contact,
+        org=client.data["org"],
+        client_id="TEST-APP-CLIENT-ID",
+        client_secret="TEST-APP-CLIENT-SECRET")
+
+
+def test_application_registration(client, app_tech_contact):
+    """Test application registration."""
+    org = client.data["org"]
+    user = app_tech_contact
     resp = client.post(
         "/settings/applications",
         follow_redirects=True,
@@ -564,6 +570,10 @@ def test_application_registration(client):
     assert resp.status_code == 302
     assert urlparse(resp.location).path == "/settings/applications"
 
+
+def test_application_credentials_revoke(client, registered_app):
+    """Test revoking the tokens of the registered application."""
+    c = registered_app
     Token.create(client=c, token_type="TEST", access_token="TEST000")
     resp = client.post(
         f"/settings/credentials/{c.id}", data={
@@ -573,18 +583,24 @@ def test_application_registration(client):
     assert resp.status_code == 200
     assert Token.select().where(Token.client == c).count() == 0
 
-    old_client = c
+
+def test_application_credentials_reset(client, registered_app):
+    """Test resetting the credentials of the registered application."""
+    c = registered_app
     resp = client.post(
         f"/settings/credentials/{c.id}", data={
             "reset": "Reset",
             "name": c.name,
         })
-    c = Client.get(name="TEST APP")
+    new_client = Client.get(name="TEST APP")
     assert resp.status_code == 200
-    assert c.client_id != old_client.client_id
-    assert c.client_secret != old_client.client_secret
+    assert new_client.client_id != c.client_id
+    assert new_client.client_secret != c.client_secret
 
-    old_client = c
+
+def test_application_credentials_update(client, registered_app):
+    """Test updating the registered application."""
+    c = registered_app
     resp = client.post(
         f"/settings/credentials/{c.id}",
         follow_redirects=True,
@@ -599,25 +615,37 @@ def test_application_registration(client):
     assert resp.status_code == 200
     assert c.name == "NEW APP NAME"
 
-    old_client = c
+
+def test_application_credentials_delete(client, registered_app):
+    """Test deleting the registered application."""
+    c = registered_app
     resp = client.post(
         f"/settings/credentials/{c.id}", data={
             "delete": "Delete",
-            "name": "NEW APP NAME",
+            "name": c.name,
         })
     assert resp.status_code == 302
     assert urlparse(resp.location).path == "/settings/applications"
     assert not Client.select().where(Client.id == c.id).exists()
 
 
+@lru_cache(maxsize=None)
+def parse_fake_response(text):
+    """Parse the fake response body (the same few bodies get reused across the tests)."""
+    return json.loads(text)
+
+
 def make_fake_response(text, *args, **kwargs):
-    """Mock out the response object returned by requests_oauthlib.OAuth2Session.get(...)."""
+    """Mock out the response object returned by requests_oauthlib.OAuth2Session.get(...).
+
+    NB! The mock itself is not shared, so the calls do not leak between the tests.
+    """
     mm = MagicMock(name="response")
     mm.text = text
     if "json" in kwargs:
         mm.json.return_value = kwargs["json"]
     else:
-        mm.json.return_value = json.loads(text)
+        mm.json.return_value = parse_fake_response(text)
     if "status_code" in kwargs:
         mm.status_code = kwargs["status_code"]
     return mm
@@ -641,33 +669,7 @@ def test_short_url(request_ctx):
         assert resp.status_code == 404
 
 
-def test_load_org(client):
-    """Test load organisation."""
-    resp = client.get("/load/org", follow_redirects=True)
-    assert b"Please log in to access this page." in resp.data
-
-    client.login_root()
-    with pytest.raises(AssertionError):
-        resp = client.post(
-            "/load/org",
-            follow_redirects=True,
-            data={
-                "save":
-                "Upload",
-                "file_": (
-                    BytesIO(b"Name\nAgResearch Ltd\nAqualinc Research Ltd\n"),
-                    "incorrect-raw-org-data.csv",
-                ),
-            })
-
-    resp = client.post(
-        "/load/org",
-        follow_redirects=True,
-        data={
-            "save":
-            "Upload",
-            "file_": (
-                BytesIO(b"""Name,Disambiguated Id,Disambiguation Source
+ORG_CSV = b"""Name,Disambiguated Id,Disambiguation Source
 AgResearch Ltd,3713,RINGGOLD
 Aqualinc Research Ltd,9429035717133,NZBN
 Ara Institute of Canterbury,6006,Education Organisation Number
@@ -681,13 +683,17 @@ Health Research Council,http://dx.doi.org/10.13039/501100001505,FUNDREF
 Hutt Valley District Health Board,161292,RINGGOLD
 Institute of Environmental Science and Research,8480,RINGGOLD
 Institute of Geological & Nuclear Sciences Ltd,5180,RINGGOLD
-"""),
-                "raw-org-data.csv",
-            ),
-        })
-    assert resp.status_code == 200
-    assert OrgInfo.select().count() == 13
-    assert b"CRL Energy Ltd" in resp.data
+"""
+
+
+def test_load_org(client):
+    """Test load organisation."""
+    resp = client.get("/load/org", follow_redirects=True)
+    assert b"Please log in to access this page." in resp.data
+
+    client.login_root()
+    with pytest.raises(AssertionError):
+        OrgInfo.load_from_csv("Name\nAgResearch Ltd\nAqualinc Research Ltd\n")
 
     resp = client.post(
         "/load/org",
@@ -696,16 +702,21 @@ Institute of Geological & Nuclear Sciences Ltd,5180,RINGGOLD
             "save":
             "Upload",
             "file_": (
-                BytesIO(
-                    b"Name,Disambiguated Id,Disambiguation Source\n"
-                    b"CRL Energy Ltd,8888,NZBN\nLandcare Research,2243,RINGGOLD"
-                ),
+                BytesIO(ORG_CSV),
                 "raw-org-data.csv",
             ),
         })
+    assert resp.status_code == 200
+    assert OrgInfo.select().count() == 13
+    assert b"CRL Energy Ltd" in resp.data
+
+    # the rest of the uploads exercise only the loader:
+    OrgInfo.load_from_csv(
+        "Name,Disambiguated Identifier,Disambiguation Source\n"
+        "CRL Energy Ltd,8888,NZBN\nLandcare Research,2243,RINGGOLD")
     assert OrgInfo.select().count() == 14, "A new entry should be added."
-    assert b"8888" not in resp.data, "Entry should be updated."
-    assert b"Landcare Research" in resp.data
+    assert OrgInfo.get(name="CRL Energy Ltd").disambiguated_id == "8888", "Entry should be updated."
+    assert OrgInfo.get(name="Landcare Research").disambiguated_id == "2243"
 
     resp = client.post(
         "/admin/orginfo/action/",
@@ -713,7 +724,7 @@ Institute of Geological & Nuclear Sciences Ltd,5180,RINGGOLD
         data=dict(
             url="/admin/orginfo/",
             action="delete",
-            rowid=OrgInfo.select().limit(1).first().id,
+            rowid=OrgInfo.select(OrgInfo.id).scalar(),
         ))
     assert OrgInfo.select().count() == 13
 
@@ -727,22 +738,11 @@ Institute of Geological & Nuclear Sciences Ltd,5180,RINGGOLD
         ))
     assert OrgInfo.select().count() == 0
 
-    resp = client.post(
-        "/load/org",
-        follow_redirects=True,
-        data={
-            "save":
-            "Upload",
-            "file_": (
-                BytesIO(
-                    b"Name,Disambiguated Id,Disambiguation Source,Email\n"
-                    b"ORG #1,,,test@org1.net\n"
-                    b"ORG #2,,,test@org2.net\n"
-                    b"ORG #3,,,test@org3.net\n"
-                ),
-                "raw-org-data.csv",
-            ),
-        })
+    OrgInfo.load_from_csv(
+        "Name,Disambiguated Id,Disambiguation Source,Email\n"
+        "ORG #1,,,test@org1.net\n"
+        "ORG #2,,,test@org2.net\n"
+        "ORG #3,,,test@org3.net\n")
     assert OrgInfo.select().count() == 3
 
     with patch("orcid_hub.views.utils.send_email") as send_email:
@@ -839,7 +839,7 @@ def test_user_orgs_org(client):
             }),
             content_type="application/json")
     assert resp.status_code == 201
-    assert User.get(id=user.id).roles & Role.ADMIN
+    assert User.select(User.roles).where(User.id == user.id).scalar() & Role.ADMIN
     organisation = Organisation.get(name="THE ORGANISATION")
     # User becomes the technical contact of the organisation.
     assert organisation.tech_contact == user
@@ -870,14 +870,14 @@ def test_user_orgs_org(client):
 def test_user_orgs(client, mocker):
     """Test add an organisation to the user."""
     org = client.data["org"]
-    user = User.create(
+    user = create_user_with_org(
+        org,
         email="test123@test.test.net",
         name="TEST USER",
         roles=Role.SUPERUSER,
         orcid="123",
         confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+        is_admin=True)
     resp = client.login(user)
 
     resp = client.get(f"/hub/api/v0.1/users/{user.id}/orgs/")
@@ -898,17 +898,10 @@ def test_user_orgs(client, mocker):
     assert resp.status_code == 404
 
 
-def test_api_credentials(client):
+def test_api_credentials(client, admin_user):
     """Test manage API credentials.."""
     org = Organisation.get(name="THE ORGANISATION")
-    user = User.create(
-        email="test123@test.test.net",
-        name="TEST USER",
-        roles=Role.TECHNICAL,
-        orcid="123",
-        confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+    user = admin_user
     c = Client.create(
         name="Test_client",
         user=user,
@@ -960,17 +953,9 @@ def test_favicon(request_ctx):
 
 
 @patch("orcid_hub.utils.send_email")
-def test_action_invite(patch, request_ctx):
+def test_action_invite(patch, request_ctx, admin_user):
     """Test handle nonexistin pages."""
-    org = request_ctx.data["org"]
-    user = User.create(
-        email="test123@test.test.net",
-        name="TEST USER",
-        roles=Role.TECHNICAL,
-        orcid="123",
-        confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+    user = admin_user
     org_info = OrgInfo.create(
         name="Test_client",
         tuakiri_name="xyz",
@@ -1002,18 +987,10 @@ def test_shorturl(request_ctx):
         assert "http://" in resp
 
 
-def test_activate_all(client):
+def test_activate_all(client, admin_user):
     """Test batch registraion of users."""
     org = client.data["org"]
-    user = User.create(
-        email="test123@test.test.net",
-        name="TEST USER",
-        roles=Role.TECHNICAL,
-        orcid=123,
-        organisation_id=1,
-        confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+    user = admin_user
 
     task1 = Task.create(
         org=org,
@@ -1022,18 +999,12 @@ def test_activate_all(client):
         created_by=user,
         updated_by=user,
         task_type=TaskType.AFFILIATION)
-    AffiliationRecord.create(
-        first_name="F",
-        last_name="L",
-        email="test123_activate_all@test.edu",
-        affiliation_type="staff",
-        task=task1)
-    AffiliationRecord.create(
-        first_name="F",
-        last_name="L",
-        email="test456_activate_all@test.edu",
-        affiliation_type="student",
-        task=task1)
+    AffiliationRecord.insert_many(
+        dict(first_name="F", last_name="L", email=email, affiliation_type=affiliation_type, task=task1)
+        for email, affiliation_type in [
+            ("test123_activate_all@test.edu", "staff"),
+            ("test456_activate_all@test.edu", "student"),
+        ]).execute()
 
     task2 = Task.create(
         org=org,
@@ -1058,17 +1029,9 @@ def test_activate_all(client):
     assert resp.location.endswith("http://localhost/funding_record_activate_for_batch")
 
 
-def test_logo(request_ctx):
+def test_logo(request_ctx, admin_user):
     """Test manage organisation 'logo'."""
-    org = request_ctx.data["org"]
-    user = User.create(
-        email="test123@test.test.net",
-        name="TEST USER",
-        roles=Role.TECHNICAL,
-        orcid="123",
-        confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+    user = admin_user
     with request_ctx("/settings/logo", method="POST") as ctx:
         login_user(user, remember=True)
         resp = ctx.app.full_dispatch_request()
@@ -1081,70 +1044,65 @@ def test_logo(request_ctx):
         assert resp.location.endswith("images/banner-small.png")
 
 
+def email_template_settings(org):
+    """Read only the email template settings of the organisation."""
+    return Organisation.select(
+        Organisation.email_template_enabled, Organisation.email_template).where(
+            Organisation.id == org.id).tuples().get()
+
+
 @patch("orcid_hub.utils.send_email")
-def test_manage_email_template(patch, request_ctx):
+def test_manage_email_template(patch, client, admin_user):
     """Test manage organisation invitation email template."""
-    org = request_ctx.data["org"]
-    user = User.create(
+    org = client.data["org"]
+    client.login(admin_user)
+    resp = client.post(
+        "/settings/email_template",
+        data={
+            "name": "TEST APP",
+            "homepage_url": "http://test.at.test",
+            "description": "TEST APPLICATION 123",
+            "email_template": "enable",
+            "save": "Save"
+        })
+    assert resp.status_code == 200
+    assert b"Are you sure?" in resp.data
+
+    resp = client.post(
+        "/settings/email_template",
+        data={
+            "name": "TEST APP",
+            "homepage_url": "http://test.at.test",
+            "description": "TEST APPLICATION 123",
+            "email_template": "enable {MESSAGE} {INCLUDED_URL}",
+            "save": "Save"
+        })
+    assert resp.status_code == 200
+    _, email_template = email_template_settings(org)
+    assert email_template == "enable {MESSAGE} {INCLUDED_URL}"
+
+    resp = client.post(
+        "/settings/email_template",
+        data={
+            "name": "TEST APP",
+            "email_template_enabled": "true",
+            "email_address": "test123@test.test.net",
+            "send": "Save"
+        })
+    assert resp.status_code == 200
+    assert b"<!DOCTYPE html>" in resp.data, "Expected HTML content"
+
+
+def test_invite_user(client, test0_org, test0_admin):
+    """Test invite a researcher to join the hub."""
+    org = test0_org
+    admin = test0_admin
+    user = create_user_with_org(
+        org,
         email="test123@test.test.net",
         name="TEST USER",
-        roles=Role.TECHNICAL,
-        orcid="123",
         confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
-    with request_ctx(
-            "/settings/email_template",
-            method="POST",
-            data={
-                "name": "TEST APP",
-                "homepage_url": "http://test.at.test",
-                "description": "TEST APPLICATION 123",
-                "email_template": "enable",
-                "save": "Save"
-            }) as ctx:
-        login_user(user, remember=True)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 200
-        assert b"Are you sure?" in resp.data
-    with request_ctx(
-            "/settings/email_template",
-            method="POST",
-            data={
-                "name": "TEST APP",
-                "homepage_url": "http://test.at.test",
-                "description": "TEST APPLICATION 123",
-                "email_template": "enable {MESSAGE} {INCLUDED_URL}",
-                "save": "Save"
-            }) as ctx:
-        login_user(user, remember=True)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 200
-        assert b"<!DOCTYPE html>" in resp.data, "Expected HTML content"
-        org = Organisation.get(id=org.id)
-        assert org.email_template == "enable {MESSAGE} {INCLUDED_URL}"
-    with request_ctx(
-            "/settings/email_template",
-            method="POST",
-            data={
-                "name": "TEST APP",
-                "email_template_enabled": "true",
-                "email_address": "test123@test.test.net",
-                "send": "Save"
-            }) as ctx:
-        login_user(user, remember=True)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 200
-        assert b"<!DOCTYPE html>" in resp.data, "Expected HTML content"
-
-
-def test_invite_user(client):
-    """Test invite a researcher to join the hub."""
-    org = Organisation.get(name="TEST0")
-    admin = User.get(email="admin@test0.edu")
-    user = User.create(
-        email="test123@test.test.net", name="TEST USER", confirmed=True, organisation=org)
-    UserOrg.create(user=user, org=org, affiliations=Affiliation.EMP)
+        affiliations=Affiliation.EMP)
     UserInvitation.create(
         invitee=user, inviter=admin, org=org, email="test1234456@mailinator.com", token="xyztoken")
     resp = client.login(admin)
@@ -1215,22 +1173,25 @@ def test_invite_user(client):
         api_mock.create_or_update_affiliation.assert_called_once()
 
 
-def test_researcher_invitation(client, mocker):
-    """Test full researcher invitation flow."""
-    mocker.patch("sentry_sdk.transport.HttpTransport.capture_event")
-    mocker.patch("orcid_hub.MemberAPI.create_or_update_affiliation")
-    mocker.patch(
-        "orcid_hub.views.send_user_invitation.queue",
-        lambda *args, **kwargs: (views.send_user_invitation(*args, **kwargs) and Mock()))
-    send_email = mocker.patch("orcid_hub.utils.send_email")
-    admin = User.get(email="admin@test1.edu")
-    resp = client.login(admin)
+QUEUED_JOB = Mock()
+
+
+def send_user_invitation_now(*args, **kwargs):
+    """Send the invitation synchronously instead of queueing it, returns a stand-in for the job."""
+    views.send_user_invitation(*args, **kwargs)
+    return QUEUED_JOB
+
+
+def invite_researcher(client, admin, email, send_email):
+    """Invite a researcher on behalf of the admin and return the invitation URL path."""
+    send_email.reset_mock()
+    client.login(admin)
     resp = client.post(
             "/invite/user",
             data={
                 "name": "TEST APP",
                 "is_employee": "false",
-                "email_address": "test123abc@test.test.net",
+                "email_address": email,
                 "resend": "enable",
                 "is_student": "true",
                 "first_name": "test",
@@ -1239,83 +1200,65 @@ def test_researcher_invitation(client, mocker):
             })
     assert resp.status_code == 200
     assert b"<!DOCTYPE html>" in resp.data, "Expected HTML content"
-    assert b"test123abc@test.test.net" in resp.data
+    assert email.encode() in resp.data
     send_email.assert_called_once()
     _, kwargs = send_email.call_args
-    invitation_url = urlparse(kwargs["invitation_url"]).path
     client.logout()
+    return urlparse(kwargs["invitation_url"]).path
 
-    # Attempt to login via ORCID with the invitation token
+
+def orcid_callback_url(client, invitation_url):
+    """Open the invitation and return the ORCID call-back URL with the expected OAuth state."""
     resp = client.get(invitation_url)
-    auth_url = re.search(r"window.location='([^']*)'", resp.data.decode()).group(1)
+    auth_url = AUTH_URL_RE.search(resp.data.decode()).group(1)
     qs = parse_qs(urlparse(auth_url).query)
     redirect_uri = qs["redirect_uri"][0]
     oauth_state = qs["state"][0]
-    callback_url = redirect_uri + "&state=" + oauth_state
     assert session["oauth_state"] == oauth_state
-    mocker.patch(
-        "orcid_hub.authcontroller.OAuth2Session.fetch_token",
-        return_value={
-            "orcid": "0123-1234-5678-0123",
-            "name": "TESTER TESTERON",
-            "access_token": "xyz",
-            "refresh_token": "xyz",
-            "scope": ["/read-limited", "/activities/update"],
-            "expires_in": "12121"
-        })
-    resp = client.get(callback_url, follow_redirects=True)
+    return redirect_uri + "&state=" + oauth_state
+
+
+def follow_invitation(client, invitation_url, fetch_token, orcid):
+    """Attempt to login via ORCID with the invitation token."""
+    callback_url = orcid_callback_url(client, invitation_url)
+    fetch_token.return_value = {
+        "orcid": orcid,
+        "name": "TESTER TESTERON",
+        "access_token": "xyz",
+        "refresh_token": "xyz",
+        "scope": ["/read-limited", "/activities/update"],
+        "expires_in": "12121"
+    }
+    resp = client.get(callback_url)
+    assert resp.status_code == 302
+    return resp
+
+
+def test_researcher_invitation(client, mocker):
+    """Test full researcher invitation flow."""
+    mocker.patch("orcid_hub.orcid_client.MemberAPI.create_or_update_affiliation")
+    mocker.patch("orcid_hub.views.send_user_invitation.queue", send_user_invitation_now)
+    send_email = mocker.patch("orcid_hub.utils.send_email")
+    fetch_token = mocker.patch("orcid_hub.authcontroller.OAuth2Session.fetch_token")
+    admin = User.get(email="admin@test1.edu")
+
+    invitation_url = invite_researcher(client, admin, "test123abc@test.test.net", send_email)
+    follow_invitation(client, invitation_url, fetch_token, "0123-1234-5678-0123")
     user = User.get(email="test123abc@test.test.net")
     assert user.orcid == "0123-1234-5678-0123"
 
     # Test web-hook:
-    send_email.reset_mock()
     org = admin.organisation
     org.webhook_enabled = True
     org.webhook_url = "http://test.webhook"
     org.confirmed = True
     org.save()
+    # the first flow ended with the researcher logged in:
     client.logout()
-    client.login(admin)
     post = mocker.patch("requests.post")
-    resp = client.post(
-            "/invite/user",
-            data={
-                "name": "TEST APP",
-                "is_employee": "false",
-                "email_address": "test123abc123@test.test.net",
-                "resend": "enable",
-                "is_student": "true",
-                "first_name": "test",
-                "last_name": "test",
-                "city": "test"
-            })
-    assert resp.status_code == 200
-    send_email.assert_called_once()
-    _, kwargs = send_email.call_args
-    invitation_url = urlparse(kwargs["invitation_url"]).path
-    client.logout()
-
-    # Attempt to login via ORCID with the invitation token
-    resp = client.get(invitation_url)
-    auth_url = re.search(r"window.location='([^']*)'", resp.data.decode()).group(1)
-    qs = parse_qs(urlparse(auth_url).query)
-    redirect_uri = qs["redirect_uri"][0]
-    oauth_state = qs["state"][0]
-    callback_url = redirect_uri + "&state=" + oauth_state
-    assert session["oauth_state"] == oauth_state
-    mocker.patch(
-        "orcid_hub.authcontroller.OAuth2Session.fetch_token",
-        return_value={
-            "orcid": "0123-1234-5678-0124",
-            "name": "TESTER TESTERON",
-            "access_token": "xyz",
-            "refresh_token": "xyz",
-            "scope": ["/read-limited", "/activities/update"],
-            "expires_in": "12121"
-        })
-    send_email.reset_mock()
+    invitation_url = invite_researcher(client, admin, "test123abc123@test.test.net", send_email)
     post.reset_mock()
-    resp = client.get(callback_url, follow_redirects=True)
+    follow_invitation(client, invitation_url, fetch_token, "0123-1234-5678-0124")
     user = User.get(email="test123abc123@test.test.net")
     assert user.orcid == "0123-1234-5678-0124"
     assert post.call_count == 2
@@ -1327,38 +1270,34 @@ def test_researcher_invitation(client, mocker):
     assert message["email"] == user.email
 
 
-def test_email_template(app, request_ctx):
+def test_email_template(app, client, test0_org, test0_admin):
     """Test email maintenance."""
-    org = Organisation.get(name="TEST0")
-    user = User.get(email="admin@test0.edu")
+    org = test0_org
+    user = test0_admin
+    client.login(user)
 
-    with request_ctx(
-            "/settings/email_template",
-            method="POST",
-            data={
-                "email_template_enabled": "y",
-                "prefill": "Pre-fill",
-            }) as ctx:
-        login_user(user)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 200
-        assert b"&lt;!DOCTYPE html&gt;" in resp.data
-        org.reload()
-        assert not org.email_template_enabled
+    resp = client.post(
+        "/settings/email_template",
+        data={
+            "email_template_enabled": "y",
+            "prefill": "Pre-fill",
+        })
+    assert resp.status_code == 200
+    assert b"&lt;!DOCTYPE html&gt;" in resp.data
+    enabled, _ = email_template_settings(org)
+    assert not enabled
 
-    with patch("orcid_hub.utils.send_email") as send_email, request_ctx(
+    with patch("orcid_hub.utils.send_email") as send_email:
+        resp = client.post(
             "/settings/email_template",
-            method="POST",
             data={
                 "email_template_enabled": "y",
                 "email_template": "TEST TEMPLATE {EMAIL}",
                 "send": "Send",
-            }) as ctx:
-        login_user(user)
-        resp = ctx.app.full_dispatch_request()
+            })
         assert resp.status_code == 200
-        org.reload()
-        assert not org.email_template_enabled
+        enabled, _ = email_template_settings(org)
+        assert not enabled
         send_email.assert_called_once_with(
             "email/test.html",
             base="TEST TEMPLATE {EMAIL}",
@@ -1370,34 +1309,29 @@ def test_email_template(app, request_ctx):
             sender=("TEST ORG #0 ADMIN", "admin@test0.edu"),
             subject="TEST EMAIL")
 
-    with request_ctx(
-            "/settings/email_template",
-            method="POST",
-            data={
-                "email_template_enabled": "y",
-                "email_template": "TEST TEMPLATE TO SAVE {MESSAGE} {INCLUDED_URL}",
-                "save": "Save",
-            }) as ctx:
-        login_user(user)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 200
-        org.reload()
-        assert org.email_template_enabled
-        assert "TEST TEMPLATE TO SAVE {MESSAGE} {INCLUDED_URL}" in org.email_template
+    resp = client.post(
+        "/settings/email_template",
+        data={
+            "email_template_enabled": "y",
+            "email_template": "TEST TEMPLATE TO SAVE {MESSAGE} {INCLUDED_URL}",
+            "save": "Save",
+        })
+    assert resp.status_code == 200
+    enabled, email_template = email_template_settings(org)
+    assert enabled
+    assert "TEST TEMPLATE TO SAVE {MESSAGE} {INCLUDED_URL}" in email_template
 
-    with patch("emails.html") as html, request_ctx(
+    with patch("emails.html") as html:
+        resp = client.post(
             "/settings/email_template",
-            method="POST",
             data={
                 "email_template_enabled": "y",
                 "email_template": app.config["DEFAULT_EMAIL_TEMPLATE"],
                 "send": "Send",
-            }) as ctx:
-        login_user(user)
-        resp = ctx.app.full_dispatch_request()
+            })
         assert resp.status_code == 200
-        org.reload()
-        assert org.email_template_enabled
+        enabled, _ = email_template_settings(org)
+        assert enabled
         html.assert_called_once()
         _, kwargs = html.call_args
         assert kwargs["subject"] == "TEST EMAIL"
@@ -1408,31 +1342,38 @@ def test_email_template(app, request_ctx):
         assert "<!DOCTYPE html>\n<html>\n" in kwargs["html"]
         assert "TEST0" in kwargs["text"]
 
-    org.logo = File.create(
+
+@pytest.fixture
+def test0_logo(test0_org):
+    """Create a logo file of the organisation TEST0."""
+    logo = File.create(
         filename="LOGO.png",
         data=b"000000000000000000000",
         mimetype="image/png",
         token="TOKEN000")
-    org.save()
-    user.reload()
-    with patch("orcid_hub.utils.send_email") as send_email, request_ctx(
+    Organisation.update(logo=logo).where(Organisation.id == test0_org.id).execute()
+    return logo
+
+
+def test_email_template_logo(app, client, test0_admin, test0_logo):
+    """Test the organisation logo in the test email."""
+    client.login(test0_admin)
+    with app.test_request_context():
+        logo_url = url_for("logo_image", token=test0_logo.token, _external=True)
+    with patch("orcid_hub.utils.send_email") as send_email:
+        resp = client.post(
             "/settings/email_template",
-            method="POST",
             data={
                 "email_template_enabled": "y",
                 "email_template": "TEST TEMPLATE {EMAIL}",
                 "send": "Send",
-            }) as ctx:
-        login_user(user)
-        resp = ctx.app.full_dispatch_request()
+            })
         assert resp.status_code == 200
-        org.reload()
-        assert org.email_template_enabled
         send_email.assert_called_once_with(
             "email/test.html",
             base="TEST TEMPLATE {EMAIL}",
             cc_email=("TEST ORG #0 ADMIN", "admin@test0.edu"),
-            logo=f"http://{ctx.request.host}/logo/TOKEN000",
+            logo=logo_url,
             org_name="TEST0",
             recipient=("TEST ORG #0 ADMIN", "admin@test0.edu"),
             reply_to=("TEST ORG #0 ADMIN", "admin@test0.edu"),
@@ -1440,10 +1381,10 @@ def test_email_template(app, request_ctx):
             subject="TEST EMAIL")
 
 
-def test_logo_file(request_ctx):
+def test_logo_file(request_ctx, test0_org, test0_admin):
     """Test logo support."""
-    org = Organisation.get(name="TEST0")
-    user = User.get(email="admin@test0.edu")
+    org = test0_org
+    user = test0_admin
     with request_ctx(
             "/settings/logo",
             method="POST",
@@ -1475,29 +1416,32 @@ def test_logo_file(request_ctx):
 
 def test_affiliation_deletion_task(client, mocker):
     """Test affilaffiliation task upload."""
-    user = OrcidToken.select().join(User).where(User.orcid.is_null(False)).first().user
+    user = OrcidToken.select(OrcidToken, User, Organisation).join(User).join(
+        Organisation, on=(User.organisation == Organisation.id)).where(
+            User.orcid.is_null(False)).first().user
     org = user.organisation
     admin = org.admins.first()
 
     resp = client.login(admin, follow_redirects=True)
     assert b"log in" not in resp.data
-    content = ("Orcid,Put Code,Delete\n" + '\n'.join(f"{user.orcid},{put_code},yes"
-                                                     for put_code in range(1, 3)))
+    orcid = user.orcid.encode()
+    content = b"Orcid,Put Code,Delete\n" + b'\n'.join(b"%s,%d,yes" % (orcid, put_code)
+                                                      for put_code in range(1, 3))
     resp = client.post("/load/researcher",
                        data={
                            "save": "Upload",
                            "file_": (
-                               BytesIO(content.encode()),
+                               BytesIO(content),
                                "affiliations.csv",
                            ),
                        })
     assert resp.status_code == 302
-    task_id = int(re.search(r"\/admin\/affiliationrecord/\?task_id=(\d+)", resp.location)[1])
+    task_id = int(TASK_ID_RE.search(resp.location)[1])
     assert task_id
     task = Task.get(task_id)
     assert task.org == org
     records = list(task.records)
-    assert len(records) == len(content.split('\n')) - 1
+    assert len(records) == content.count(b'\n')
 
     mocker.patch("orcid_hub.orcid_client.MemberAPI.get_record", return_value=get_profile(org=org, user=user))
     delete_education = mocker.patch("orcid_hub.orcid_client.MemberAPI.delete_education")
@@ -1515,10 +1459,125 @@ def test_affiliation_deletion_task(client, mocker):
     delete_employment.assert_called()
 
 
-def test_affiliation_tasks(client):
+def json_default(o):
+    """Serialize the dates and timestamps in ISO format."""
+    if isinstance(o, datetime.datetime):
+        return o.isoformat(timespec="seconds")
+    elif isinstance(o, datetime.date):
+        return o.isoformat()
+
+
+RecordStats = namedtuple("RecordStats",
+                         ["total", "active", "unprocessed", "invitations", "tasks"])
+
+
+def record_stats(task_id):
+    """Count the affiliation records of the task with a single query.
+
+    Returns the numbers of all, active, and not processed records of the task, and of all the
+    user invitations and all the tasks.
+    """
+    total, active, unprocessed, invitations, tasks = AffiliationRecord.select(
+        fn.COUNT(AffiliationRecord.id),
+        fn.SUM(case(None, [(AffiliationRecord.is_active, 1)], 0)),
+        fn.SUM(case(None, [(AffiliationRecord.processed_at.is_null(), 1)], 0)),
+        UserInvitation.select(fn.COUNT(UserInvitation.id)),
+        Task.select(fn.COUNT(Task.id)),
+    ).where(AffiliationRecord.task_id == task_id).scalar(as_tuple=True)
+    return RecordStats(total, active or 0, unprocessed or 0, invitations, tasks)
+
+
+@pytest.fixture
+def affiliation_task(client, test0_admin):
+    """Log in the admin of TEST0 and upload an affiliation task, returns the task ID."""
+    client.login(test0_admin)
+    resp = client.post(
+        "/load/researcher",
+        data={
+            "save":
+            "Upload",
+            "file_": (
+                BytesIO(b"First Name,Last Name,Email,Affiliation Type, Visibility, Disambiguated Id, "
+                        b"""Disambiguation Source
+Roshan,Pawar,researcher.010@mailinator.com,Student,PRIVate,3232,RINGGOLD
+Rad,Cirskis,researcher.990@mailinator.com,Staff,PRIVate,3232,RINGGOLD
+"""),
+                "affiliations.csv",
+            ),
+        })
+    assert resp.status_code == 302
+    return int(TASK_ID_RE.search(resp.location)[1])
+
+
+@pytest.mark.parametrize("export_type", EXPORT_TYPES)
+def test_affiliation_export(client, affiliation_task, export_type):
+    """Test affiliation task export."""
+    task_id = affiliation_task
+
+    # Missing ID:
+    resp = client.get(f"/admin/affiliationrecord/export/{export_type}", follow_redirects=True)
+    assert b"Cannot invoke the task view without task ID" in resp.data
+
+    # Non-existing task:
+    resp = client.get(f"/admin/affiliationrecord/export/{export_type}/?task_id=9999999")
+    assert b"The task deesn't exist." in resp.data
+
+    # Incorrect task ID:
+    resp = client.get(
+        f"/admin/affiliationrecord/export/{export_type}/?task_id=ERROR-9999999",
+        follow_redirects=True)
+    assert b"Missing or incorrect task ID value" in resp.data
+
+    resp = client.get(f"/admin/affiliationrecord/export/{export_type}/?task_id={task_id}")
+    ct = resp.headers["Content-Type"]
+    assert (export_type in ct or (export_type == "xls" and "application/vnd.ms-excel" == ct)
+            or (export_type == "tsv" and "text/tab-separated-values" in ct)
+            or (export_type == "yaml" and "application/octet-stream" in ct)
+            or (export_type == "xlsx"
+                and "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" == ct)
+            or (export_type == "ods" and "application/vnd.oasis.opendocument.spreadsheet" == ct))
+    assert CONTENT_DISPOSITION_RES[export_type].match(resp.headers["Content-Disposition"])
+    if export_type not in ["xlsx", "ods"]:
+        assert b"researcher.010@mailinator.com" in resp.data
+
+
+@pytest.mark.parametrize("export_type", ["yaml", "json"])
+def test_affiliation_reimport(client, affiliation_task, export_type):
+    """Test reupload of a retrieved copy of the task (in the other format)."""
+    task_id = affiliation_task
+    AffiliationRecord.update(
+        start_date=PartialDate.create("1990"), end_date=PartialDate.create("2024-12")).where(
+            AffiliationRecord.task_id == task_id).execute()
+    task_count = Task.select().count()
+    resp = client.get(f"/admin/affiliationrecord/export/{export_type}/?task_id={task_id}")
+    if export_type == "json":
+        data = json.loads(resp.data)
+    else:
+        data = yaml.load(resp.data, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    del(data["id"])
+    import_type = "json" if export_type == "yaml" else "yaml"
+    resp = client.post(
+        "/load/researcher",
+        data={
+            "save":
+            "Upload",
+            "file_": (
+                BytesIO((json.dumps(data, default=json_default)
+                         if import_type == "json" else utils.dump_yaml(data)).encode()),
+                f"affiliations_004456.{import_type}",
+            ),
+        })
+    assert resp.status_code == 302
+    assert Task.select().count() == task_count + 1
+    task = Task.select().order_by(Task.id.desc()).first()
+    assert task.records.count() == 2
+    assert task.records.first().start_date == PartialDate.create("1990")
+
+
+def test_affiliation_tasks(client, test0_org, test0_admin):
     """Test affilaffiliation task upload."""
-    org = Organisation.get(name="TEST0")
-    user = User.get(email="admin@test0.edu")
+    org = test0_org
+    user = test0_admin
 
     resp = client.login(user, follow_redirects=True)
     assert b"Organisations using the Hub:" in resp.data
@@ -1553,12 +1612,14 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
             ),
         })
     assert resp.status_code == 302
-    task_id = int(re.search(r"\/admin\/affiliationrecord/\?task_id=(\d+)", resp.location)[1])
+    task_id = int(TASK_ID_RE.search(resp.location)[1])
     assert task_id
     task = Task.get(task_id)
     assert task.org == org
-    records = list(task.records)
-    assert len(records) == 4
+    record_ids = [
+        r for (r, ) in task.records.select(AffiliationRecord.id).order_by(AffiliationRecord.id).tuples()
+    ]
+    assert len(record_ids) == 4
 
     url = resp.location
     session_cookie, _ = resp.headers["Set-Cookie"].split(';', 1)
@@ -1593,7 +1654,7 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
         })
 
     # Activate a single record:,
-    rec_id = records[0].id
+    rec_id = record_ids[0]
     resp = client.post(
         "/admin/affiliationrecord/action/",
         follow_redirects=True,
@@ -1602,9 +1663,8 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
             "action": "activate",
             "rowid": rec_id,
         })
-    assert AffiliationRecord.select().where(AffiliationRecord.task_id == task_id,
-                                            AffiliationRecord.is_active).count() == 1
-    assert UserInvitation.select().count() == 1
+    stats = record_stats(task_id)
+    assert stats.active == 1 and stats.invitations == 1
 
     resp = client.post(
         f"/admin/affiliationrecord/new/?url={url}",
@@ -1617,7 +1677,7 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
             "is_active": 'y',
         })
 
-    rec = Task.get(task_id).records.order_by(AffiliationRecord.id.desc()).first()
+    rec = task.records.order_by(AffiliationRecord.id.desc()).first()
     assert rec.is_active
     assert UserInvitation.select().count() == 2
 
@@ -1630,7 +1690,7 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
             "email": "testABC2@test.test.test.org",
             "affiliation_type": "student",
         })
-    rec = Task.get(task_id).records.order_by(AffiliationRecord.id.desc()).first()
+    rec = task.records.order_by(AffiliationRecord.id.desc()).first()
     assert not rec.is_active
     assert UserInvitation.select().count() == 2
 
@@ -1646,15 +1706,16 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
         })
     rec = AffiliationRecord.get(rec.id)
     assert rec.is_active
-    assert UserInvitation.select().count() == 3
+    assert record_stats(task_id).invitations == 3
 
     # Activate all:
     resp = client.post("/activate_all", follow_redirects=True, data=dict(task_id=task_id))
-    assert AffiliationRecord.select().where(AffiliationRecord.task_id == task_id,
-                                            AffiliationRecord.is_active).count() == 7
+    stats = record_stats(task_id)
+    assert stats.active == 7 and stats.invitations == 5
 
     # Reste a single record
-    AffiliationRecord.update(processed_at=datetime.datetime(2018, 1, 1)).execute()
+    AffiliationRecord.update(processed_at=datetime.datetime(2018, 1, 1)).where(
+        AffiliationRecord.task_id == task_id).execute()
     resp = client.post(
         "/admin/affiliationrecord/action/",
         follow_redirects=True,
@@ -1663,74 +1724,12 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
             "action": "reset",
             "rowid": rec_id,
         })
-    assert AffiliationRecord.select().where(AffiliationRecord.task_id == task_id,
-                                            AffiliationRecord.processed_at.is_null()).count() == 1
+    assert record_stats(task_id).unprocessed == 1
 
     # Reset all:
     resp = client.post("/reset_all", follow_redirects=True, data=dict(task_id=task_id))
-    assert AffiliationRecord.select().where(AffiliationRecord.task_id == task_id,
-                                            AffiliationRecord.processed_at.is_null()).count() == 7
-
-    # Exporting:
-    for export_type in ["csv", "xls", "tsv", "yaml", "json", "xlsx", "ods", "html"]:
-        # Missing ID:
-        resp = client.get(f"/admin/affiliationrecord/export/{export_type}", follow_redirects=True)
-        assert b"Cannot invoke the task view without task ID" in resp.data
-
-        # Non-existing task:
-        resp = client.get(f"/admin/affiliationrecord/export/{export_type}/?task_id=9999999")
-        assert b"The task deesn't exist." in resp.data
-
-        # Incorrect task ID:
-        resp = client.get(
-            f"/admin/affiliationrecord/export/{export_type}/?task_id=ERROR-9999999",
-            follow_redirects=True)
-        assert b"Missing or incorrect task ID value" in resp.data
-
-        resp = client.get(f"/admin/affiliationrecord/export/{export_type}/?task_id={task_id}")
-        ct = resp.headers["Content-Type"]
-        assert (export_type in ct or (export_type == "xls" and "application/vnd.ms-excel" == ct)
-                or (export_type == "tsv" and "text/tab-separated-values" in ct)
-                or (export_type == "yaml" and "application/octet-stream" in ct)
-                or (export_type == "xlsx"
-                    and "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" == ct)
-                or (export_type == "ods" and "application/vnd.oasis.opendocument.spreadsheet" == ct))
-        assert re.match(f"attachment;filename=affiliations_20.*\\.{export_type}",
-                        resp.headers["Content-Disposition"])
-        if export_type not in ["xlsx", "ods"]:
-            assert b"researcher.010@mailinator.com" in resp.data
-
-    # Retrieve a copy of the task and attempt to reupload it:
-    for export_type in ["yaml", "json"]:
-        task_count = Task.select().count()
-        resp = client.get(f"/admin/affiliationrecord/export/{export_type}/?task_id={task_id}")
-        if export_type == "json":
-            data = json.loads(resp.data)
-        else:
-            data = yaml.load(resp.data)
-        del(data["id"])
-
-        def default(o):
-            if isinstance(o, datetime.datetime):
-                return o.isoformat(timespec="seconds")
-            elif isinstance(o, datetime.date):
-                return o.isoformat()
-
-        import_type = "json" if export_type == "yaml" else "yaml"
-        resp = client.post(
-            "/load/researcher",
-            data={
-                "save":
-                "Upload",
-                "file_": (
-                    BytesIO((json.dumps(data, default=default)
-                             if import_type == "json" else utils.dump_yaml(data)).encode()),
-                    f"affiliations_004456.{import_type}",
-                ),
-            })
-        assert resp.status_code == 302
-        assert Task.select().count() == task_count + 1
-        assert Task.select().order_by(Task.id.desc()).first().records.count() == 7
+    stats = record_stats(task_id)
+    assert stats.unprocessed == 7 and stats.total == 7
 
     # Delete records:
     resp = client.post(
@@ -1741,7 +1740,7 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
             "action": "delete",
             "rowid": rec_id,
         })
-    assert AffiliationRecord.select().where(AffiliationRecord.task_id == task_id).count() == 6
+    assert record_stats(task_id).total == 6
 
     # Delete more records:
     resp = client.post(
@@ -1750,60 +1749,72 @@ Rad,Cirskis,researcher.990@mailinator.com,Student,PRIVate,3232,RINGGOLD
         data={
             "url": f"/admin/affiliationrecord/?task_id={task_id}",
             "action": "delete",
-            "rowid": [ar.id for ar in records[1:-1]],
+            "rowid": record_ids[1:-1],
         })
-    assert AffiliationRecord.select().where(AffiliationRecord.task_id == task_id).count() == 4
+    assert record_stats(task_id).total == 4
 
     resp = client.post(
         "/admin/task/delete/", data=dict(id=task_id, url="/admin/task/"), follow_redirects=True)
     assert b"affiliations.csv" not in resp.data
-    assert Task.select().count() == 2
-    assert AffiliationRecord.select().where(AffiliationRecord.task_id == task_id).count() == 0
+    stats = record_stats(task_id)
+    assert stats.tasks == 0 and stats.total == 0
 
 
-def test_invite_organisation(client, mocker):
-    """Test invite an organisation to register."""
+def emails_response(email):
+    """Mock the response of the ORCID API email view with the given address."""
+    return Mock(data=json.dumps({"email": [{"email": email}]}))
+
+
+@pytest.mark.parametrize(
+    "org_name, tech_contact, role_name, other_role_name", [
+        ("THE ORGANISATION ABC1", True, "Technical Contact", "Organisation Administrator"),
+        ("THE ORGANISATION ABC2", False, "Organisation Administrator", "Technical Contact"),
+    ])
+def test_invite_organisation_email(client, mocker, test0_org, org_name, tech_contact, role_name,
+                                   other_role_name):
+    """Test the role stated in the organisation invitation email."""
     exception = mocker.patch.object(client.application.logger, "exception")
     html = mocker.patch(
         "emails.html", return_value=Mock(send=lambda *args, **kwargs: Mock(success=False)))
-    org = Organisation.get(name="TEST0")
-    user = User.create(
+    user = create_user_with_org(
+        test0_org,
         email="test123_test_invite_organisation@test.test.net",
         name="TEST USER",
         confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+        is_admin=True)
+    data = {
+        "org_name": org_name,
+        "org_email": user.email,
+        "first_name": "XYZ",
+        "last_name": "XYZ",
+        "city": "XYZ"
+    }
+    if tech_contact:
+        data.update(tech_contact="True", via_orcid="True")
 
     client.login_root()
-    resp = client.post(
-            "/invite/organisation",
-            data={
-                "org_name": "THE ORGANISATION ABC1",
-                "org_email": user.email,
-                "tech_contact": "True",
-                "via_orcid": "True",
-                "first_name": "XYZ",
-                "last_name": "XYZ",
-                "city": "XYZ"
-            })
+    client.post("/invite/organisation", data=data)
     html.assert_called_once()
     _, kwargs = html.call_args
-    assert "Technical Contact" in kwargs["html"]
-    assert "Organisation Administrator" not in kwargs["html"]
+    assert role_name in kwargs["html"]
+    assert other_role_name not in kwargs["html"]
+    exception.assert_called()
 
-    resp = client.post(
-            "/invite/organisation",
-            data={
-                "org_name": "THE ORGANISATION ABC2",
-                "org_email": user.email,
-                "first_name": "xyz",
-                "last_name": "xyz",
-                "city": "xyz"
-            })
-    _, kwargs = html.call_args
-    assert "Organisation Administrator" in kwargs["html"]
-    assert "Technical Contact" not in kwargs["html"]
 
+def test_invite_organisation(client, mocker):
+    """Test invite an organisation to register."""
+    exception = mocker.patch.object(client.application.logger, "exception")
+    mocker.patch(
+        "emails.html", return_value=Mock(send=lambda *args, **kwargs: Mock(success=False)))
+    org = Organisation.get(name="TEST0")
+    user = create_user_with_org(
+        org,
+        email="test123_test_invite_organisation@test.test.net",
+        name="TEST USER",
+        confirmed=True,
+        is_admin=True)
+
+    client.login_root()
     send_email = mocker.patch("orcid_hub.utils.send_email")
     org = Organisation.create(name="ORG NAME", confirmed=True)
     resp = client.post(
@@ -1863,13 +1874,7 @@ def test_invite_organisation(client, mocker):
     client.logout()
 
     # Attempt to login via ORCID with the invitation token
-    resp = client.get(invitation_url)
-    auth_url = re.search(r"window.location='([^']*)'", resp.data.decode()).group(1)
-    qs = parse_qs(urlparse(auth_url).query)
-    redirect_uri = qs["redirect_uri"][0]
-    oauth_state = qs["state"][0]
-    callback_url = redirect_uri + "&state=" + oauth_state
-    assert session["oauth_state"] == oauth_state
+    callback_url = orcid_callback_url(client, invitation_url)
     mocker.patch(
         "orcid_hub.authcontroller.OAuth2Session.fetch_token",
         return_value={
@@ -1898,7 +1903,7 @@ def test_invite_organisation(client, mocker):
     mocker.patch.object(
             orcid_client.MemberAPIV20Api,
             "view_emails",
-            return_value=Mock(data="""{"email": [{"email": "some_ones_else@test.edu"}]}"""))
+            return_value=emails_response("some_ones_else@test.edu"))
     resp = client.get(callback_url, follow_redirects=True)
     assert b"cannot verify your email address" in resp.data
     assert user.orcid is None
@@ -1906,10 +1911,9 @@ def test_invite_organisation(client, mocker):
     mocker.patch.object(
         orcid_client.MemberAPIV20Api,
         "view_emails",
-        return_value=Mock(data=json.dumps(dict(email=[dict(email=user.email)]))))
+        return_value=emails_response(user.email))
     resp = client.get(callback_url)
-    user = User.get(user.id)
-    assert user.orcid == "3210-4321-8765-3210"
+    assert User.select(User.orcid).where(User.id == user.id).scalar() == "3210-4321-8765-3210"
     assert "viewmembers" in resp.location
 
     # New non-onboarded organisation
@@ -1937,13 +1941,7 @@ def test_invite_organisation(client, mocker):
     assert invitation_url.endswith(invitation.token)
     client.logout()
 
-    resp = client.get(invitation_url)
-    auth_url = re.search(r"window.location='([^']*)'", resp.data.decode()).group(1)
-    qs = parse_qs(urlparse(auth_url).query)
-    redirect_uri = qs["redirect_uri"][0]
-    oauth_state = qs["state"][0]
-    callback_url = redirect_uri + "&state=" + oauth_state
-    assert session["oauth_state"] == oauth_state
+    callback_url = orcid_callback_url(client, invitation_url)
     mocker.patch(
         "orcid_hub.authcontroller.OAuth2Session.fetch_token",
         return_value={
@@ -1957,7 +1955,7 @@ def test_invite_organisation(client, mocker):
     mocker.patch.object(
         orcid_client.MemberAPIV20Api,
         "view_emails",
-        return_value=Mock(data=json.dumps(dict(email=[dict(email=email)]))))
+        return_value=emails_response(email))
     resp = client.get(callback_url)
     user = User.get(email=email)
     assert user.orcid == "3210-4321-8765-8888"
@@ -1965,52 +1963,55 @@ def test_invite_organisation(client, mocker):
     exception.assert_called()
 
 
-def core_mock(
-        self=None,
-        source_file=None,
-        schema_files=None,
-        source_data=None,
-        schema_data=None,
-        extensions=None,
-        strict_rule_validation=False,
-        fix_ruby_style_regex=False,
-        allow_assertions=False,
-):
-    """Mock validation api call."""
-    return None
+FUNDING_JSON = (
+    b'[{"invitees": [{"identifier":"00001", "email": "marco.232323newwjwewkppp@mailinator.com",'
+    b'"first-name": "Alice", "last-name": "Contributor 1", "ORCID-iD": null, "put-code":null}],'
+    b'"title": { "title": { "value": "1ral"}},"short-description": "Mi","type": "CONTRACT",'
+    b'"contributors": {"contributor": [{"contributor-attributes": {"contributor-role": '
+    b'"co_lead"},"credit-name": {"value": "firentini"}}]}'
+    b', "external-ids": {"external-id": [{"external-id-value": '
+    b'"GNS170661","external-id-type": "grant_number", "external-id-relationship": "SELF"}]}}]')
+
+WORK_JSON = (
+    b'[{"invitees": [{"identifier":"00001", "email": "marco.232323newwjwewkppp@mailinator.com",'
+    b'"first-name": "Alice", "last-name": "Contributor 1", "ORCID-iD": null, "put-code":null}],'
+    b'"title": { "title": { "value": "1ral"}}, "citation": {"citation-type": '
+    b'"FORMATTED_UNSPECIFIED", "citation-value": "This is value"}, "type": "BOOK_CHAPTER",'
+    b'"contributors": {"contributor": [{"contributor-attributes": {"contributor-role": '
+    b'"AUTHOR", "contributor-sequence" : "1"},"credit-name": {"value": "firentini"}}]}'
+    b', "external-ids": {"external-id": [{"external-id-value": '
+    b'"GNS170661","external-id-type": "grant_number", "external-id-relationship": "SELF"}]}}]')
+
+PEER_REVIEW_JSON = (
+    b'[{"invitees": [{"identifier": "00001", "email": "contriuto7384P@mailinator.com", '
+    b'"first-name": "Alice", "last-name": "Contributor 1", "ORCID-iD": null, "put-code": null}]'
+    b', "reviewer-role": "REVIEWER", "review-identifiers": { "external-id": [{ '
+    b'"external-id-type": "source-work-id", "external-id-value": "1212221", "external-id-url": '
+    b'{"value": "https://localsystem.org/1234"}, "external-id-relationship": "SELF"}]}, '
+    b'"review-type": "REVIEW", "review-group-id": "issn:90122", "subject-container-name": { '
+    b'"value": "Journal title"}, "subject-type": "JOURNAL_ARTICLE", "subject-name": { '
+    b'"title": {"value": "Name of the paper reviewed"}},"subject-url": { '
+    b'"value": "https://subject-alt-url.com"}, "convening-organization": { "name": '
+    b'"The University of Auckland", "address": { "city": "Auckland", "region": "Auckland",'
+    b' "country": "NZ" } }}]')
 
 
-def validate(self=None, raise_exception=True):
-    """Mock validation api call."""
-    return False
+@pytest.fixture
+def no_schema_validation(mocker):
+    """Bypass the schema validation (pykwalify) of the loaded files."""
+    mocker.patch("pykwalify.core.Core.__init__", return_value=None)
+    mocker.patch("pykwalify.core.Core.validate", return_value=False)
 
 
-@patch("pykwalify.core.Core.validate", side_effect=validate)
-@patch("pykwalify.core.Core.__init__", side_effect=core_mock)
-def test_load_researcher_funding(patch, patch2, request_ctx):
+def test_load_researcher_funding(no_schema_validation, request_ctx, admin_user):
     """Test preload organisation data."""
-    org = request_ctx.data["org"]
-    user = User.create(
-        email="test123@test.test.net",
-        name="TEST USER",
-        roles=Role.ADMIN,
-        orcid="123",
-        confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+    user = admin_user
     with request_ctx(
             "/load/researcher/funding",
             method="POST",
             data={
                 "file_": (
-                        BytesIO(
-                            b'[{"invitees": [{"identifier":"00001", "email": "marco.232323newwjwewkppp@mailinator.com",'
-                            b'"first-name": "Alice", "last-name": "Contributor 1", "ORCID-iD": null, "put-code":null}],'
-                            b'"title": { "title": { "value": "1ral"}},"short-description": "Mi","type": "CONTRACT",'
-                            b'"contributors": {"contributor": [{"contributor-attributes": {"contributor-role": '
-                            b'"co_lead"},"credit-name": {"value": "firentini"}}]}'
-                            b', "external-ids": {"external-id": [{"external-id-value": '
-                            b'"GNS170661","external-id-type": "grant_number", "external-id-relationship": "SELF"}]}}]'),
+                        BytesIO(FUNDING_JSON),
                         "logo.json",),
                 "email": user.email
             }) as ctx:
@@ -2022,9 +2023,7 @@ def test_load_researcher_funding(patch, patch2, request_ctx):
         assert "funding" in resp.location
 
 
-@patch("pykwalify.core.Core.validate", side_effect=validate)
-@patch("pykwalify.core.Core.__init__", side_effect=core_mock)
-def test_load_researcher_work(patch, patch2, request_ctx):
+def test_load_researcher_work(no_schema_validation, request_ctx):
     """Test preload work data."""
     user = User.get(email="admin@test1.edu")
     user.roles = Role.ADMIN
@@ -2034,15 +2033,7 @@ def test_load_researcher_work(patch, patch2, request_ctx):
             method="POST",
             data={
                 "file_": (
-                        BytesIO(
-                            b'[{"invitees": [{"identifier":"00001", "email": "marco.232323newwjwewkppp@mailinator.com",'
-                            b'"first-name": "Alice", "last-name": "Contributor 1", "ORCID-iD": null, "put-code":null}],'
-                            b'"title": { "title": { "value": "1ral"}}, "citation": {"citation-type": '
-                            b'"FORMATTED_UNSPECIFIED", "citation-value": "This is value"}, "type": "BOOK_CHAPTER",'
-                            b'"contributors": {"contributor": [{"contributor-attributes": {"contributor-role": '
-                            b'"AUTHOR", "contributor-sequence" : "1"},"credit-name": {"value": "firentini"}}]}'
-                            b', "external-ids": {"external-id": [{"external-id-value": '
-                            b'"GNS170661","external-id-type": "grant_number", "external-id-relationship": "SELF"}]}}]'),
+                        BytesIO(WORK_JSON),
                         "logo.json",),
                 "email": user.email
             }) as ctx:
@@ -2054,9 +2045,7 @@ def test_load_researcher_work(patch, patch2, request_ctx):
         assert "work" in resp.location
 
 
-@patch("pykwalify.core.Core.validate", side_effect=validate)
-@patch("pykwalify.core.Core.__init__", side_effect=core_mock)
-def test_load_researcher_peer_review(patch, patch2, request_ctx):
+def test_load_researcher_peer_review(no_schema_validation, request_ctx):
     """Test preload peer review data."""
     user = User.get(email="admin@test1.edu")
     user.roles = Role.ADMIN
@@ -2066,18 +2055,7 @@ def test_load_researcher_peer_review(patch, patch2, request_ctx):
             method="POST",
             data={
                 "file_": (
-                        BytesIO(
-                            b'[{"invitees": [{"identifier": "00001", "email": "contriuto7384P@mailinator.com", '
-                            b'"first-name": "Alice", "last-name": "Contributor 1", "ORCID-iD": null, "put-code": null}]'
-                            b', "reviewer-role": "REVIEWER", "review-identifiers": { "external-id": [{ '
-                            b'"external-id-type": "source-work-id", "external-id-value": "1212221", "external-id-url": '
-                            b'{"value": "https://localsystem.org/1234"}, "external-id-relationship": "SELF"}]}, '
-                            b'"review-type": "REVIEW", "review-group-id": "issn:90122", "subject-container-name": { '
-                            b'"value": "Journal title"}, "subject-type": "JOURNAL_ARTICLE", "subject-name": { '
-                            b'"title": {"value": "Name of the paper reviewed"}},"subject-url": { '
-                            b'"value": "https://subject-alt-url.com"}, "convening-organization": { "name": '
-                            b'"The University of Auckland", "address": { "city": "Auckland", "region": "Auckland",'
-                            b' "country": "NZ" } }}]'),
+                        BytesIO(PEER_REVIEW_JSON),
                         "logo.json",),
                 "email": user.email
             }) as ctx:
@@ -2089,17 +2067,9 @@ def test_load_researcher_peer_review(patch, patch2, request_ctx):
         assert "peer" in resp.location
 
 
-def test_load_researcher_affiliations(request_ctx):
+def test_load_researcher_affiliations(request_ctx, admin_user):
     """Test preload organisation data."""
-    org = request_ctx.data["org"]
-    user = User.create(
-        email="test123@test.test.net",
-        name="TEST USER",
-        roles=Role.ADMIN,
-        orcid="123",
-        confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
+    user = admin_user
     form = FileUploadForm()
     form.file_.name = "conftest.py"
     with request_ctx("/load/researcher", method="POST", data={"file_": "{'filename': 'xyz.json'}",
@@ -2111,115 +2081,81 @@ def test_load_researcher_affiliations(request_ctx):
         assert user.email.encode() in resp.data
 
 
-def test_edit_record(request_ctx):
-    """Test create a new or edit an existing profile section record."""
-    admin = User.get(email="admin@test0.edu")
+@pytest.fixture
+def orcid_tokens(app):
+    """Create the activity and the person update access tokens of a researcher of TEST0."""
     user = User.get(email="researcher100@test0.edu")
-    admin.organisation.orcid_client_id = "ABC123"
-    admin.organisation.save()
     if not user.orcid:
         user.orcid = "XXXX-XXXX-XXXX-0001"
         user.save()
-    fake_response = make_response
-    fake_response.status = 201
-    fake_response.headers = {'Location': '12344/xyz/12399'}
-    OrcidToken.create(user=user,
-                      org=user.organisation,
-                      access_token="ABC123",
-                      scopes="/read-limited,/activities/update")
-    OrcidToken.create(user=user,
-                      org=user.organisation,
-                      access_token="ABC1234",
-                      scopes="/read-limited,/person/update")
-    with patch.object(
-            orcid_client.MemberAPIV20Api,
-            "view_employment",
-            MagicMock(return_value=make_fake_response('{"test": "TEST1234567890"}'))
-    ) as view_employment, request_ctx(f"/section/{user.id}/EMP/1212/edit") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_employment.assert_called_once_with("XXXX-XXXX-XXXX-0001", 1212)
-    with patch.object(
-            orcid_client.MemberAPIV20Api,
-            "view_education",
-            MagicMock(return_value=make_fake_response('{"test": "TEST1234567890"}'))
-    ) as view_education, request_ctx(f"/section/{user.id}/EDU/1234/edit") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_education.assert_called_once_with("XXXX-XXXX-XXXX-0001", 1234)
-    with patch.object(
-            orcid_client.MemberAPIV20Api,
-            "view_funding",
-            MagicMock(return_value=make_fake_response('{"test":123}', dict={"external_ids": {"external_id": [
-            {"external_id_type": "test", "external_id_value": "test", "external_id_url": {"value": "test"},
-             "external_id_relationship": "SELF"}]}}))
-    ) as view_funding, request_ctx(f"/section/{user.id}/FUN/1234/edit") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_funding.assert_called_once_with("XXXX-XXXX-XXXX-0001", 1234)
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_peer_review",
-        MagicMock(return_value=make_fake_response('{"test":123}', dict={"review_identifiers": {"external-id": [
-            {"external-id-type": "test", "external-id-value": "test", "external-id-url": {"value": "test"},
-             "external-id-relationship": "SELF"}]}}))
-    ) as view_peer_review, request_ctx(f"/section/{user.id}/PRR/1234/edit") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_peer_review.assert_called_once_with("XXXX-XXXX-XXXX-0001", 1234)
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_work",
-        MagicMock(return_value=make_fake_response('{"test":123}', dict={"external_ids": {"external-id": [
-            {"external-id-type": "test", "external-id-value": "test", "external-id-url": {"value": "test"},
-             "external-id-relationship": "SELF"}]}}))
-    ) as view_work, request_ctx(f"/section/{user.id}/WOR/1234/edit") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_work.assert_called_once_with("XXXX-XXXX-XXXX-0001", 1234)
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_researcher_url",
-        MagicMock(return_value=Mock(data="""{"visibility": "PUBLIC"}"""))
-    ) as view_researcher_url, request_ctx(f"/section/{user.id}/RUR/1234/edit") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_researcher_url.assert_called_once_with("XXXX-XXXX-XXXX-0001", 1234, _preload_content=False)
-    with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_other_name",
-        MagicMock(return_value=Mock(data="""{"visibility": "PUBLIC", "content": "xyz"}"""))
-    ) as view_other_name, request_ctx(f"/section/{user.id}/ONR/1234/edit") as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert admin.email.encode() in resp.data
-        assert admin.name.encode() in resp.data
-        view_other_name.assert_called_once_with("XXXX-XXXX-XXXX-0001", 1234, _preload_content=False)
+    return [
+        OrcidToken.create(user=user, org=user.organisation, access_token=access_token, scopes=scopes)
+        for access_token, scopes in [
+            ("ABC123", "/read-limited,/activities/update"),
+            ("ABC1234", "/read-limited,/person/update"),
+        ]
+    ]
+
+
+@pytest.mark.parametrize(
+    "section_type, method_name, put_code, content, preload_content", [
+        ("EMP", "view_employment", 1212, '{"test": "TEST1234567890"}', True),
+        ("EDU", "view_education", 1234, '{"test": "TEST1234567890"}', True),
+        ("FUN", "view_funding", 1234, '{"test":123}', True),
+        ("PRR", "view_peer_review", 1234, '{"test":123}', True),
+        ("WOR", "view_work", 1234, '{"test":123}', True),
+        ("RUR", "view_researcher_url", 1234, '{"visibility": "PUBLIC"}', False),
+        ("ONR", "view_other_name", 1234, '{"visibility": "PUBLIC", "content": "xyz"}', False),
+        ("KWR", "view_keyword", 1234, '{"visibility": "PUBLIC"}', False),
+    ])
+def test_edit_record_form(request_ctx, test0_admin, orcid_tokens, section_type, method_name,
+                          put_code, content, preload_content):
+    """Test the edit form of an existing profile section record."""
+    admin = test0_admin
+    user = orcid_tokens[0].user
+    admin.organisation.orcid_client_id = "ABC123"
+    admin.organisation.save()
+    response = make_fake_response(content) if preload_content else Mock(data=content)
     with patch.object(
-        orcid_client.MemberAPIV20Api,
-        "view_keyword",
-        MagicMock(return_value=Mock(data="""{"visibility": "PUBLIC"}"""))
-    ) as view_keyword, request_ctx(f"/section/{user.id}/KWR/1234/edit") as ctx:
+            orcid_client.MemberAPIV20Api, method_name, MagicMock(return_value=response)
+    ) as view_record, request_ctx(f"/section/{user.id}/{section_type}/{put_code}/edit") as ctx:
         login_user(admin)
         resp = ctx.app.full_dispatch_request()
         assert admin.email.encode() in resp.data
         assert admin.name.encode() in resp.data
-        view_keyword.assert_called_once_with("XXXX-XXXX-XXXX-0001", 1234, _preload_content=False)
-    with patch.object(
-            orcid_client.MemberAPIV20Api, "create_education",
-            MagicMock(return_value=fake_response)), request_ctx(
+        if preload_content:
+            view_record.assert_called_once_with("XXXX-XXXX-XXXX-0001", put_code)
+        else:
+            view_record.assert_called_once_with(
+                "XXXX-XXXX-XXXX-0001", put_code, _preload_content=False)
+
+
+# ORCID API response to a record creation (put-code: 12399):
+CREATED_RESPONSE = SimpleNamespace(status=201, headers={"Location": "12344/xyz/12399"})
+
+
+@pytest.fixture
+def orcid_api_mocks(mocker):
+    """Patch the record creation methods of the ORCID API, returns the mocks by the method name."""
+    return {
+        name: mocker.patch.object(
+            orcid_client.MemberAPIV20Api, name, return_value=CREATED_RESPONSE)
+        for name in [
+            "create_education", "create_funding", "create_peer_review", "create_work",
+            "create_researcher_url", "create_other_name", "create_keyword"
+        ]
+    }
+
+
+def test_edit_record(request_ctx, test0_admin, orcid_tokens, orcid_api_mocks):
+    """Test create a new profile section record."""
+    # all the writes of the test go into a single transaction that gets rolled back at the end:
+    with User._meta.database.atomic() as transaction:
+        admin = test0_admin
+        user = orcid_tokens[0].user
+        admin.organisation.orcid_client_id = "ABC123"
+        admin.organisation.save()
+        with request_ctx(
                 f"/section/{user.id}/EDU/new",
                 method="POST",
                 data={
@@ -2227,16 +2163,14 @@ def test_edit_record(request_ctx):
                     "country": "NZ",
                     "org_name": "TEST",
                 }) as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 302
-        assert resp.location == f"/section/{user.id}/EDU/list"
-        affiliation_record = UserOrgAffiliation.get(user=user)
-        # checking if the UserOrgAffiliation record is updated with put_code supplied from fake response
-        assert 12399 == affiliation_record.put_code
-    with patch.object(
-            orcid_client.MemberAPIV20Api, "create_funding",
-            MagicMock(return_value=fake_response)), request_ctx(
+            login_user(admin)
+            resp = ctx.app.full_dispatch_request()
+            assert resp.status_code == 302
+            assert resp.location == f"/section/{user.id}/EDU/list"
+            affiliation_record = UserOrgAffiliation.get(user=user)
+            # checking if the UserOrgAffiliation record is updated with put_code supplied from fake response
+            assert 12399 == affiliation_record.put_code
+        with request_ctx(
                 f"/section/{user.id}/FUN/new",
                 method="POST",
                 data={
@@ -2254,13 +2188,11 @@ def test_edit_record(request_ctx):
                     "grant_number": "TEST123",
                     "grant_relationship": "SELF"
                 }) as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 302
-        assert resp.location == f"/section/{user.id}/FUN/list"
-    with patch.object(
-            orcid_client.MemberAPIV20Api, "create_peer_review",
-            MagicMock(return_value=fake_response)), request_ctx(
+            login_user(admin)
+            resp = ctx.app.full_dispatch_request()
+            assert resp.status_code == 302
+            assert resp.location == f"/section/{user.id}/FUN/list"
+        with request_ctx(
                 f"/section/{user.id}/PRR/new",
                 method="POST",
                 data={
@@ -2288,13 +2220,11 @@ def test_edit_record(request_ctx):
                     "grant_number": "TEST123",
                     "grant_relationship": "SELF"
                 }) as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 302
-        assert resp.location == f"/section/{user.id}/PRR/list"
-    with patch.object(
-            orcid_client.MemberAPIV20Api, "create_work",
-            MagicMock(return_value=fake_response)), request_ctx(
+            login_user(admin)
+            resp = ctx.app.full_dispatch_request()
+            assert resp.status_code == 302
+            assert resp.location == f"/section/{user.id}/PRR/list"
+        with request_ctx(
                 f"/section/{user.id}/WOR/new",
                 method="POST",
                 data={
@@ -2316,13 +2246,11 @@ def test_edit_record(request_ctx):
                     "url": "test",
                     "language_code": "en"
                 }) as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 302
-        assert resp.location == f"/section/{user.id}/WOR/list"
-    with patch.object(
-            orcid_client.MemberAPIV20Api, "create_researcher_url",
-            MagicMock(return_value=fake_response)), request_ctx(
+            login_user(admin)
+            resp = ctx.app.full_dispatch_request()
+            assert resp.status_code == 302
+            assert resp.location == f"/section/{user.id}/WOR/list"
+        with request_ctx(
                 f"/section/{user.id}/RUR/new",
                 method="POST",
                 data={
@@ -2331,13 +2259,11 @@ def test_edit_record(request_ctx):
                     "visibility": "PUBLIC",
                     "display_index": "FIRST",
                 }) as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 302
-        assert resp.location == f"/section/{user.id}/RUR/list"
-    with patch.object(
-            orcid_client.MemberAPIV20Api, "create_other_name",
-            MagicMock(return_value=fake_response)), request_ctx(
+            login_user(admin)
+            resp = ctx.app.full_dispatch_request()
+            assert resp.status_code == 302
+            assert resp.location == f"/section/{user.id}/RUR/list"
+        with request_ctx(
                 f"/section/{user.id}/ONR/new",
                 method="POST",
                 data={
@@ -2345,13 +2271,11 @@ def test_edit_record(request_ctx):
                     "visibility": "PUBLIC",
                     "display_index": "FIRST",
                 }) as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 302
-        assert resp.location == f"/section/{user.id}/ONR/list"
-    with patch.object(
-            orcid_client.MemberAPIV20Api, "create_keyword",
-            MagicMock(return_value=fake_response)), request_ctx(
+            login_user(admin)
+            resp = ctx.app.full_dispatch_request()
+            assert resp.status_code == 302
+            assert resp.location == f"/section/{user.id}/ONR/list"
+        with request_ctx(
                 f"/section/{user.id}/KWR/new",
                 method="POST",
                 data={
@@ -2359,129 +2283,115 @@ def test_edit_record(request_ctx):
                     "visibility": "PUBLIC",
                     "display_index": "FIRST",
                 }) as ctx:
-        login_user(admin)
-        resp = ctx.app.full_dispatch_request()
-        assert resp.status_code == 302
-        assert resp.location == f"/section/{user.id}/KWR/list"
+            login_user(admin)
+            resp = ctx.app.full_dispatch_request()
+            assert resp.status_code == 302
+            assert resp.location == f"/section/{user.id}/KWR/list"
+        assert all(m.call_count == 1 for m in orcid_api_mocks.values())
+        transaction.rollback()
 
 
-def test_delete_profile_entries(client, mocker):
+def test_delete_profile_entries(request_ctx):
     """Test delete an employment record."""
     admin = User.get(email="admin@test0.edu")
     user = User.select().join(OrcidToken,
                               JOIN.LEFT_OUTER).where(User.organisation == admin.organisation,
                                                      User.orcid.is_null(),
                                                      OrcidToken.id.is_null()).first()
+    delete_url, list_url = f"/section/{user.id}/EMP/1212/delete", f"/section/{user.id}/EMP/list"
 
-    client.login(user)
-    resp = client.post(f"/section/{user.id}/EMP/1212/delete")
+    def delete_record(current_user, user_id=user.id):
+        """Call the view directly: only the redirects get checked, no full dispatch is needed."""
+        with request_ctx(delete_url, method="POST"):
+            login_user(current_user)
+            return views.delete_record(user_id, "EMP", 1212)
+
+    resp = delete_record(user)
     assert resp.status_code == 302
     assert "/?next=" in resp.location
 
-    client.logout()
-    client.login(admin)
-    resp = client.post(f"/section/{user.id}/EMP/1212/delete")
-    resp = client.post(f"/section/99999999/EMP/1212/delete")
+    resp = delete_record(admin, user_id=99999999)
     assert resp.status_code == 302
     assert resp.location.endswith("/admin/viewmembers/")
 
-    resp = client.post(f"/section/{user.id}/EMP/1212/delete")
+    resp = delete_record(admin)
     assert resp.status_code == 302
-    assert resp.location.endswith(f"/section/{user.id}/EMP/list")
+    assert resp.location.endswith(list_url)
 
     admin.organisation.orcid_client_id = "ABC123"
     admin.organisation.save()
 
-    resp = client.post(f"/section/{user.id}/EMP/1212/delete")
+    resp = delete_record(admin)
     assert resp.status_code == 302
-    assert resp.location.endswith(f"/section/{user.id}/EMP/list")
+    assert resp.location.endswith(list_url)
 
     if not user.orcid:
         user.orcid = "XXXX-XXXX-XXXX-0001"
         user.save()
 
-    token = OrcidToken.create(
+    OrcidToken.create(
         user=user, org=user.organisation, access_token="ABC123", scopes="/read-limited")
 
-    resp = client.post(f"/section/{user.id}/EMP/1212/delete")
-    assert resp.status_code == 302
-    assert resp.location.endswith(f"/section/{user.id}/EMP/list")
-
-    token.scopes = "/read-limited,/activities/update"
-    token.save()
-
-    delete_employment = mocker.patch(
-            "orcid_hub.orcid_client.MemberAPIV20Api.delete_employment",
-            MagicMock(return_value='{"test": "TEST1234567890"}'))
-    resp = client.post(f"/section/{user.id}/EMP/12345/delete")
-    assert resp.status_code == 302
-    delete_employment.assert_called_once_with("XXXX-XXXX-XXXX-0001", 12345)
-
-    delete_education = mocker.patch(
-            "orcid_hub.orcid_client.MemberAPIV20Api.delete_education",
-            MagicMock(return_value='{"test": "TEST1234567890"}'))
-    resp = client.post(f"/section/{user.id}/EDU/54321/delete")
+    resp = delete_record(admin)
     assert resp.status_code == 302
-    delete_education.assert_called_once_with("XXXX-XXXX-XXXX-0001", 54321)
+    assert resp.location.endswith(list_url)
 
-    delete_funding = mocker.patch(
-            "orcid_hub.orcid_client.MemberAPIV20Api.delete_funding",
-            MagicMock(return_value='{"test": "TEST1234567890"}'))
-    resp = client.post(f"/section/{user.id}/FUN/54321/delete")
-    assert resp.status_code == 302
-    delete_funding.assert_called_once_with("XXXX-XXXX-XXXX-0001", 54321)
-
-    delete_peer_review = mocker.patch(
-            "orcid_hub.orcid_client.MemberAPIV20Api.delete_peer_review",
-            MagicMock(return_value='{"test": "TEST1234567890"}'))
-    resp = client.post(f"/section/{user.id}/PRR/54321/delete")
-    assert resp.status_code == 302
-    delete_peer_review.assert_called_once_with("XXXX-XXXX-XXXX-0001", 54321)
-
-    delete_work = mocker.patch(
-            "orcid_hub.orcid_client.MemberAPIV20Api.delete_work",
-            MagicMock(return_value='{"test": "TEST1234567890"}'))
-    resp = client.post(f"/section/{user.id}/WOR/54321/delete")
-    assert resp.status_code == 302
-    delete_work.assert_called_once_with("XXXX-XXXX-XXXX-0001", 54321)
-
-    token.scopes = "/read-limited,/person/update"
-    token.save()
-    delete_researcher_url = mocker.patch(
-            "orcid_hub.orcid_client.MemberAPIV20Api.delete_researcher_url",
-            MagicMock(return_value='{"test": "TEST1234567890"}'))
-    resp = client.post(f"/section/{user.id}/RUR/54321/delete")
-    assert resp.status_code == 302
-    delete_researcher_url.assert_called_once_with("XXXX-XXXX-XXXX-0001", 54321)
-
-    delete_other_name = mocker.patch(
-            "orcid_hub.orcid_client.MemberAPIV20Api.delete_other_name",
-            MagicMock(return_value='{"test": "TEST1234567890"}'))
-    resp = client.post(f"/section/{user.id}/ONR/54321/delete")
-    assert resp.status_code == 302
-    delete_other_name.assert_called_once_with("XXXX-XXXX-XXXX-0001", 54321)
 
-    delete_keyword = mocker.patch(
-            "orcid_hub.orcid_client.MemberAPIV20Api.delete_keyword",
-            MagicMock(return_value='{"test": "TEST1234567890"}'))
-    resp = client.post(f"/section/{user.id}/KWR/54321/delete")
+@pytest.fixture
+def profile_entry_user(client):
+    """Return a researcher with an ORCID iD (but no token yet) and log the organisation admin in."""
+    admin = User.get(email="admin@test0.edu")
+    user = User.select().join(OrcidToken,
+                              JOIN.LEFT_OUTER).where(User.organisation == admin.organisation,
+                                                     User.orcid.is_null(),
+                                                     OrcidToken.id.is_null()).first()
+    with User._meta.database.atomic():
+        Organisation.update(orcid_client_id="ABC123").where(
+            Organisation.id == admin.organisation_id).execute()
+        User.update(orcid="XXXX-XXXX-XXXX-0001").where(User.id == user.id).execute()
+    client.login(admin)
+    return user
+
+
+ACTIVITIES_UPDATE_SCOPES = "/read-limited,/activities/update"
+PERSON_UPDATE_SCOPES = "/read-limited,/person/update"
+
+
+@pytest.mark.parametrize("section_type,method_name,put_code,scopes", [
+    ("EMP", "delete_employment", 12345, ACTIVITIES_UPDATE_SCOPES),
+    ("EDU", "delete_education", 54321, ACTIVITIES_UPDATE_SCOPES),
+    ("FUN", "delete_funding", 54321, ACTIVITIES_UPDATE_SCOPES),
+    ("PRR", "delete_peer_review", 54321, ACTIVITIES_UPDATE_SCOPES),
+    ("WOR", "delete_work", 54321, ACTIVITIES_UPDATE_SCOPES),
+    ("RUR", "delete_researcher_url", 54321, PERSON_UPDATE_SCOPES),
+    ("ONR", "delete_other_name", 54321, PERSON_UPDATE_SCOPES),
+    ("KWR", "delete_keyword", 54321, PERSON_UPDATE_SCOPES),
+])
+def test_delete_profile_entry(client, mocker, profile_entry_user, section_type, method_name,
+                              put_code, scopes):
+    """Test delete a profile section entry with a token granting only the section's scope."""
+    user = profile_entry_user
+    OrcidToken.create(user=user, org=user.organisation_id, access_token="ABC123", scopes=scopes)
+    delete_entry = mocker.patch(
+            f"orcid_hub.orcid_client.MemberAPIV20Api.{method_name}",
+            return_value='{"test": "TEST1234567890"}')
+    resp = client.post(f"/section/{user.id}/{section_type}/{put_code}/delete")
     assert resp.status_code == 302
-    delete_keyword.assert_called_once_with("XXXX-XXXX-XXXX-0001", 54321)
+    delete_entry.assert_called_once_with("XXXX-XXXX-XXXX-0001", put_code)
 
 
-def test_viewmembers(client):
+def test_viewmembers(client, canonical_users):
     """Test affilated researcher view."""
     resp = client.get("/admin/viewmembers")
     assert resp.status_code == 302
 
-    non_admin = User.get(email="researcher100@test0.edu")
+    non_admin = canonical_users["researcher"]
     client.login(non_admin)
     resp = client.get("/admin/viewmembers")
     assert resp.status_code == 302
-    client.logout()
 
-    admin = User.get(email="admin@test0.edu")
-    client.login(admin)
+    admin = canonical_users["admin"]
+    client.switch_user(admin)
     resp = client.get("/admin/viewmembers")
     assert resp.status_code == 200
     assert b"researcher100@test0.edu" in resp.data
@@ -2526,22 +2436,21 @@ def test_viewmembers(client):
     resp = client.get(f"/admin/viewmembers/edit/?id=9999999999")
     assert resp.status_code == 404
 
-    user2 = User.get(email="researcher100@test1.edu")
+    user2 = canonical_users["researcher1"]
     resp = client.get(f"/admin/viewmembers/edit/?id={user2.id}")
     assert resp.status_code == 403
 
-    client.logout()
-    client.login_root()
+    client.switch_user(canonical_users["root"])
     resp = client.get("/admin/viewmembers")
 
 
 @patch("orcid_hub.views.requests.post")
-def test_viewmembers_delete(mockpost, client):
+def test_viewmembers_delete(mockpost, client, canonical_users):
     """Test affilated researcher deletion via the view."""
-    admin0 = User.get(email="admin@test0.edu")
-    admin1 = User.get(email="admin@test1.edu")
-    researcher0 = User.get(email="researcher100@test0.edu")
-    researcher1 = User.get(email="researcher100@test1.edu")
+    admin0 = canonical_users["admin"]
+    admin1 = canonical_users["admin1"]
+    researcher0 = canonical_users["researcher"]
+    researcher1 = canonical_users["researcher1"]
 
     # admin0 cannot deleted researcher1:
     resp = client.login(admin0, follow_redirects=True)
@@ -2585,10 +2494,9 @@ def test_viewmembers_delete(mockpost, client):
     with pytest.raises(User.DoesNotExist):
         User.get(id=researcher0.id)
 
-    client.logout()
     UserOrg.create(org=admin0.organisation, user=researcher1)
     OrcidToken.create(org=admin0.organisation, user=researcher1, access_token="ABC123")
-    client.login(admin1)
+    client.switch_user(admin1)
     payload = {
         "id": str(researcher1.id),
         "url": "/admin/viewmembers/",
@@ -2700,171 +2608,175 @@ def test_action_insert_update_group_id(mocker, client):
         assert b"<!DOCTYPE html>" in resp.data, "Expected HTML content"
 
 
+def first_record_reset_state(task):
+    """Get the status of the first record and the completion time of the task in one query."""
+    model = task.record_model
+    return model.select(model.status, Task.completed_at).join(Task).where(
+        model.task == task.id).tuples().first()
+
+
 def test_reset_all(client):
     """Test reset batch process."""
     org = client.data["org"]
-    user = User.create(
+    user = create_user_with_org(
+        org,
         email="test123@test.test.net",
         name="TEST USER",
         roles=Role.TECHNICAL,
         orcid="0000-0001-8930-6644",
         confirmed=True,
-        organisation=org)
-    UserOrg.create(user=user, org=org, is_admin=True)
-
-    task1 = Task.create(
-        org=org,
-        completed_at="12/12/12",
-        filename="affiliations0001.txt",
-        created_by=user,
-        updated_by=user,
-        task_type=TaskType.AFFILIATION)
+        is_admin=True)
 
-    AffiliationRecord.create(
-        is_active=True,
-        task=task1,
-        external_id="Test",
-        first_name="Test",
-        last_name="Test",
-        email="test1234456@mailinator.com",
-        orcid="0000-0002-1645-5339",
-        organisation="TEST ORG",
-        affiliation_type="staff",
-        role="Test",
-        department="Test",
-        city="Test",
-        state="Test",
-        country="Test",
-        disambiguated_id="Test",
-        disambiguation_source="Test")
-
-    UserInvitation.create(
-        invitee=user,
-        inviter=user,
-        org=org,
-        task=task1,
-        email="test1234456@mailinator.com",
-        token="xyztoken")
-
-    task2 = Task.create(
-        org=org,
-        completed_at="12/12/12",
-        filename="fundings001.txt",
-        created_by=user,
-        updated_by=user,
-        task_type=TaskType.FUNDING)
-
-    FundingRecord.create(
-        task=task2,
-        title="Test titile",
-        translated_title="Test title",
-        translated_title_language_code="Test",
-        type="GRANT",
-        organization_defined_type="Test org",
-        short_description="Test desc",
-        amount="1000",
-        currency="USD",
-        org_name="Test_orgname",
-        city="Test city",
-        region="Test",
-        country="Test",
-        disambiguated_id="Test_dis",
-        disambiguation_source="Test_source",
-        is_active=True,
-        visibility="Test_visibity")
-
-    task3 = Task.create(
-        org=org,
-        completed_at="12/12/12",
-        filename="peer-reviews-003.txt",
-        created_by=user,
-        updated_by=user,
-        task_type=TaskType.PEER_REVIEW)
-
-    PeerReviewRecord.create(
-        task=task3, review_group_id=1212, is_active=True, visibility="Test_visibity")
+    # the seed data of all the task types gets created in a single transaction:
+    with Task._meta.database.atomic():
+        task1 = Task.create(
+            org=org,
+            completed_at="12/12/12",
+            filename="affiliations0001.txt",
+            created_by=user,
+            updated_by=user,
+            task_type=TaskType.AFFILIATION)
+
+        AffiliationRecord.create(
+            is_active=True,
+            task=task1,
+            external_id="Test",
+            first_name="Test",
+            last_name="Test",
+            email="test1234456@mailinator.com",
+            orcid="0000-0002-1645-5339",
+            organisation="TEST ORG",
+            affiliation_type="staff",
+            role="Test",
+            department="Test",
+            city="Test",
+            state="Test",
+            country="Test",
+            disambiguated_id="Test",
+            disambiguation_source="Test")
+
+        UserInvitation.create(
+            invitee=user,
+            inviter=user,
+            org=org,
+            task=task1,
+            email="test1234456@mailinator.com",
+            token="xyztoken")
 
-    work_task = Task.create(
-        org=org,
-        completed_at="12/12/12",
-        filename="works001.txt",
-        created_by=user,
-        updated_by=user,
-        task_type=TaskType.WORK)
+        task2 = Task.create(
+            org=org,
+            completed_at="12/12/12",
+            filename="fundings001.txt",
+            created_by=user,
+            updated_by=user,
+            task_type=TaskType.FUNDING)
+
+        FundingRecord.create(
+            task=task2,
+            title="Test titile",
+            translated_title="Test title",
+            translated_title_language_code="Test",
+            type="GRANT",
+            organization_defined_type="Test org",
+            short_description="Test desc",
+            amount="1000",
+            currency="USD",
+            org_name="Test_orgname",
+            city="Test city",
+            region="Test",
+            country="Test",
+            disambiguated_id="Test_dis",
+            disambiguation_source="Test_source",
+            is_active=True,
+            visibility="Test_visibity")
+
+        task3 = Task.create(
+            org=org,
+            completed_at="12/12/12",
+            filename="peer-reviews-003.txt",
+            created_by=user,
+            updated_by=user,
+            task_type=TaskType.PEER_REVIEW)
 
-    WorkRecord.create(
-        task=work_task,
-        title=1212,
-        is_active=True,
-        citation_type="Test_citation_type",
-        citation_value="Test_visibity")
+        PeerReviewRecord.create(
+            task=task3, review_group_id=1212, is_active=True, visibility="Test_visibity")
 
-    property_task = Task.create(
-        org=org,
-        filename="xyz.json",
-        created_by=user,
-        updated_by=user,
-        task_type=TaskType.PROPERTY,
-        completed_at="12/12/12")
-
-    PropertyRecord.create(
-        task=property_task,
-        type="URL",
-        is_active=True,
-        status="email sent",
-        first_name="Test",
-        last_name="Test",
-        email="test1234456@mailinator.com",
-        visibility="PUBLIC",
-        name="url name",
-        value="https://www.xyz.com",
-        display_index=0)
+        work_task = Task.create(
+            org=org,
+            completed_at="12/12/12",
+            filename="works001.txt",
+            created_by=user,
+            updated_by=user,
+            task_type=TaskType.WORK)
+
+        WorkRecord.create(
+            task=work_task,
+            title=1212,
+            is_active=True,
+            citation_type="Test_citation_type",
+            citation_value="Test_visibity")
+
+        property_task = Task.create(
+            org=org,
+            filename="xyz.json",
+            created_by=user,
+            updated_by=user,
+            task_type=TaskType.PROPERTY,
+            completed_at="12/12/12")
+
+        PropertyRecord.create(
+            task=property_task,
+            type="URL",
+            is_active=True,
+            status="email sent",
+            first_name="Test",
+            last_name="Test",
+            email="test1234456@mailinator.com",
+            visibility="PUBLIC",
+            name="url name",
+            value="https://www.xyz.com",
+            display_index=0)
 
     resp = client.login(user, follow_redirects=True)
     resp = client.post(
         "/reset_all?url=/researcher_url_record_reset_for_batch",
         data={"task_id": property_task.id})
-    t = Task.get(property_task.id)
-    rec = t.records.first()
-    assert "The record was reset" in rec.status
-    assert t.completed_at is None
+    status, completed_at = first_record_reset_state(property_task)
+    assert "The record was reset" in status
+    assert completed_at is None
     assert resp.status_code == 302
     assert resp.location.endswith("/researcher_url_record_reset_for_batch")
     assert Task.get(property_task.id).status == "RESET"
 
     resp = client.post(
         "/reset_all?url=/affiliation_record_reset_for_batch", data={"task_id": task1.id})
-    t = Task.get(id=task1.id)
-    rec = t.records.first()
-    assert "The record was reset" in rec.status
-    assert t.completed_at is None
+    status, completed_at = first_record_reset_state(task1)
+    assert "The record was reset" in status
+    assert completed_at is None
     assert resp.status_code == 302
     assert resp.location.endswith("/affiliation_record_reset_for_batch")
 
     resp = client.post(
         "/reset_all?url=/funding_record_reset_for_batch", data={"task_id": task2.id})
-    t = Task.get(id=task2.id)
-    rec = t.records.first()
-    assert "The record was reset" in rec.status
-    assert t.completed_at is None
+    status, completed_at = first_record_reset_state(task2)
+    assert "The record was reset" in status
+    assert completed_at is None
     assert resp.status_code == 302
     assert resp.location.endswith("/funding_record_reset_for_batch")
 
     resp = client.post(
         "/reset_all?url=/record_reset_for_batch", data={"task_id": task3.id})
-    t = Task.get(id=task3.id)
-    rec = t.records.first()
-    assert "The record was reset" in rec.status
-    assert t.completed_at is None
+    status, completed_at = first_record_reset_state(task3)
+    assert "The record was reset" in status
+    assert completed_at is None
     assert resp.status_code == 302
     assert resp.location.endswith("/record_reset_for_batch")
 
     resp = client.post(
         "/reset_all?url=/work_record_reset_for_batch", data={"task_id": work_task.id})
-    t = Task.get(work_task.id)
-    rec = t.records.first()
-    assert "The record was reset" in rec.status
-    assert t.completed_at is None
+    status, completed_at = first_record_reset_state(work_task)
+    assert "The record was reset" in status
+    assert completed_at is None
     assert resp.status_code == 302
     assert resp.location.endswith("/work_record_reset_for_batch")
 
@@ -2889,15 +2801,14 @@ def test_issue_470198698(request_ctx):
     with request_ctx(f"/admin/affiliationrecord/?task_id={task.id}") as ctx:
         login_user(admin)
         resp = ctx.app.full_dispatch_request()
-        soup = BeautifulSoup(resp.data, "html.parser")
+        soup = BeautifulSoup(resp.data, "lxml")
 
-    orcid_col_idx = next(i for i, h in enumerate(soup.thead.find_all("th"))
-                         if "col-orcid" in h["class"]) - 2
+    orcid_col_idx = len(soup.thead.select_one("th.col-orcid").find_previous_siblings("th")) - 2
 
     with request_ctx(f"/admin/affiliationrecord/?sort={orcid_col_idx}&task_id={task.id}") as ctx:
         login_user(admin)
         resp = ctx.app.full_dispatch_request()
-    soup = BeautifulSoup(resp.data, "html.parser")
+    soup = BeautifulSoup(resp.data, "lxml")
     orcid_column = soup.find(class_="table-responsive").find_all(class_="col-orcid")
     assert orcid_column[-1].text.strip() == "XXXX-XXXX-XXXX-0009"
 
@@ -2912,14 +2823,14 @@ def test_issue_470198698(request_ctx):
     assert resp.status_code == 404
 
 
-def test_sync_profiles(client, mocker):
+def test_sync_profiles(client, mocker, canonical_users):
     """Test organisation switching."""
     def sync_profile_mock(*args, **kwargs):
         utils.sync_profile(*args, **kwargs, delay=0)
         return Mock(id="test-test-test-test")
     mocker.patch("orcid_hub.utils.sync_profile.queue", sync_profile_mock)
 
-    user = User.get(email="admin@test1.edu")
+    user = canonical_users["admin1"]
     resp = client.login(user, follow_redirects=True)
 
     resp = client.get("/sync_profiles")
@@ -2944,36 +2855,49 @@ def test_sync_profiles(client, mocker):
     assert resp.status_code == 302
     assert urlparse(resp.location).path == "/admin/task/"
 
-    client.logout()
-    user = User.get(email="researcher100@test0.edu")
-    client.login(user)
+    user = canonical_users["researcher"]
+    client.switch_user(user)
     resp = client.get("/sync_profiles")
     assert resp.status_code == 302
 
-    client.logout()
     user.roles += Role.TECHNICAL
     user.save()
-    client.login(user)
     resp = client.get("/sync_profiles")
     assert resp.status_code == 403
 
-    client.logout()
-    client.login_root()
+    client.switch_user(canonical_users["root"])
     resp = client.get("/sync_profiles")
     assert resp.status_code == 200
 
 
+def upload_file(client, url, filename, content):
+    """Upload the file content (bytes) and follow the redirects."""
+    return client.post(url, data={"file_": (BytesIO(content), filename)}, follow_redirects=True)
+
+
+def upload_data_file(client, url, filename, upload_name=None):
+    """Upload the file from the test data directory (streamed, not read in) and follow the redirects."""
+    with open(os.path.join(os.path.dirname(__file__), "data", filename), "rb") as f:
+        return client.post(
+            url, data={"file_": (f, upload_name or filename)}, follow_redirects=True)
+
+
+def csv_upload(client, url, filename, header, rows):
+    """Upload a CSV file composed of the header and the rows (byte strings)."""
+    return upload_file(client, url, filename, b"\n".join((header, *rows)))
+
+
 def test_load_researcher_url_csv(client):
     """Test preload researcher url data."""
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
-    resp = client.post(
-        "/load/researcher/urls",
-        data={
-            "file_": (BytesIO("""Url Name,Url Value,Display Index,Email,First Name,Last Name,ORCID iD,Put Code,Visibility,Processed At,Status
-xyzurl,https://test.com,0,xyz@mailinator.com,sdksdsd,sds1,0000-0001-6817-9711,43959,PUBLIC,,
-xyzurlinfo,https://test123.com,10,xyz1@mailinator.com,sdksasadsd,sds1,,,PUBLIC,,""".encode()), "researcher_urls.csv",),
-        }, follow_redirects=True)
+    client.switch_user(user)
+    resp = csv_upload(
+        client, "/load/researcher/urls", "researcher_urls.csv",
+        b"Url Name,Url Value,Display Index,Email,First Name,Last Name,ORCID iD,Put Code,Visibility,Processed At,Status",  # noqa: E501
+        [
+            b"xyzurl,https://test.com,0,xyz@mailinator.com,sdksdsd,sds1,0000-0001-6817-9711,43959,PUBLIC,,",  # noqa: E501
+            b"xyzurlinfo,https://test123.com,10,xyz1@mailinator.com,sdksasadsd,sds1,,,PUBLIC,,",
+        ])
     assert resp.status_code == 200
     assert b"https://test.com" in resp.data
     assert b"researcher_urls.csv" in resp.data
@@ -2985,14 +2909,14 @@ xyzurlinfo,https://test123.com,10,xyz1@mailinator.com,sdksasadsd,sds1,,,PUBLIC,,
 def test_load_other_names_csv(client):
     """Test preload other names data."""
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
-    resp = client.post(
-        "/load/other/names",
-        data={
-            "file_": (BytesIO("""Content,Display Index,Email,First Name,Last Name,ORCID iD,Put Code,Visibility,Processed At,Status
-dummy 1220,0,rad42@mailinator.com,sdsd,sds1,,,PUBLIC,,
-dummy 10,0,raosti12dckerpr13233jsdpos8jj2@mailinator.com,sdsd,sds1,0000-0002-0146-7409,16878,PUBLIC,,""".encode()),
-                      "other_names.csv",), }, follow_redirects=True)
+    client.switch_user(user)
+    resp = csv_upload(
+        client, "/load/other/names", "other_names.csv",
+        b"Content,Display Index,Email,First Name,Last Name,ORCID iD,Put Code,Visibility,Processed At,Status",  # noqa: E501
+        [
+            b"dummy 1220,0,rad42@mailinator.com,sdsd,sds1,,,PUBLIC,,",
+            b"dummy 10,0,raosti12dckerpr13233jsdpos8jj2@mailinator.com,sdsd,sds1,0000-0002-0146-7409,16878,PUBLIC,,",  # noqa: E501
+        ])
     assert resp.status_code == 200
     assert b"dummy 1220" in resp.data
     assert b"other_names.csv" in resp.data
@@ -3001,25 +2925,22 @@ dummy 10,0,raosti12dckerpr13233jsdpos8jj2@mailinator.com,sdsd,sds1,0000-0002-014
     assert task.records.count() == 2
 
 
+PEER_REVIEW_HEADER = b"Review Group Id,Reviewer Role,Review Url,Review Type,Review Completion Date,Subject External Id Type,Subject External Id Value,Subject External Id Url,Subject External Id Relationship,Subject Container Name,Subject Type,Subject Name Title,Subject Name Subtitle,Subject Name Translated Title Lang Code,Subject Name Translated Title,Subject Url,Convening Org Name,Convening Org City,Convening Org Region,Convening Org Country,Convening Org Disambiguated Identifier,Convening Org Disambiguation Source,Email,ORCID iD,Identifier,First Name,Last Name,Put Code,Visibility,External Id Type,Peer Review Id,External Id Url,External Id Relationship"  # noqa: E501
+# the columns up to 'Email' shared by all the test rows:
+PEER_REVIEW_ROW = b"issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120404,https://doi.org/10.1087/20120404,SELF,Journal title,JOURNAL_ARTICLE,Name of the paper reviewed,Subtitle of the paper reviewed,en,Translated title,https://subject-alt-url.com,The University of Auckland,Auckland,Auckland,NZ,385488,RINGGOLD,"  # noqa: E501
+
+
 def test_load_peer_review_csv(client):
     """Test preload peer review data."""
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
-    resp = client.post(
-        "/load/researcher/peer_review",
-        data={
-            "file_": (
-                BytesIO(
-                    """Review Group Id,Reviewer Role,Review Url,Review Type,Review Completion Date,Subject External Id Type,Subject External Id Value,Subject External Id Url,Subject External Id Relationship,Subject Container Name,Subject Type,Subject Name Title,Subject Name Subtitle,Subject Name Translated Title Lang Code,Subject Name Translated Title,Subject Url,Convening Org Name,Convening Org City,Convening Org Region,Convening Org Country,Convening Org Disambiguated Identifier,Convening Org Disambiguation Source,Email,ORCID iD,Identifier,First Name,Last Name,Put Code,Visibility,External Id Type,Peer Review Id,External Id Url,External Id Relationship
-issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120404,https://doi.org/10.1087/20120404,SELF,Journal title,JOURNAL_ARTICLE,Name of the paper reviewed,Subtitle of the paper reviewed,en,Translated title,https://subject-alt-url.com,The University of Auckland,Auckland,Auckland,NZ,385488,RINGGOLD,rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,grant_number,GNS1706900961,https://www.grant-url.com2,PART_OF
-issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120404,https://doi.org/10.1087/20120404,SELF,Journal title,JOURNAL_ARTICLE,Name of the paper reviewed,Subtitle of the paper reviewed,en,Translated title,https://subject-alt-url.com,The University of Auckland,Auckland,Auckland,NZ,385488,RINGGOLD,radsdsd22@mailinator.com,,00032,sdsssd,ffww,,PUBLIC,grant_number,GNS1706900961,https://www.grant-url.com2,PART_OF
-issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120404,https://doi.org/10.1087/20120404,SELF,Journal title,JOURNAL_ARTICLE,Name of the paper reviewed,Subtitle of the paper reviewed,en,Translated title,https://subject-alt-url.com,The University of Auckland,Auckland,Auckland,NZ,385488,RINGGOLD,rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,source-work-id,232xxx22fff,https://localsystem.org/1234,SELF
-issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120404,https://doi.org/10.1087/20120404,SELF,Journal title,JOURNAL_ARTICLE,Name of the paper reviewed,Subtitle of the paper reviewed,en,Translated title,https://subject-alt-url.com,The University of Auckland,Auckland,Auckland,NZ,385488,RINGGOLD,radsdsd22@mailinator.com,,00032,sdsssd,ffww,,PUBLIC,source-work-id,232xxx22fff,https://localsystem.org/1234,SELF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "peer_review.csv",
-            ),
-        },
-        follow_redirects=True)
+    client.switch_user(user)
+    resp = csv_upload(
+        client, "/load/researcher/peer_review", "peer_review.csv", PEER_REVIEW_HEADER, [
+            PEER_REVIEW_ROW + b"rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,grant_number,GNS1706900961,https://www.grant-url.com2,PART_OF",  # noqa: E501
+            PEER_REVIEW_ROW + b"radsdsd22@mailinator.com,,00032,sdsssd,ffww,,PUBLIC,grant_number,GNS1706900961,https://www.grant-url.com2,PART_OF",  # noqa: E501
+            PEER_REVIEW_ROW + b"rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,source-work-id,232xxx22fff,https://localsystem.org/1234,SELF",  # noqa: E501
+            PEER_REVIEW_ROW + b"radsdsd22@mailinator.com,,00032,sdsssd,ffww,,PUBLIC,source-work-id,232xxx22fff,https://localsystem.org/1234,SELF",  # noqa: E501
+        ])
     assert resp.status_code == 200
     assert b"issn:1213199811" in resp.data
     assert b"peer_review.csv" in resp.data
@@ -3028,78 +2949,42 @@ issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120
     prr = task.records.where(PeerReviewRecord.review_group_id == "issn:1213199811").first()
     assert prr.external_ids.count() == 2
     assert prr.invitees.count() == 2
-    resp = client.post(
-        "/load/researcher/peer_review",
-        data={
-            "file_": (
-                BytesIO(
-                    """Review Group Id,Reviewer Role,Review Url,Review Type,Review Completion Date,Subject External Id Type,Subject External Id Value,Subject External Id Url,Subject External Id Relationship,Subject Container Name,Subject Type,Subject Name Title,Subject Name Subtitle,Subject Name Translated Title Lang Code,Subject Name Translated Title,Subject Url,Convening Org Name,Convening Org City,Convening Org Region,Convening Org Country,Convening Org Disambiguated Identifier,Convening Org Disambiguation Source,Email,ORCID iD,Identifier,First Name,Last Name,Put Code,Visibility,External Id Type,Peer Review Id,External Id Url,External Id Relationship
-issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120404,https://doi.org/10.1087/20120404,SELF,Journal title,JOURNAL_ARTICLE,Name of the paper reviewed,Subtitle of the paper reviewed,en,Translated title,https://subject-alt-url.com,The University of Auckland,Auckland,Auckland,NZ,385488,RINGGOLD,rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,grant_number,,https://www.grant-url.com2,PART_OF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "peer_review.csv",
-            ),
-        },
-        follow_redirects=True)
+    resp = csv_upload(
+        client, "/load/researcher/peer_review", "peer_review.csv", PEER_REVIEW_HEADER, [
+            PEER_REVIEW_ROW + b"rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,grant_number,,https://www.grant-url.com2,PART_OF",  # noqa: E501
+        ])
     assert resp.status_code == 200
     assert b"Invalid External Id Value or Peer Review Id" in resp.data
-    resp = client.post(
-        "/load/researcher/peer_review",
-        data={
-            "file_": (
-                BytesIO(
-                    """Review Group Id,Reviewer Role,Review Url,Review Type,Review Completion Date,Subject External Id Type,Subject External Id Value,Subject External Id Url,Subject External Id Relationship,Subject Container Name,Subject Type,Subject Name Title,Subject Name Subtitle,Subject Name Translated Title Lang Code,Subject Name Translated Title,Subject Url,Convening Org Name,Convening Org City,Convening Org Region,Convening Org Country,Convening Org Disambiguated Identifier,Convening Org Disambiguation Source,Email,ORCID iD,Identifier,First Name,Last Name,Put Code,Visibility,External Id Type,Peer Review Id,External Id Url,External Id Relationship
-issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120404,https://doi.org/10.1087/20120404,SELF,Journal title,JOURNAL_ARTICLE,Name of the paper reviewed,Subtitle of the paper reviewed,en,Translated title,https://subject-alt-url.com,The University of Auckland,Auckland,Auckland,NZ,385488,RINGGOLD,rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,grant_number_incorrect,sdsds,https://www.grant-url.com2,PART_OF""".encode()   # noqa: E501
-                ),
-                "peer_review.csv",
-            ),
-        },
-        follow_redirects=True)
+    resp = csv_upload(
+        client, "/load/researcher/peer_review", "peer_review.csv", PEER_REVIEW_HEADER, [
+            PEER_REVIEW_ROW + b"rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,grant_number_incorrect,sdsds,https://www.grant-url.com2,PART_OF",  # noqa: E501
+        ])
     assert resp.status_code == 200
     assert b"Invalid External Id Type: 'grant_number_incorrect'" in resp.data
-    resp = client.post(
-        "/load/researcher/peer_review",
-        data={
-            "file_": (
-                BytesIO(
-                    """Review Group Id,Reviewer Role,Review Url,Review Type,Review Completion Date,Subject External Id Type,Subject External Id Value,Subject External Id Url,Subject External Id Relationship,Subject Container Name,Subject Type,Subject Name Title,Subject Name Subtitle,Subject Name Translated Title Lang Code,Subject Name Translated Title,Subject Url,Convening Org Name,Convening Org City,Convening Org Region,Convening Org Country,Convening Org Disambiguated Identifier,Convening Org Disambiguation Source,Email,ORCID iD,Identifier,First Name,Last Name,Put Code,Visibility,External Id Type,Peer Review Id,External Id Url,External Id Relationship
-issn:1213199811,REVIEWER,https://alt-url.com,REVIEW,2012-08-01,doi,10.1087/20120404,https://doi.org/10.1087/20120404,SELF,Journal title,JOURNAL_ARTICLE,Name of the paper reviewed,Subtitle of the paper reviewed,en,Translated title,https://subject-alt-url.com,The University of Auckland,Auckland,Auckland,NZ,385488,RINGGOLD,rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,grant_number,sdsds,https://www.grant-url.com2,PART_OF_incorrect""".encode()     # noqa: E501
-                ),
-                "peer_review.csv",
-            ),
-        },
-        follow_redirects=True)
+    resp = csv_upload(
+        client, "/load/researcher/peer_review", "peer_review.csv", PEER_REVIEW_HEADER, [
+            PEER_REVIEW_ROW + b"rad4wwww299ssspppw99pos@mailinator.com,,00001,sdsd,sds1,,PUBLIC,grant_number,sdsds,https://www.grant-url.com2,PART_OF_incorrect",  # noqa: E501
+        ])
     assert resp.status_code == 200
-    assert b"Invalid External Id Relationship 'PART_OF_INCORRECT'" in resp.data
-
-
-def test_load_funding_csv(client, mocker):
-    """Test preload organisation data."""
-    capture_event = mocker.patch("sentry_sdk.transport.HttpTransport.capture_event")
-    user = client.data["admin"]
-    client.login(user, follow_redirects=True)
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(
-                    """title,translated title,language,type,org type,short description,amount,currency,start,end,org name,city,region,country,disambiguated organisation identifier,disambiguation source,orcid id,name,role,email,external identifier type,external identifier value,external identifier url,external identifier relationship
+    assert b"Invalid External Id Relationship 'PART_OF_INCORRECT'" in resp.data
 
-THIS IS A TITLE, नमस्ते,hi,  CONTRACT,MY TYPE,Minerals unde.,300000,NZD,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD, test123@org1.edu,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF
-THIS IS A TITLE, नमस्ते,hi,  CONTRACT,MY TYPE,Minerals unde.,300000,NZD,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,1885-2885-3885-00X3, GivenName Surname #2, LEAD, test123_2@org1.edu,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF
-THIS IS A TITLE, नमस्ते,hi,  CONTRACT,MY TYPE,Minerals unde.,300000,NZD,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD, test123@org1.edu,grant_number,GNS9999999999,https://www.grant-url2.com,PART_OF
-THIS IS A TITLE, नमस्ते,hi,  CONTRACT,MY TYPE,Minerals unde.,300000,NZD,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,1885-2885-3885-00X3, GivenName Surname #2, LEAD, test123_2@org1.edu,grant_number,GNS9999999999,https://www.grant-url2.com,PART_OF
-THIS IS A TITLE #2, नमस्ते #2,hi,  CONTRACT,MY TYPE,Minerals unde.,900000,USD,,2025,,,,,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD, test123@org1.edu,grant_number,GNS9999999999,https://www.grant-url2.com,PART_OF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "fundings.csv",
-            ),
-        },
-        follow_redirects=True)
+
+def funding_tasks():
+    """Return the query of the funding tasks bound to the current test database."""
+    return Task.select().where(Task.task_type == TaskType.FUNDING)
+
+
+def test_load_funding_csv(client):
+    """Test preload organisation data."""
+    user = client.data["admin"]
+    client.switch_user(user)
+    resp = upload_data_file(client, "/load/researcher/funding", "fundings.csv")
     assert resp.status_code == 200
     assert b"THIS IS A TITLE" in resp.data
     assert b"THIS IS A TITLE #2" in resp.data
     assert b"fundings.csv" in resp.data
-    assert Task.select().where(Task.task_type == TaskType.FUNDING).count() == 1
-    task = Task.select().where(Task.task_type == TaskType.FUNDING).first()
+    assert funding_tasks().count() == 1
+    task = funding_tasks().order_by(Task.id).first()
     assert task.records.count() == 2
     fr = task.records.where(FundingRecord.title == "THIS IS A TITLE").first()
     assert fr.contributors.count() == 0
@@ -3109,11 +2994,8 @@ THIS IS A TITLE #2, नमस्ते #2,hi,  CONTRACT,MY TYPE,Minerals unde.,9
     assert resp.headers["Content-Type"] == "text/tsv; charset=utf-8"
     assert len(resp.data.splitlines()) == 4
 
-    resp = client.post(
-        "/load/researcher/funding",
-        data={"file_": (BytesIO(resp.data), "funding000.tsv")},
-        follow_redirects=True)
-    assert Task.select().where(Task.task_type == TaskType.FUNDING).count() == 2
+    resp = upload_file(client, "/load/researcher/funding", "funding000.tsv", resp.data)
+    assert funding_tasks().count() == 2
     task = Task.select().where(Task.filename == "funding000.tsv",
                                Task.task_type == TaskType.FUNDING).first()
     assert task.records.count() == 2
@@ -3125,11 +3007,8 @@ THIS IS A TITLE #2, नमस्ते #2,hi,  CONTRACT,MY TYPE,Minerals unde.,9
     assert resp.headers["Content-Type"] == "text/csv; charset=utf-8"
     assert len(resp.data.splitlines()) == 4
 
-    resp = client.post(
-        "/load/researcher/funding",
-        data={"file_": (BytesIO(resp.data), "funding001.csv")},
-        follow_redirects=True)
-    assert Task.select().where(Task.task_type == TaskType.FUNDING).count() == 3
+    resp = upload_file(client, "/load/researcher/funding", "funding001.csv", resp.data)
+    assert funding_tasks().count() == 3
     task = Task.select().where(Task.filename == "funding001.csv",
                                Task.task_type == TaskType.FUNDING).first()
     assert task.records.count() == 2
@@ -3140,30 +3019,18 @@ THIS IS A TITLE #2, नमस्ते #2,hi,  CONTRACT,MY TYPE,Minerals unde.,9
 
     export_resp = client.get(f"/admin/fundingrecord/export/json/?task_id={task.id}")
     assert export_resp.status_code == 200
-    assert b'"type": "CONTRACT"' in export_resp.data
-    assert b'"title": {"title": {"value": "THIS IS A TITLE"}' in export_resp.data
-    assert b'"title": {"title": {"value": "THIS IS A TITLE #2"}' in export_resp.data
+    records = json.loads(export_resp.data)
+    assert [r["type"] for r in records] == ["CONTRACT", "CONTRACT"]
+    assert {r["title"]["title"]["value"] for r in records} == {"THIS IS A TITLE", "THIS IS A TITLE #2"}
 
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(
-                    """title	translated title	language	type	org type	short description	amount	aurrency	start	end	org name	city	region	country	disambiguated organisation identifier	disambiguation source	orcid id	name	role	email	external identifier type	external identifier value	external identifier url	external identifier relationship
-THIS IS A TITLE #3	 नमस्ते	hi	CONTRACT	MY TYPE	Minerals unde.	300000	NZD		2025	Royal Society Te Apārangi	Wellington		New Zealand	210126	RINGGOLD	1914-2914-3914-00X3	 GivenName Surname	 LEAD	 test123@org1.edu	grant_number	GNS1706900961	https://www.grant-url2.com	PART_OF
-THIS IS A TITLE #4	 नमस्ते #2	hi	CONTRACT	MY TYPE	Minerals unde.	900000	USD		2025					210126	RINGGOLD	1914-2914-3914-00X3	 GivenName Surname	 LEAD	 test123@org1.edu	grant_number	GNS1706900962	https://www.grant-url2.com	PART_OF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "fundings.tsv",
-            ),
-        },
-        follow_redirects=True)
+    resp = upload_data_file(client, "/load/researcher/funding", "fundings.tsv")
     assert resp.status_code == 200
     assert b"THIS IS A TITLE #3" in resp.data
     assert b"THIS IS A TITLE #4" in resp.data
     assert b"fundings.tsv" in resp.data
 
-    assert Task.select().where(Task.task_type == TaskType.FUNDING).count() == 4
-    task = Task.select().where(Task.task_type == TaskType.FUNDING).order_by(Task.id.desc()).first()
+    assert funding_tasks().count() == 4
+    task = funding_tasks().order_by(Task.id.desc()).first()
     assert task.records.count() == 2
 
     # Activate a single record:
@@ -3185,7 +3052,8 @@ THIS IS A TITLE #4	 नमस्ते #2	hi	CONTRACT	MY TYPE	Minerals unde.	900
     assert Task.get(task.id).status == "ACTIVE"
 
     # Reste a single record
-    FundingRecord.update(processed_at=datetime.datetime(2018, 1, 1)).execute()
+    FundingRecord.update(processed_at=datetime.datetime(2018, 1, 1)).where(
+        FundingRecord.task_id == task.id).execute()
     resp = client.post(
         "/admin/fundingrecord/action/",
         follow_redirects=True,
@@ -3208,112 +3076,13 @@ THIS IS A TITLE #4	 नमस्ते #2	hi	CONTRACT	MY TYPE	Minerals unde.	900
     assert resp.status_code == 200
     assert not Task.select().where(Task.id == task.id).exists()
 
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(
-                    """title,translated title,language,type,org type,short description,amount,aurrency,start,end,org name,city,region,country,disambiguated organisation identifier,disambiguation source,orcid id,name,role,email,external identifier type,external identifier value,external identifier url,external identifier relationship
-THIS IS A TITLE, नमस्ते,hi,,MY TYPE,Minerals unde.,300000,NZD.,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD, test123@org1.edu,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF
-
-""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "error.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load funding record file" in resp.data
-    assert b"type is mandatory" in resp.data
-
-    resp = client.post(
-        "/load/researcher/funding",
-        data={"file_": (BytesIO(b"title\nVAL"), "error.csv")},
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load funding record file" in resp.data
-    assert b"Expected CSV or TSV format file." in resp.data
-
-    resp = client.post(
-        "/load/researcher/funding",
-        data={"file_": (BytesIO(b"header1,header2,header2\n1,2,3"), "error.csv")},
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load funding record file" in resp.data
-    assert b"Failed to map fields based on the header of the file" in resp.data
-
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(
-                    """title,translated title,language,type,org type,short description,amount,aurrency,start,end,org name,city,region,country,disambiguated organisation identifier,disambiguation source,orcid id,name,role,email,external identifier type,external identifier value,external identifier url,external identifier relationship
-THIS IS A TITLE #2, नमस्ते #2,hi, CONTRACT,MY TYPE,Minerals unde.,900000,USD.,,**ERROR**,,,,,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD, test123@org1.edu,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "fundings.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load funding record file" in resp.data
-    assert b"Wrong partial date value '**ERROR**'" in resp.data
-
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(
-                    """title,translated title,language,type,org type,short description,amount,aurrency,start,end,org name,city,region,country,disambiguated organisation identifier,disambiguation source,orcid id,name,role,email,external identifier type,external identifier value,external identifier url,external identifier relationship
-
-THIS IS A TITLE, नमस्ते,hi,  CONTRACT,MY TYPE,Minerals unde.,300000,NZD.,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD,**ERROR**,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "fundings.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load funding record file" in resp.data
-    assert b"Invalid email address '**error**'" in resp.data
-
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(
-                    """title,translated title,language,type,org type,short description,amount,aurrency,start,end,org name,city,region,country,disambiguated organisation identifier,disambiguation source,orcid id,name,role,email,external identifier type,external identifier value,external identifier url,external identifier relationship
-
-THIS IS A TITLE, नमस्ते,hi,  CONTRACT,MY TYPE,Minerals unde.,300000,NZD.,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,ERRO-R914-3914-00X3, GivenName Surname, LEAD,user1234@test123.edu,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF """.encode()  # noqa: E501
-                ),  # noqa: E501
-                "fundings.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load funding record file" in resp.data
-    assert b"Invalid ORCID iD ERRO-R" in resp.data
-
     # without "excluded"
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(
-                    """Put Code,Title,Translated Title,Translated Title Language Code,Type,Organization Defined Type,Short Description,Amount,Currency,Start Date,End Date,Org Name,City,Region,Country,Disambiguated Org Identifier,Disambiguation Source,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,External Id Type,External Id Value,External Id Url,External Id Relationship,Identifier
-,This is the project title,,,CONTRACT,Fast-Start,This is the project abstract,300000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,0000-0002-9207-4933,,,,Associate Professor A Contributor 1,lead,grant_number,XXX1701,,SELF,
-,This is the project title,,,CONTRACT,Fast-Start,This is the project abstract,300000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,,,,,Dr B Contributor 2,co_lead,grant_number,XXX1701,,SELF,
-,This is the project title,,,CONTRACT,Fast-Start,This is the project abstract,300000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,,,,,Dr E Contributor 3,,grant_number,XXX1701,,SELF,
-,This is another project title,,,CONTRACT,Standard,This is another project abstract,800000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,,contributor4@mailinator.com,,,Associate Professor F Contributor 4,lead,grant_number,XXX1702,,SELF,9999
-,This is another project title,,,CONTRACT,Standard,This is another project abstract,800000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,,contributor5@mailinator.com,John,Doe,,co_lead,grant_number,XXX1702,,SELF,8888 """.encode()  # noqa: E501
-                ),  # noqa: E501
-                "fundings042.csv",
-            ),
-        },
-        follow_redirects=True)
+    resp = upload_data_file(client, "/load/researcher/funding", "fundings042.csv")
     assert resp.status_code == 200
     assert b"This is the project title" in resp.data
     assert b"This is another project title" in resp.data
     assert b"fundings042.csv" in resp.data
-    assert Task.select().where(Task.task_type == TaskType.FUNDING).count() == 4
+    assert funding_tasks().count() == 4
     task = Task.select().where(Task.filename == "fundings042.csv").first()
     assert task.records.count() == 2
     fr = task.records.where(FundingRecord.title == "This is another project title").first()
@@ -3350,8 +3119,8 @@ XXX1702,00004,,This is another project title,,,CONTRACT,Standard,This is another
     assert resp.status_code == 200
     assert b"the project title" in resp.data
     assert b"fundings_ex.csv" in resp.data
-    assert Task.select().where(Task.task_type == TaskType.FUNDING).count() == 5
-    task = Task.select().where(Task.task_type == TaskType.FUNDING).order_by(Task.id.desc()).first()
+    assert funding_tasks().count() == 5
+    task = funding_tasks().order_by(Task.id.desc()).first()
     assert task.records.count() == 2
 
     # Change invitees:
@@ -3377,8 +3146,9 @@ XXX1702,00004,,This is another project title,,,CONTRACT,Standard,This is another
             "visibility": "PUBLIC",
         })
     assert record.invitees.count() > invitee_count
-    assert record.invitees.first().first_name == invitee.first_name + "NEW"
-    assert record.invitees.first().email == "test_new@test.test.test.org"
+    i = record.invitees.first()
+    assert i.first_name == invitee.first_name + "NEW"
+    assert i.email == "test_new@test.test.test.org"
 
     # Change contributors:
     record = task.records.first()
@@ -3427,50 +3197,70 @@ XXX1702,00004,,This is another project title,,,CONTRACT,Standard,This is another
             "_continue_editing": "Save and Continue Editing",
         })
     assert Task.get(task.id).records.count() == record_count + 1
-    capture_event.assert_called()
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(b"""Funding Id,Identifier,Put Code,Title,Translated Title,Translated Title Language Code,Type,Organization Defined Type,Short Description,Amount,Currency,Start Date,End Date,Org Name,City,Region,Country,Disambiguated Org Identifier,Disambiguation Source,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,Excluded,External Id Type,External Id Url,External Id Relationship
-    XXX1701,00002,,This is the project title,,,CONTRACT,Fast-Start,This is the project abstract,300000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,,contributor2@mailinator.com,Bob,Contributor 2,,,Y,grant_number_incorrect,,SELF"""),  # noqa: E501
-                "fundings_ex.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Invalid External Id Type: 'grant_number_incorrect'" in resp.data
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(b"""Funding Id,Identifier,Put Code,Title,Translated Title,Translated Title Language Code,Type,Organization Defined Type,Short Description,Amount,Currency,Start Date,End Date,Org Name,City,Region,Country,Disambiguated Org Identifier,Disambiguation Source,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,Excluded,External Id Type,External Id Url,External Id Relationship
-    XXX1701,00002,,This is the project title,,,CONTRACT,Fast-Start,This is the project abstract,300000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,,contributor2@mailinator.com,Bob,Contributor 2,,,Y,grant_number,,SELF_incorrect"""),  # noqa: E501
-                "fundings_ex.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Invalid External Id Relationship 'SELF_INCORRECT'" in resp.data
-    resp = client.post(
-        "/load/researcher/funding",
-        data={
-            "file_": (
-                BytesIO(b"""Funding Id,Identifier,Put Code,Title,Translated Title,Translated Title Language Code,Type,Organization Defined Type,Short Description,Amount,Currency,Start Date,End Date,Org Name,City,Region,Country,Disambiguated Org Identifier,Disambiguation Source,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,Excluded,External Id Type,External Id Url,External Id Relationship
-    ,00002,,This is the project title,,,CONTRACT,Fast-Start,This is the project abstract,300000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,,contributor2@mailinator.com,Bob,Contributor 2,,,Y,grant_number,,SELF"""),  # noqa: E501
-                "fundings_ex.csv",
-            ),
-        },
-        follow_redirects=True)
+
+
+FUNDING_HEADER = b"title,translated title,language,type,org type,short description,amount,aurrency,start,end,org name,city,region,country,disambiguated organisation identifier,disambiguation source,orcid id,name,role,email,external identifier type,external identifier value,external identifier url,external identifier relationship"  # noqa: E501
+FUNDING_ID_HEADER = b"Funding Id,Identifier,Put Code,Title,Translated Title,Translated Title Language Code,Type,Organization Defined Type,Short Description,Amount,Currency,Start Date,End Date,Org Name,City,Region,Country,Disambiguated Org Identifier,Disambiguation Source,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,Excluded,External Id Type,External Id Url,External Id Relationship"  # noqa: E501
+# the columns up to 'External Id Type' shared by the rows with the external ID errors:
+FUNDING_ID_ROW = b",00002,,This is the project title,,,CONTRACT,Fast-Start,This is the project abstract,300000,NZD,2018,2021,Marsden Fund,Wellington,,NZ,http://dx.doi.org/10.13039/501100009193,FUNDREF,,,contributor2@mailinator.com,Bob,Contributor 2,,,Y,"  # noqa: E501
+
+
+@pytest.mark.parametrize("filename, header, rows, error", [
+    ("error.csv", FUNDING_HEADER, [
+        "THIS IS A TITLE, नमस्ते,hi,,MY TYPE,Minerals unde.,300000,NZD.,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD, test123@org1.edu,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF".encode(),  # noqa: E501
+        b"",
+        b"",
+    ], b"type is mandatory"),
+    ("error.csv", b"title", [b"VAL"], b"Expected CSV or TSV format file."),
+    ("error.csv", b"header1,header2,header2", [b"1,2,3"],
+     b"Failed to map fields based on the header of the file"),
+    ("fundings.csv", FUNDING_HEADER, [
+        "THIS IS A TITLE #2, नमस्ते #2,hi, CONTRACT,MY TYPE,Minerals unde.,900000,USD.,,**ERROR**,,,,,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD, test123@org1.edu,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF".encode(),  # noqa: E501
+    ], b"Wrong partial date value '**ERROR**'"),
+    ("fundings.csv", FUNDING_HEADER, [
+        b"",
+        "THIS IS A TITLE, नमस्ते,hi,  CONTRACT,MY TYPE,Minerals unde.,300000,NZD.,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,1914-2914-3914-00X3, GivenName Surname, LEAD,**ERROR**,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF".encode(),  # noqa: E501
+    ], b"Invalid email address '**error**'"),
+    ("fundings.csv", FUNDING_HEADER, [
+        b"",
+        "THIS IS A TITLE, नमस्ते,hi,  CONTRACT,MY TYPE,Minerals unde.,300000,NZD.,,2025,Royal Society Te Apārangi,Wellington,,New Zealand,210126,RINGGOLD,ERRO-R914-3914-00X3, GivenName Surname, LEAD,user1234@test123.edu,grant_number,GNS1706900961,https://www.grant-url2.com,PART_OF ".encode(),  # noqa: E501
+    ], b"Invalid ORCID iD ERRO-R"),
+    ("fundings_ex.csv", FUNDING_ID_HEADER, [
+        b"    XXX1701" + FUNDING_ID_ROW + b"grant_number_incorrect,,SELF",
+    ], b"Invalid External Id Type: 'grant_number_incorrect'"),
+    ("fundings_ex.csv", FUNDING_ID_HEADER, [
+        b"    XXX1701" + FUNDING_ID_ROW + b"grant_number,,SELF_incorrect",
+    ], b"Invalid External Id Relationship 'SELF_INCORRECT'"),
+    ("fundings_ex.csv", FUNDING_ID_HEADER, [
+        b"    " + FUNDING_ID_ROW + b"grant_number,,SELF",
+    ], b"Invalid External Id Value or Funding Id"),
+])
+def test_load_funding_csv_errors(client, mocker, filename, header, rows, error):
+    """Test the funding record file validation errors."""
+    capture_event = mocker.patch("sentry_sdk.transport.HttpTransport.capture_event")
+    client.switch_user(client.data["admin"])
+    resp = csv_upload(client, "/load/researcher/funding", filename, header, rows)
     assert resp.status_code == 200
-    assert b"Invalid External Id Value or Funding Id" in resp.data
+    assert b"Failed to load funding record file" in resp.data
+    assert error in resp.data
+    capture_event.assert_called()
+
+
+WORK_HEADER = b"Work Id,Put Code,Title,Sub Title,Translated Title,Translated Title Language Code,Journal Title,Short Description,Citation Type,Citation Value,Type,Publication Date,Publication Media Type,Url,Language Code,Country,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,Excluded,External Id Type,External Id Url,External Id Relationship"  # noqa: E501
+# the columns up to 'Publication Date' shared by the rows with the errors:
+WORK_ROW = b"sdsds,,This is a title,,,hi,This is a journal title,xyz this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,"  # noqa: E501
+# an excluded row without errors, accompanying the invalid rows:
+VALID_WORK_ROW = WORK_ROW + b"2001-01-12,,,en,NZ,,0000-0002-9207-4933,,,,Associate Professor Alice,AUTHOR,Y,bibcode,http://url.edu/abs/ghjghghj,SELF"  # noqa: E501
+WORK_ID_HEADER = b"Identifier,Email,First Name,Last Name,ORCID iD,Visibility,Put Code,Title,Subtitle,Translated Title,Translation Language Code,Journal Title,Short Description,Citation Type,Citation Value,Type,Publication Date,Media Type,External ID Type,Work Id,External ID URL,External ID Relationship,Url,Language Code,Country"  # noqa: E501
+# the columns up to 'External ID Type' shared by the rows with the external ID errors:
+WORK_ID_ROW = b"1,invitee1@mailinator.com,Alice,invitee 1,0000-0002-9207-4933,,,This is a title,Subtiitle,xxx,hi,This is a journal title,this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,12/01/2001,,"  # noqa: E501
 
 
 def test_researcher_work(client, mocker):
     """Test preload work data."""
     exception = mocker.patch.object(client.application.logger, "exception")
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
+    client.switch_user(user)
     resp = client.post(
         "/load/researcher/work",
         data={
@@ -3519,7 +3309,8 @@ def test_researcher_work(client, mocker):
                                      WorkRecord.is_active).count() == 1
 
     # Reste a single record
-    WorkRecord.update(processed_at=datetime.datetime(2018, 1, 1)).execute()
+    WorkRecord.update(processed_at=datetime.datetime(2018, 1, 1)).where(
+        WorkRecord.task_id == task.id).execute()
     resp = client.post(
         "/admin/workrecord/action/",
         follow_redirects=True,
@@ -3621,10 +3412,7 @@ def test_researcher_work(client, mocker):
     # we are not exporting contributor in case of csv/tsv.
     assert len(resp.data.splitlines()) == 3
 
-    resp = client.post(
-        "/load/researcher/work",
-        data={"file_": (BytesIO(resp.data), "work003.csv")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/researcher/work", "work003.csv", resp.data)
     assert Task.select().where(Task.task_type == TaskType.WORK).count() == 3
     task = Task.select().where(Task.filename == "work003.csv",
                                Task.task_type == TaskType.WORK).first()
@@ -3633,100 +3421,32 @@ def test_researcher_work(client, mocker):
     assert rec.external_ids.count() == 1
     assert rec.invitees.count() == 2
 
-    resp = client.post(
-        "/load/researcher/work",
-        data={"file_": (BytesIO(b"title\nVAL"), "error.csv")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/researcher/work", "error.csv", b"title\nVAL")
     assert resp.status_code == 200
     assert b"Failed to load work record file" in resp.data
     assert b"Expected CSV or TSV format file." in resp.data
 
-    resp = client.post(
-        "/load/researcher/work",
-        data={"file_": (BytesIO(b"header1,header2,header2\n1,2,3"), "error.csv")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/researcher/work", "error.csv", b"header1,header2,header2\n1,2,3")
     assert resp.status_code == 200
     assert b"Failed to load work record file" in resp.data
     assert b"Failed to map fields based on the header of the file" in resp.data
 
     export_resp = client.get(f"/admin/workrecord/export/json/?task_id={task.id}")
     assert export_resp.status_code == 200
-    assert b"BOOK_CHAPTER" in export_resp.data
-    assert b'journal-title": {"value": "This is a journal title"}' in export_resp.data
-
-    resp = client.post(
-        "/load/researcher/work",
-        data={
-            "file_": (
-                BytesIO(
-                    """Work Id,Put Code,Title,Sub Title,Translated Title,Translated Title Language Code,Journal Title,Short Description,Citation Type,Citation Value,Type,Publication Date,Publication Media Type,Url,Language Code,Country,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,Excluded,External Id Type,External Id Url,External Id Relationship
-sdsds,,This is a title,,,hi,This is a journal title,xyz this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,**ERROR**,,,en,NZ,,0000-0002-9207-4933,contributor1@mailinator.com,Alice,Contributor 1,,,,bibcode,http://url.edu/abs/ghjghghj,SELF
-sdsds,,This is a title,,,hi,This is a journal title,xyz this is short description,formatted_unspecified,This is citation value,BOOK_CHAPTER,2001-01-12,,,en,NZ,,0000-0002-9207-4933,,,,Associate Professor Alice,AUTHOR,Y,bibcode,http://url.edu/abs/ghjghghj,SELF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "work.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load work record file" in resp.data
-    assert b"Wrong partial date value '**ERROR**'" in resp.data
-
-    resp = client.post(
-        "/load/researcher/work",
-        data={
-            "file_": (
-                BytesIO(
-                    """Work Id,Put Code,Title,Sub Title,Translated Title,Translated Title Language Code,Journal Title,Short Description,Citation Type,Citation Value,Type,Publication Date,Publication Media Type,Url,Language Code,Country,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,Excluded,External Id Type,External Id Url,External Id Relationship
-sdsds,,This is a title,,,hi,This is a journal title,xyz this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,,,,en,NZ,,0000-0002-9207-4933,**ERROR**,Alice,Contributor 1,,,,bibcode,http://url.edu/abs/ghjghghj,SELF
-sdsds,,This is a title,,,hi,This is a journal title,xyz this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,2001-01-12,,,en,NZ,,0000-0002-9207-4933,,,,Associate Professor Alice,AUTHOR,Y,bibcode,http://url.edu/abs/ghjghghj,SELF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "work.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load work record file" in resp.data
-    assert b"Invalid email address '**error**'" in resp.data
-
-    resp = client.post(
-        "/load/researcher/work",
-        data={
-            "file_": (
-                BytesIO(
-                    """Work Id,Put Code,Title,Sub Title,Translated Title,Translated Title Language Code,Journal Title,Short Description,Citation Type,Citation Value,Type,Publication Date,Publication Media Type,Url,Language Code,Country,Visibility,ORCID iD,Email,First Name,Last Name,Name,Role,Excluded,External Id Type,External Id Url,External Id Relationship
-sdsds,,This is a title,,,hi,This is a journal title,xyz this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,,,,en,NZ,,**ERROR**,alice@test.edu,Alice,Contributor 1,,,,bibcode,http://url.edu/abs/ghjghghj,SELF
-sdsds,,This is a title,,,hi,This is a journal title,xyz this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,2001-01-12,,,en,NZ,,0000-0002-9207-4933,,,,Associate Professor Alice,AUTHOR,Y,bibcode,http://url.edu/abs/ghjghghj,SELF""".encode()  # noqa: E501
-                ),  # noqa: E501
-                "work.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Failed to load work record file" in resp.data
-    assert b"Invalid ORCID iD **ERROR**" in resp.data
+    exported, = json.loads(export_resp.data)
+    assert exported["type"] == "BOOK_CHAPTER"
+    assert exported["journal-title"] == {"value": "This is a journal title"}
 
     # Conten and extension mismatch:
-    Task.delete().execute()
-    resp = client.post(
-        "/load/researcher/work",
-        data={
-            "file_": (open(os.path.join(os.path.dirname(__file__), "data", "example_works.json"), "rb"),
-                      "works042.csv"),
-        },
-        follow_redirects=True)
+    task_count = Task.select().count()
+    resp = upload_data_file(client, "/load/researcher/work", "example_works.json", "works042.csv")
     assert resp.status_code == 200
-    assert Task.select().count() == 0
+    assert Task.select().count() == task_count
     assert b"Failed to load work record file" in resp.data
     exception.assert_called()
 
     # Edit task after the upload
-    resp = client.post(
-        "/load/researcher/work",
-        data={
-            "file_": (open(os.path.join(os.path.dirname(__file__), "data", "example_works.json"), "rb"),
-                      "works042.json"),
-        },
-        follow_redirects=True)
+    resp = upload_data_file(client, "/load/researcher/work", "example_works.json", "works042.json")
     assert resp.status_code == 200
     task = Task.select().order_by(Task.id.desc()).first()
     assert task is not None
@@ -3737,7 +3457,7 @@ sdsds,,This is a title,,,hi,This is a journal title,xyz this is short descriptio
         f"/admin/workrecord/new/?url={url}",
         data=dict(title="WORK1234", _continue_editing="Save and Continue Editing"),
         follow_redirects=True)
-    assert Task.get(task.id).records.count() == record_count + 1
+    assert task.records.count() == record_count + 1
 
     record = task.records.order_by(task.record_model.id.desc()).first()
     assert record
@@ -3763,12 +3483,13 @@ sdsds,,This is a title,,,hi,This is a journal title,xyz this is short descriptio
             "first_name": invitee.first_name + "NEW",
             "visibility": "PUBLIC",
         })
-    assert record.invitees.first().first_name == invitee.first_name + "NEW"
-    assert record.invitees.first().email == "test_new@test.test.test.org"
+    i = record.invitees.first()
+    assert i.first_name == invitee.first_name + "NEW"
+    assert i.email == "test_new@test.test.test.org"
 
     resp = client.post(
         f"/admin/workinvitee/delete/", data={
-            "id": record.invitees.first().id,
+            "id": i.id,
             "url": url
         })
     assert record.invitees.count() == 0
@@ -3791,12 +3512,12 @@ sdsds,,This is a title,,,hi,This is a journal title,xyz this is short descriptio
             "name": "CONTRIBUTOR NAME",
         })
     contributor = record.contributors.first()
-    assert record.contributors.first().name == "CONTRIBUTOR NAME"
-    assert record.contributors.first().email == "test_new@test.test.test.org"
+    assert contributor.name == "CONTRIBUTOR NAME"
+    assert contributor.email == "test_new@test.test.test.org"
 
     resp = client.post(
         f"/admin/workcontributor/delete/", data={
-            "id": record.contributors.first().id,
+            "id": contributor.id,
             "url": url
         })
     assert record.contributors.count() == 0
@@ -3825,55 +3546,48 @@ sdsds,,This is a title,,,hi,This is a journal title,xyz this is short descriptio
 
     resp = client.post(
         f"/admin/workexternalid/delete/", data={
-            "id": record.external_ids.first().id,
+            "id": external_id.id,
             "url": url
         })
     assert record.external_ids.count() == 0
-    resp = client.post(
-        "/load/researcher/work",
-        data={
-            "file_": (
-                BytesIO(
-                    """Identifier,Email,First Name,Last Name,ORCID iD,Visibility,Put Code,Title,Subtitle,Translated Title,Translation Language Code,Journal Title,Short Description,Citation Type,Citation Value,Type,Publication Date,Media Type,External ID Type,Work Id,External ID URL,External ID Relationship,Url,Language Code,Country
-1,invitee1@mailinator.com,Alice,invitee 1,0000-0002-9207-4933,,,This is a title,Subtiitle,xxx,hi,This is a journal title,this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,12/01/2001,,bibcode,,http://url.edu/abs/ghjghghj,SELF,,en,NZ""".encode()),     # noqa: E501
-                "work.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Invalid External Id Value or Work Id" in resp.data
-    resp = client.post(
-        "/load/researcher/work",
-        data={
-            "file_": (
-                BytesIO(
-                    """Identifier,Email,First Name,Last Name,ORCID iD,Visibility,Put Code,Title,Subtitle,Translated Title,Translation Language Code,Journal Title,Short Description,Citation Type,Citation Value,Type,Publication Date,Media Type,External ID Type,Work Id,External ID URL,External ID Relationship,Url,Language Code,Country
-1,invitee1@mailinator.com,Alice,invitee 1,0000-0002-9207-4933,,,This is a title,Subtiitle,xxx,hi,This is a journal title,this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,12/01/2001,,bibcode_incorrect,sdsd,http://url.edu/abs/ghjghghj,SELF,,en,NZ""".encode()),   # noqa: E501
-                "work.csv",
-            ),
-        },
-        follow_redirects=True)
-    assert resp.status_code == 200
-    assert b"Invalid External Id Type: 'bibcode_incorrect'" in resp.data
-    resp = client.post(
-        "/load/researcher/work",
-        data={
-            "file_": (
-                BytesIO(
-                    """Identifier,Email,First Name,Last Name,ORCID iD,Visibility,Put Code,Title,Subtitle,Translated Title,Translation Language Code,Journal Title,Short Description,Citation Type,Citation Value,Type,Publication Date,Media Type,External ID Type,Work Id,External ID URL,External ID Relationship,Url,Language Code,Country
-1,invitee1@mailinator.com,Alice,invitee 1,0000-0002-9207-4933,,,This is a title,Subtiitle,xxx,hi,This is a journal title,this is short description,FORMATTED_UNSPECIFIED,This is citation value,BOOK_CHAPTER,12/01/2001,,bibcode,sdsd,http://url.edu/abs/ghjghghj,SELF_incorrect,,en,NZ""".encode()),   # noqa: E501
-                "work.csv",
-            ),
-        },
-        follow_redirects=True)
+
+
+@pytest.mark.parametrize("header, rows, error", [
+    (WORK_HEADER, [
+        WORK_ROW + b"**ERROR**,,,en,NZ,,0000-0002-9207-4933,contributor1@mailinator.com,Alice,Contributor 1,,,,bibcode,http://url.edu/abs/ghjghghj,SELF",  # noqa: E501
+        b"sdsds,,This is a title,,,hi,This is a journal title,xyz this is short description,formatted_unspecified,This is citation value,BOOK_CHAPTER,2001-01-12,,,en,NZ,,0000-0002-9207-4933,,,,Associate Professor Alice,AUTHOR,Y,bibcode,http://url.edu/abs/ghjghghj,SELF",  # noqa: E501
+    ], b"Wrong partial date value '**ERROR**'"),
+    (WORK_HEADER, [
+        WORK_ROW + b",,,en,NZ,,0000-0002-9207-4933,**ERROR**,Alice,Contributor 1,,,,bibcode,http://url.edu/abs/ghjghghj,SELF",  # noqa: E501
+        VALID_WORK_ROW,
+    ], b"Invalid email address '**error**'"),
+    (WORK_HEADER, [
+        WORK_ROW + b",,,en,NZ,,**ERROR**,alice@test.edu,Alice,Contributor 1,,,,bibcode,http://url.edu/abs/ghjghghj,SELF",  # noqa: E501
+        VALID_WORK_ROW,
+    ], b"Invalid ORCID iD **ERROR**"),
+    (WORK_ID_HEADER, [
+        WORK_ID_ROW + b"bibcode,,http://url.edu/abs/ghjghghj,SELF,,en,NZ",
+    ], b"Invalid External Id Value or Work Id"),
+    (WORK_ID_HEADER, [
+        WORK_ID_ROW + b"bibcode_incorrect,sdsd,http://url.edu/abs/ghjghghj,SELF,,en,NZ",
+    ], b"Invalid External Id Type: 'bibcode_incorrect'"),
+    (WORK_ID_HEADER, [
+        WORK_ID_ROW + b"bibcode,sdsd,http://url.edu/abs/ghjghghj,SELF_incorrect,,en,NZ",
+    ], b"Invalid External Id Relationship 'SELF_INCORRECT'"),
+])
+def test_researcher_work_errors(client, header, rows, error):
+    """Test the work record file validation errors."""
+    client.switch_user(client.data["admin"])
+    resp = csv_upload(client, "/load/researcher/work", "work.csv", header, rows)
     assert resp.status_code == 200
-    assert b"Invalid External Id Relationship 'SELF_INCORRECT'" in resp.data
+    assert b"Failed to load work record file" in resp.data
+    assert error in resp.data
 
 
 def test_peer_reviews(client):
     """Test peer review data management."""
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
+    client.switch_user(user)
     resp = client.post(
         "/load/researcher/peer_review",
         data={
@@ -3985,7 +3699,8 @@ def test_peer_reviews(client):
                                            PeerReviewRecord.is_active).count() == 1
 
     # Reste a single record
-    PeerReviewRecord.update(processed_at=datetime.datetime(2018, 1, 1)).execute()
+    PeerReviewRecord.update(processed_at=datetime.datetime(2018, 1, 1)).where(
+        PeerReviewRecord.task_id == task.id).execute()
     resp = client.post(
         "/admin/peerreviewrecord/action/",
         follow_redirects=True,
@@ -4004,20 +3719,17 @@ def test_peer_reviews(client):
 
     resp = client.get(f"/admin/peerreviewrecord/export/json/?task_id={task.id}")
     assert resp.status_code == 200
-    assert b'"review-type": "REVIEW"' in resp.data
-    assert b'"invitees": [' in resp.data
-    assert b'"review-group-id": "issn:12131"' in resp.data
+    exported, = json.loads(resp.data)
+    assert exported["review-type"] == "REVIEW"
+    assert exported["invitees"]
+    assert exported["review-group-id"] == "issn:12131"
 
 
 def test_other_names(client):
     """Test researcher other name data management."""
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
-    raw_data0 = open(os.path.join(os.path.dirname(__file__), "data", "othernames.json"), "rb").read()
-    resp = client.post(
-        "/load/other/names",
-        data={"file_": (BytesIO(raw_data0), "othernames_sample_latest.json")},
-        follow_redirects=True)
+    client.switch_user(user)
+    resp = upload_data_file(client, "/load/other/names", "othernames.json", "othernames_sample_latest.json")
     assert resp.status_code == 200
     assert b"dummy 1220" in resp.data
     task = Task.get(filename="othernames_sample_latest.json")
@@ -4029,10 +3741,7 @@ def test_other_names(client):
     assert b'dummy 1220' in resp.data
     assert b'dummy 10' in resp.data
 
-    resp = client.post(
-        "/load/other/names",
-        data={"file_": (BytesIO(resp.data), "othernames0001.json")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/other/names", "othernames0001.json", resp.data)
     assert resp.status_code == 200
     assert b"dummy 1220" in resp.data
     task = Task.get(filename="othernames0001.json")
@@ -4044,10 +3753,7 @@ def test_other_names(client):
     assert b'dummy 1220' in resp.data
     assert b'dummy 10' in resp.data
 
-    resp = client.post(
-        "/load/other/names",
-        data={"file_": (BytesIO(resp.data), "othernames0002.csv")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/other/names", "othernames0002.csv", resp.data)
     assert resp.status_code == 200
     assert b"dummy 1220" in resp.data
     task = Task.get(filename="othernames0002.csv")
@@ -4059,10 +3765,7 @@ def test_other_names(client):
     assert b'dummy 1220' in resp.data
     assert b'dummy 10' in resp.data
 
-    resp = client.post(
-        "/load/other/names",
-        data={"file_": (BytesIO(resp.data), "othernames0003.tsv")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/other/names", "othernames0003.tsv", resp.data)
     assert resp.status_code == 200
     assert b"dummy 1220" in resp.data
     task = Task.get(filename="othernames0003.tsv")
@@ -4072,7 +3775,7 @@ def test_other_names(client):
 def test_keyword(client):
     """Test researcher keyword data management."""
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
+    client.switch_user(user)
     resp = client.post(
         "/load/keyword",
         data={
@@ -4133,10 +3836,7 @@ def test_keyword(client):
     assert b"keyword 2" in resp.data
     assert b"keyword 1" in resp.data
 
-    resp = client.post(
-        "/load/keyword",
-        data={"file_": (BytesIO(resp.data), "keyword001.json")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/keyword", "keyword001.json", resp.data)
     assert resp.status_code == 200
     assert b"rad42@mailinator.com" in resp.data
     assert b"keyword XYZ" in resp.data
@@ -4149,10 +3849,7 @@ def test_keyword(client):
     assert b"keyword 2" in resp.data
     assert b"keyword 1" in resp.data
 
-    resp = client.post(
-        "/load/keyword",
-        data={"file_": (BytesIO(resp.data), "keyword002.csv")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/keyword", "keyword002.csv", resp.data)
     assert resp.status_code == 200
     assert b"rad42@mailinator.com" in resp.data
     assert b"keyword XYZ" in resp.data
@@ -4165,10 +3862,7 @@ def test_keyword(client):
     assert b"keyword 2" in resp.data
     assert b"keyword 1" in resp.data
 
-    resp = client.post(
-        "/load/keyword",
-        data={"file_": (BytesIO(resp.data), "keyword003.tsv")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/keyword", "keyword003.tsv", resp.data)
     assert resp.status_code == 200
     assert b"rad42@mailinator.com" in resp.data
     assert b"keyword XYZ" in resp.data
@@ -4179,12 +3873,8 @@ def test_keyword(client):
 def test_researcher_urls(client):
     """Test researcher url data management."""
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
-    raw_data0 = open(os.path.join(os.path.dirname(__file__), "data", "researchurls.json"), "rb").read()
-    resp = client.post(
-        "/load/researcher/urls",
-        data={"file_": (BytesIO(raw_data0), "researcher_url_001.json")},
-        follow_redirects=True)
+    client.switch_user(user)
+    resp = upload_data_file(client, "/load/researcher/urls", "researchurls.json", "researcher_url_001.json")
     assert resp.status_code == 200
     assert b"https://fdhfdasa112j.com" in resp.data
     task = Task.get(filename="researcher_url_001.json")
@@ -4195,10 +3885,7 @@ def test_researcher_urls(client):
     assert b"abc123@mailinator.com" in resp.data
     assert b"https://w3.test.test.test.edu" in resp.data
 
-    resp = client.post(
-        "/load/researcher/urls",
-        data={"file_": (BytesIO(resp.data), "researcher_url_002.json")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/researcher/urls", "researcher_url_002.json", resp.data)
     assert resp.status_code == 200
     assert b"abc123@mailinator.com" in resp.data
     assert b"https://w3.test.test.test.edu" in resp.data
@@ -4209,10 +3896,7 @@ def test_researcher_urls(client):
     assert b"abc123@mailinator.com" in resp.data
     assert b"https://w3.test.test.test.edu" in resp.data
 
-    resp = client.post(
-        "/load/researcher/urls",
-        data={"file_": (BytesIO(resp.data), "researcher_url_003.csv")},
-        follow_redirects=True)
+    resp = upload_file(client, "/load/researcher/urls", "researcher_url_003.csv", resp.data)
     assert resp.status_code == 200
     assert b"abc123@mailinator.com" in resp.data
     assert b"https://w3.test.test.test.edu" in resp.data
@@ -4232,7 +3916,7 @@ def test_researcher_urls(client):
             orcid="0000-0001-8228-7153",
         ),
         follow_redirects=True)
-    assert Task.get(task.id).records.count() == 6
+    assert task.records.count() == 6
 
     r = PropertyRecord.get(name="URL NAME ABC123")
     resp = client.post(
@@ -4246,12 +3930,8 @@ def test_researcher_urls(client):
 def test_load_other_ids(client):
     """Test load_other_ids data management."""
     user = client.data["admin"]
-    client.login(user, follow_redirects=True)
-    raw_data0 = open(os.path.join(os.path.dirname(__file__), "data", "example_other_ids.csv"), "rb").read()
-    resp = client.post(
-        "/load/other/ids",
-        data={"file_": (BytesIO(raw_data0), "example_other_ids.csv")},
-        follow_redirects=True)
+    client.switch_user(user)
+    resp = upload_data_file(client, "/load/other/ids", "example_other_ids.csv")
     assert resp.status_code == 200
     assert b"http://url.edu/abs/ghjghghj" in resp.data
     task = Task.get(filename="example_other_ids.csv")
@@ -4261,11 +3941,7 @@ def test_load_other_ids(client):
     assert resp.status_code == 200
     assert b"rostaindhfjsingradik2@mailinator.com" in resp.data
 
-    raw_data0 = open(os.path.join(os.path.dirname(__file__), "data", "example_other_ids.json"), "rb").read()
-    resp = client.post(
-        "/load/other/ids",
-        data={"file_": (BytesIO(raw_data0), "example_other_ids.json")},
-        follow_redirects=True)
+    resp = upload_data_file(client, "/load/other/ids", "example_other_ids.json")
 
     assert resp.status_code == 200
     assert b"http://url.edu/abs/ghjghghj" in resp.data
@@ -4291,7 +3967,7 @@ def test_load_other_ids(client):
             orcid="0000-0001-8228-7153",
         ),
         follow_redirects=True)
-    assert Task.get(task.id).records.count() == 3
+    assert task.records.count() == 3
 
 
 def test_export_affiliations(client, mocker):
@@ -4332,7 +4008,7 @@ def test_delete_affiliations(client, mocker):
                            ),
                        })
     assert resp.status_code == 302
-    task_id = int(re.search(r"\/admin\/affiliationrecord/\?task_id=(\d+)", resp.location)[1])
+    task_id = int(TASK_ID_RE.search(resp.location)[1])
     AffiliationRecord.update(delete_record=True).execute()
 
     delete_education = mocker.patch("orcid_hub.orcid_client.MemberAPI.delete_education")
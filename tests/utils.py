@@ -2,7 +2,50 @@
 """Helpers for testing."""
 
 import json
+
+from peewee import SqliteDatabase
+from playhouse.test_utils import test_database
+
 from orcid_hub import orcid_client
+from orcid_hub.models import User, UserOrg
+
+# SQLite settings for the disposable test databases: no journaling or syncing is needed
+# (peewee 2.x takes the pragmas as a list of pairs)
+SQLITE_PRAGMAS = [
+    ("journal_mode", "memory"),
+    ("synchronous", "off"),
+    ("temp_store", "memory"),
+    ("cache_size", -64000),
+]
+
+
+def dump_seeded_data(models, seed):
+    """Seed a scratch SQLite DB with `seed` and dump its content as an SQL script (INSERT statements).
+
+    Returns the script and the value returned by `seed`.
+    """
+    db = SqliteDatabase(":memory:", pragmas=SQLITE_PRAGMAS)
+    with test_database(db, models, fail_silently=True):
+        with db.atomic():
+            data = seed()
+        # NB! the tables get created by the restoring DB, only the data is needed:
+        snapshot = '\n'.join(line for line in db.get_conn().iterdump() if line.startswith("INSERT "))
+    db.close()
+    return snapshot, data
+
+
+def restore_seeded_data(db, snapshot):
+    """Load the data dumped by `dump_seeded_data` into a (SQLite) test DB."""
+    db.get_conn().executescript(snapshot)
+
+
+def create_user_with_org(org, is_admin=False, affiliations=0, **kwargs):
+    """Create a user of the organisation along with the user-organisation link in one transaction."""
+    kwargs.setdefault("organisation", org)
+    with User._meta.database.atomic():
+        user = User.create(**kwargs)
+        UserOrg.create(user=user, org=org, is_admin=is_admin, affiliations=affiliations)
+    return user
 
 
 def get_profile(org=None, user=None):